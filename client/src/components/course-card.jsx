@@ -4,27 +4,18 @@ import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import { Heart, MapPin, Clock, Users, Star } from "lucide-react";
 import { Link } from "wouter";
-import { useState } from "react";
-import { useMutation, useQueryClient, useQuery } from "@tanstack/react-query";
+import { useMutation, useQueryClient } from "@tanstack/react-query";
 import { apiRequest } from "@/lib/queryClient";
 import { useAuth } from "@/hooks/useAuth";
 import { useToast } from "@/hooks/use-toast";
 import { isUnauthorizedError } from "@/lib/authUtils";
 
-export default function CourseCard({ course, onAddToComparison }) {
-  const { user, isAuthenticated } = useAuth();
+// isSaved comes from the listing, which checks all of its courses at once (useSavedCourses).
+export default function CourseCard({ course, isSaved: isWishlisted = false, onAddToComparison }) {
+  const { isAuthenticated } = useAuth();
   const { toast } = useToast();
   const queryClient = useQueryClient();
 
-  // Check if course is wishlisted
-  const { data: wishlistData } = useQuery({
-    queryKey: ['/api/saved-courses', course.id, 'check'],
-    enabled: isAuthenticated,
-    retry: false,
-  });
-
-  const isWishlisted = wishlistData?.isWishlisted || false;
-
   // Save/unsave course mutation
   const saveCourseMutation = useMutation({
     mutationFn: async () => {
@@ -35,8 +26,8 @@ export default function CourseCard({ course, onAddToComparison }) {
       }
     },
     onSuccess: () => {
+      // Also refetches the listing's batch check, keyed under the same prefix.
       queryClient.invalidateQueries({ queryKey: ['/api/saved-courses'] });
-      queryClient.invalidateQueries({ queryKey: ['/api/saved-courses', course.id, 'check'] });
       toast({
         title: isWishlisted ? "Course removed from saved" : "Course saved",
         description: isWishlisted 
@@ -0,0 +1,21 @@
+import { useQuery } from "@tanstack/react-query";
+import { apiRequest } from "@/lib/queryClient";
+import { useAuth } from "@/hooks/useAuth";
+
+// Checks every course of a listing in one request instead of one per card.
+export function useSavedCourses(courses) {
+  const { isAuthenticated } = useAuth();
+  const ids = (courses || []).map((course) => course.id).join(',');
+
+  const { data } = useQuery({
+    queryKey: ['/api/saved-courses', 'check', ids],
+    queryFn: async () => {
+      const res = await apiRequest("GET", `/api/saved-courses/check/?ids=${ids}`);
+      return await res.json();
+    },
+    enabled: isAuthenticated && ids.length > 0,
+    retry: false,
+  });
+
+  return (courseId) => data?.is_saved?.[courseId] || false;
+}
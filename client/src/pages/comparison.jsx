@@ -50,6 +50,26 @@ export default function Comparison() {
     retry: false,
   });
 
+  // Normalized attribute matrix with "best value" flags, computed server-side
+  const { data: matrix } = useQuery({
+    queryKey: ['/api/compare-courses/matrix', courseIds],
+    queryFn: async () => {
+      // A GET needs no CSRF token, unlike a POST from a logged-in session.
+      const response = await fetch(`/api/compare-courses/matrix/?courseIds=${courseIds.join(',')}`);
+      if (!response.ok) throw new Error('Failed to fetch comparison');
+      return response.json();
+    },
+    enabled: courseIds.length > 1,
+    retry: false,
+  });
+
+  const bestTitle = (attribute) => {
+    const row = matrix?.rows.find((item) => item.attribute === attribute);
+    const bestIds = row?.best || [];
+    const best = courses.filter((course) => bestIds.includes(course.id));
+    return best.length ? best.map((course) => course.title).join(', ') : 'N/A';
+  };
+
   const removeCourse = (courseId) => {
     const newIds = courseIds.filter(id => id !== courseId);
     setCourseIds(newIds);
@@ -364,11 +384,7 @@ export default function Comparison() {
                     <div className="bg-green-50 dark:bg-green-950/20 p-4 rounded-lg">
                       <h4 className="font-medium text-green-800 dark:text-green-200 mb-2">Most Affordable</h4>
                       <p className="text-sm text-green-600 dark:text-green-300">
-                        {courses.reduce((min, course) => {
-                          const currentFees = parseFloat(course.fees || '0');
-                          const minFees = parseFloat(min.fees || '0');
-                          return currentFees < minFees ? course : min;
-                        }).title}
+                        {bestTitle('annual_fees')}
                       </p>
                     </div>
 
@@ -376,10 +392,7 @@ export default function Comparison() {
                     <div className="bg-blue-50 dark:bg-blue-950/20 p-4 rounded-lg">
                       <h4 className="font-medium text-blue-800 dark:text-blue-200 mb-2">Shortest Duration</h4>
                       <p className="text-sm text-blue-600 dark:text-blue-300">
-                        {courses.reduce((shortest, course) => {
-                          // Simple duration comparison - could be improved with proper parsing
-                          return course.duration.length < shortest.duration.length ? course : shortest;
-                        }).title}
+                        {bestTitle('duration_months')}
                       </p>
                     </div>
 
@@ -387,11 +400,7 @@ export default function Comparison() {
                     <div className="bg-yellow-50 dark:bg-yellow-950/20 p-4 rounded-lg">
                       <h4 className="font-medium text-yellow-800 dark:text-yellow-200 mb-2">Highest Rated</h4>
                       <p className="text-sm text-yellow-600 dark:text-yellow-300">
-                        {courses.reduce((highest, course) => {
-                          const currentRating = parseFloat(course.rating || '0');
-                          const highestRating = parseFloat(highest.rating || '0');
-                          return currentRating > highestRating ? course : highest;
-                        }).title}
+                        {bestTitle('rating')}
                       </p>
                     </div>
                   </div>
@@ -2,6 +2,7 @@
 import { useQuery } from "@tanstack/react-query";
 import Header from "@/components/header";
 import CourseCard from "@/components/course-card";
+import { useSavedCourses } from "@/hooks/useSavedCourses";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { useAuth } from "@/hooks/useAuth";
@@ -21,6 +22,8 @@ export default function Home() {
     retry: false,
   });
 
+  const isSaved = useSavedCourses(popularCourses?.slice(0, 3));
+
   const quickActions = [
     {
       icon: Search,
@@ -116,7 +119,7 @@ export default function Home() {
           ) : savedCourses && savedCourses.length > 0 ? (
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
               {savedCourses.slice(0, 3).map((course) => (
-                <CourseCard key={course.id} course={course} />
+                <CourseCard key={course.id} course={course} isSaved />
               ))}
             </div>
           ) : (
@@ -159,7 +162,7 @@ export default function Home() {
           ) : popularCourses && popularCourses.length > 0 ? (
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
               {popularCourses.slice(0, 3).map((course) => (
-                <CourseCard key={course.id} course={course} />
+                <CourseCard key={course.id} course={course} isSaved={isSaved(course.id)} />
               ))}
             </div>
           ) : (
@@ -3,6 +3,7 @@ import { useQuery } from "@tanstack/react-query";
 import Header from "@/components/header";
 import HeroSection from "@/components/hero-section";
 import CourseCard from "@/components/course-card";
+import { useSavedCourses } from "@/hooks/useSavedCourses";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
 import { Shield, Users, Globe, Star } from "lucide-react";
@@ -14,6 +15,8 @@ export default function Landing() {
     retry: false,
   });
 
+  const isSaved = useSavedCourses(popularCourses);
+
   const stats = [
     { value: "2,500+", label: "Universities", testId: "stat-universities" },
     { value: "50,000+", label: "Courses", testId: "stat-courses" },
@@ -107,7 +110,7 @@ export default function Landing() {
           ) : popularCourses && popularCourses.length > 0 ? (
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
               {popularCourses.map((course) => (
-                <CourseCard key={course.id} course={course} />
+                <CourseCard key={course.id} course={course} isSaved={isSaved(course.id)} />
               ))}
             </div>
           ) : (
@@ -4,6 +4,7 @@ import { useQuery } from "@tanstack/react-query";
 import { useLocation } from "wouter";
 import Header from "@/components/header";
 import CourseCard from "@/components/course-card";
+import { useSavedCourses } from "@/hooks/useSavedCourses";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
@@ -59,6 +60,8 @@ export default function Search() {
     retry: false,
   });
 
+  const isSaved = useSavedCourses(courses);
+
   // Update URL when filters change
   useEffect(() => {
     const params = new URLSearchParams();
@@ -402,6 +405,7 @@ export default function Search() {
                     <CourseCard
                       key={course.id}
                       course={course}
+                      isSaved={isSaved(course.id)}
                       onAddToComparison={handleAddToComparison}
                     />
                   ))}
@@ -0,0 +1,19 @@
+import os
+
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup(set_prefix=False)
+
+
+class CatalogASGIHandler(ASGIHandler):
+    """Serve ``ASGI_URLCONF``, which puts async views in front of the sync ones."""
+
+    async def get_response_async(self, request):
+        request.urlconf = settings.ASGI_URLCONF
+        return await super().get_response_async(request)
+
+
+application = CatalogASGIHandler()
@@ -0,0 +1,15 @@
+from django.urls import include, path
+from courses import async_views as course_views
+from users import async_views as user_views
+
+# URLconf of the ASGI application: async views for the hot read paths,
+# then every other route from config.urls. The async views hand methods
+# other than GET to their sync counterparts.
+urlpatterns = [
+    path('api/courses/', course_views.course_list, name='course-list-create'),
+    path('api/courses/popular/', course_views.popular_courses, name='popular-courses'),
+    path('api/courses/<int:pk>/', course_views.course_detail, name='course-detail'),
+    path('api/compare-courses/', course_views.compare_courses, name='compare-courses'),
+    path('api/saved-courses/check/', user_views.check_saved_courses, name='check-saved-courses'),
+    path('', include('config.urls')),
+]
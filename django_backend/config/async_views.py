@@ -0,0 +1,71 @@
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+renderer = JSONRenderer()
+
+
+def api_request(request):
+    """Wrap a Django request so DRF helpers shared with the sync views
+    (``query_params``, filter backends, paginators) accept it."""
+    return Request(request)
+
+
+def json_response(data, status=200):
+    """Render ``data`` like a DRF ``Response``; ``response.data`` keeps it for caching."""
+    response = HttpResponse(renderer.render(data), status=status, content_type='application/json')
+    response.data = data
+    return response
+
+
+def _isolated(func):
+    def run():
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def gather_queries(*funcs):
+    """Run independent ORM callables concurrently and return their results.
+
+    The async ORM runs every query of a request on one thread, one after
+    the other. These callables each get a pool thread, and so their own
+    database connection, and run at the same time.
+    """
+    return await asyncio.gather(*(sync_to_async(_isolated(func), thread_sensitive=False)() for func in funcs))
+
+
+def async_api_view(sync_view, methods=('GET', 'HEAD')):
+    """Serve ``methods`` with the decorated coroutine and the rest with ``sync_view``.
+
+    DRF does not run async views, so :class:`APIException` raised by the
+    helpers they share with the sync views is rendered here the way DRF
+    would. CSRF is left to DRF's session authentication, as for API views.
+    """
+    delegated = sync_to_async(sync_view)
+
+    def decorator(view_func):
+        @csrf_exempt
+        @wraps(view_func)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                return await delegated(request, *args, **kwargs)
+            try:
+                return await view_func(request, *args, **kwargs)
+            except APIException as exc:
+                data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+                # Session authentication has no WWW-Authenticate challenge, so DRF answers 403.
+                status = 403 if isinstance(exc, NotAuthenticated) else exc.status_code
+                return json_response(data, status=status)
+        return wrapped
+    return decorator
@@ -0,0 +1,103 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+
+def make_etag(*parts):
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return '"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def queryset_validators(queryset, key, timestamp_fields=('updated_at',)):
+    """Return ``(etag, last_modified)`` for a collection without loading it.
+
+    A single aggregate computes the row count and the newest timestamp of
+    each field, which changes whenever a row is added, edited or removed.
+    ``key`` distinguishes representations of the same rows, such as the
+    query string of a filtered, paginated list.
+    """
+    aggregates = {f'max_{index}': Max(field) for index, field in enumerate(timestamp_fields)}
+    result = queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+    stamps = [result[name] for name in aggregates]
+    present = [stamp for stamp in stamps if stamp is not None]
+    last_modified = max(present) if present else None
+    return make_etag(key, result['count'], *stamps), last_modified
+
+
+def row_validators(queryset, key, timestamp_fields=('updated_at',)):
+    """Return ``(etag, last_modified)`` for a single row, or ``(None, None)``."""
+    stamps = queryset.order_by().values_list(*timestamp_fields).first()
+    if stamps is None:
+        return None, None
+    present = [stamp for stamp in stamps if stamp is not None]
+    return make_etag(key, *stamps), max(present) if present else None
+
+
+def slice_validators(queryset, key, timestamp_fields=('updated_at',)):
+    """Return ``(etag, last_modified)`` for a short, sliced queryset.
+
+    Only the ids and timestamps of its rows are read, so the ETag follows
+    which rows are served and in what order as well as their edits.
+    """
+    rows = list(queryset.values_list('pk', *timestamp_fields))
+    present = [stamp for row in rows for stamp in row[1:] if stamp is not None]
+    return make_etag(key, *(value for row in rows for value in row)), max(present) if present else None
+
+
+def conditional_view(view_func, validators_func):
+    """Wrap ``view_func`` so conditional GETs are answered before it runs.
+
+    ``validators_func`` is called once per request and returns
+    ``(etag, last_modified)``; matching ``If-None-Match`` or
+    ``If-Modified-Since`` headers get a 304 without calling the view.
+    Coroutine views get a coroutine wrapper that computes the validators
+    in a thread. The ETag is kept on ``request.conditional_etag`` so a
+    response cache under the view only serves bodies rendered for it.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view_func(request, *args, **kwargs)
+            etag, last_modified = await sync_to_async(validators_func)(request, *args, **kwargs)
+            request.conditional_etag = etag
+            return await condition(
+                etag_func=lambda *a, **k: etag,
+                last_modified_func=lambda *a, **k: last_modified,
+            )(view_func)(request, *args, **kwargs)
+        return async_wrapped
+
+    @wraps(view_func)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        etag, last_modified = validators_func(request, *args, **kwargs)
+        request.conditional_etag = etag
+        return condition(
+            etag_func=lambda *a, **k: etag,
+            last_modified_func=lambda *a, **k: last_modified,
+        )(view_func)(request, *args, **kwargs)
+    return wrapped
+
+
+def conditional_response(validators_func):
+    """Decorator form of :func:`conditional_view` for function-based views."""
+    def decorator(view_func):
+        return conditional_view(view_func, validators_func)
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Send ETag/Last-Modified on GET and answer conditional requests with 304.
+
+    Views implement ``get_validators(request, *args, **kwargs)``.
+    """
+
+    def get_validators(self, request, *args, **kwargs):
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        return conditional_view(super().get, self.get_validators)(request, *args, **kwargs)
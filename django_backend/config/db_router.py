@@ -0,0 +1,117 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_pinned = ContextVar('db_primary_pinned', default=False)
+_wrote = ContextVar('db_primary_wrote', default=None)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def use_primary():
+    """Route every read in the block to the primary."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send reads to a random replica and writes to the primary.
+
+    Reads stay on the primary while pinned (see
+    :class:`ReplicaPinningMiddleware` and :func:`use_primary`) and
+    inside a transaction on the primary, which a replica cannot see.
+    Migrations only run on the primary; replicas copy its schema.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        wrote = _wrote.get()
+        if wrote is not None:
+            wrote.append(model)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaPinningMiddleware:
+    """Keep a client on the primary while and shortly after it writes.
+
+    Unsafe requests read from the primary. A request that wrote sets a
+    cookie that pins the client's following requests to the primary for
+    ``REPLICA_PIN_SECONDS``, so it reads its own writes despite
+    replication lag.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+        writes, tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(tokens)
+        return self.finish(response, writes)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        writes, tokens = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(tokens)
+        return self.finish(response, writes)
+
+    def start(self, request):
+        pinned = request.method not in SAFE_METHODS or self._cookie_pinned(request)
+        writes = []
+        return writes, (_pinned.set(pinned), _wrote.set(writes))
+
+    def stop(self, tokens):
+        _pinned.reset(tokens[0])
+        _wrote.reset(tokens[1])
+
+    def finish(self, response, writes):
+        if writes:
+            seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+            response.set_cookie(PIN_COOKIE, str(int(time.time() + seconds)), max_age=seconds, httponly=True, samesite='Lax')
+        return response
+
+    def _cookie_pinned(self, request):
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
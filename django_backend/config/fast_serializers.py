@@ -0,0 +1,144 @@
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from .instrumentation import timed
+from .sparse_fields import restrict_fields
+
+# Fields whose to_representation() returns database values unchanged, so the
+# fast path can copy them without a call.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+
+
+class ValuesSerializer:
+    """Serialize ``values()`` rows into the same JSON as a ModelSerializer.
+
+    The field tree of ``serializer_class`` is walked once and compiled into
+    a flat plan of ``(key, lookup, converter)`` steps, where nested
+    serializers become ``__`` lookups on the same query. Rendering a row
+    is then a loop over that plan: no serializer instances, no field
+    binding and no model instances per row.
+
+    ``nested`` maps field names that the serializer computes itself (for
+    example a SerializerMethodField) to the serializer class describing
+    their output.
+    """
+
+    # Compiled plans for distinct ?fields= selections are kept up to this many.
+    max_restrictions = 128
+
+    def __init__(self, serializer_class, nested=None, sparse=None):
+        self.serializer_class = serializer_class
+        self.nested = nested or {}
+        self.sparse = sparse
+        self._plan = None
+        self._lookups = None
+        self._restrictions = {}
+
+    def restrict(self, sparse):
+        """Return a ValuesSerializer for the :class:`SparseFields` selection."""
+        if sparse is None:
+            return self
+        restricted = self._restrictions.get(sparse.key)
+        if restricted is None:
+            restricted = ValuesSerializer(self.serializer_class, self.nested, sparse)
+            restricted._ensure_compiled()
+            if len(self._restrictions) >= self.max_restrictions:
+                self._restrictions.clear()
+            self._restrictions[sparse.key] = restricted
+        return restricted
+
+    def _compile(self, serializer, prefix, nested, lookups, spec=None, expand=(), path=''):
+        plan = []
+        fields = serializer.fields
+        if spec is not None:
+            restrict_fields(fields, spec, path)
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+            if name in nested or isinstance(field, serializers.BaseSerializer):
+                if getattr(field, 'many', False):
+                    raise ImproperlyConfigured(f'{name}: many=True fields are not supported')
+                child = nested[name]() if name in nested else field
+                source = name if name in nested else field.source
+                selection = True if spec is None else spec[name]
+                if selection is True and spec is not None and name not in expand:
+                    # Selected but not expanded: render the related id.
+                    lookups.append(prefix + source)
+                    plan.append((name, prefix + source, None))
+                    continue
+                child_spec = selection if isinstance(selection, dict) else None
+                child_plan = self._compile(child, f'{prefix}{source}__', {}, lookups, child_spec, (), f'{path}{name}.')
+                plan.append((name, child_plan, None))
+            elif field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+                raise ImproperlyConfigured(f'{name}: pass its output serializer in nested')
+            else:
+                lookup = prefix + field.source.replace('.', '__')
+                converter = None if self._is_passthrough(field) else field.to_representation
+                lookups.append(lookup)
+                plan.append((name, lookup, converter))
+        return plan
+
+    def _is_passthrough(self, field):
+        if isinstance(field, serializers.JSONField):
+            return not field.binary
+        return isinstance(field, PASSTHROUGH_FIELDS)
+
+    def _ensure_compiled(self):
+        # Compiled on first use: serializer fields need the app registry.
+        if self._plan is None:
+            lookups = []
+            spec, expand = (self.sparse.spec, self.sparse.expand) if self.sparse else (None, ())
+            self._plan = self._compile(self.serializer_class(), '', self.nested, lookups, spec, expand)
+            self._lookups = lookups
+
+    @property
+    def plan(self):
+        self._ensure_compiled()
+        return self._plan
+
+    @property
+    def lookups(self):
+        self._ensure_compiled()
+        return list(self._lookups)
+
+    def values(self, queryset, *extra):
+        """Return ``queryset`` as ``values()`` dicts carrying every needed column."""
+        lookups = self.lookups
+        for name in extra:
+            if name not in lookups:
+                lookups.append(name)
+        return queryset.values(*lookups)
+
+    def _render(self, plan, row, memo):
+        data = {}
+        for name, lookup, converter in plan:
+            if isinstance(lookup, list):
+                data[name] = self._render(lookup, row, memo)
+                continue
+            value = row[lookup]
+            if converter is not None and value is not None:
+                # Rows repeat the same joined values (a university's
+                # timestamps, common fees), so convert each value once.
+                key = (lookup, value)
+                try:
+                    value = memo[key]
+                except KeyError:
+                    value = memo[key] = converter(value)
+                except TypeError:
+                    value = converter(value)
+            data[name] = value
+        return data
+
+    def to_representation(self, row):
+        with timed('serialize'):
+            return self._render(self.plan, row, {})
+
+    def serialize(self, rows):
+        plan, memo = self.plan, {}
+        with timed('serialize'):
+            return [self._render(plan, row, memo) for row in rows]
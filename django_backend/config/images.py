@@ -0,0 +1,267 @@
+import hashlib
+import http.client
+import ipaddress
+import logging
+import os
+import socket
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+from rest_framework import serializers
+from .response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height); thumbnails are cropped to fill the box.
+VARIANTS = {
+    'card': (480, 270),
+    'detail': (1200, 630),
+}
+# format -> (file extension, Pillow save options)
+FORMATS = {
+    'webp': ('webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+FETCH_TIMEOUT = 10
+
+
+class ImageError(Exception):
+    pass
+
+
+def image_root():
+    return Path(settings.MEDIA_ROOT) / 'images'
+
+
+def _is_public(address):
+    address = ipaddress.ip_address(address.split('%', 1)[0])
+    return address.is_global and not address.is_multicast
+
+
+def _public_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    # Connects only to the addresses it checked, so a host cannot resolve
+    # to a public address for the check and a private one for the request.
+    host, port = address
+    try:
+        resolved = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError as exc:
+        raise ImageError(f'Could not resolve {host}: {exc}') from exc
+    if not resolved or not all(_is_public(sockaddr[0]) for *_, sockaddr in resolved):
+        raise ImageError(f'{host} does not resolve to a public address')
+    error = None
+    for *_, sockaddr in resolved:
+        try:
+            return socket.create_connection(sockaddr[:2], timeout, source_address)
+        except OSError as exc:
+            error = exc
+    raise error
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _public_connection
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _public_connection
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+def _opener():
+    # Only http(s), without environment proxies; redirects are followed
+    # through the same checks.
+    opener = urllib.request.OpenerDirector()
+    for handler in (
+        _PublicHTTPHandler(), _PublicHTTPSHandler(), urllib.request.HTTPRedirectHandler(),
+        urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor(),
+    ):
+        opener.add_handler(handler)
+    return opener
+
+
+def fetch_url(url):
+    """Download the source image at an http(s) ``url`` on a public address.
+
+    Sources are user-supplied, so other schemes, local files and hosts on
+    private, loopback or link-local networks are refused. IMAGE_FETCHER
+    points tests and benchmarks at local fixtures instead.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ImageError(f'{url} is not an http(s) URL')
+    request = urllib.request.Request(url, headers={'User-Agent': 'EduConnect-images/1.0'})
+    try:
+        with _opener().open(request, timeout=FETCH_TIMEOUT) as response:
+            data = response.read(MAX_SOURCE_BYTES + 1)
+    except OSError as exc:
+        raise ImageError(f'Could not fetch {url}: {exc}') from exc
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ImageError(f'{url} is larger than {MAX_SOURCE_BYTES} bytes')
+    return data
+
+
+def get_fetcher():
+    # IMAGE_FETCHER swaps the network out, for example in tests or benchmarks.
+    return import_string(getattr(settings, 'IMAGE_FETCHER', 'config.images.fetch_url'))
+
+
+def content_key(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def variant_path(key, variant, image_format):
+    return image_root() / key[:2] / key / f'{variant}.{FORMATS[image_format][0]}'
+
+
+def variant_urls(key):
+    """Map each variant to its URL per format, or ``None`` without a key."""
+    if not key:
+        return None
+    base = f'{settings.MEDIA_URL}images/{key[:2]}/{key}'
+    return {
+        variant: {image_format: f'{base}/{variant}.{extension}' for image_format, (extension, _) in FORMATS.items()}
+        for variant in VARIANTS
+    }
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}')
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def render_variants(data):
+    """Write every variant of the image ``data`` and return its content key.
+
+    Files are addressed by the hash of the source bytes, so the same image
+    used by many rows is stored once and rendering it again is a no-op.
+    """
+    key = content_key(data)
+    paths = {(variant, image_format): variant_path(key, variant, image_format)
+             for variant in VARIANTS for image_format in FORMATS}
+    if all(path.exists() for path in paths.values()):
+        return key
+    try:
+        source = Image.open(BytesIO(data))
+        source = ImageOps.exif_transpose(source)
+        source = source.convert('RGB')
+    except (OSError, SyntaxError, ValueError) as exc:
+        raise ImageError(f'Not a readable image: {exc}') from exc
+    for variant, size in VARIANTS.items():
+        thumbnail = ImageOps.fit(source, size, Image.Resampling.LANCZOS)
+        for image_format, (_, options) in FORMATS.items():
+            buffer = BytesIO()
+            thumbnail.save(buffer, image_format.upper(), **options)
+            _write_atomic(paths[variant, image_format], buffer.getvalue())
+    return key
+
+
+def render_url(url):
+    return render_variants(get_fetcher()(url))
+
+
+def record_key(queryset, url, key):
+    """Point the rows of ``queryset`` still using ``url`` at the variants ``key``.
+
+    ``updated_at`` moves so their ETags change.
+    """
+    return queryset.filter(image_url=url).update(image_key=key, image_source=url, updated_at=timezone.now())
+
+
+def process_row(model, pk, url):
+    key = render_url(url)
+    record_key(model.objects.filter(pk=pk), url, key)
+    return key
+
+
+class ImageVariantsField(serializers.Field):
+    """Read-only ``{variant: {format: url}}`` built from an ``image_key`` column."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'image_key')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return variant_urls(value)
+
+
+def clear_stale_key(instance):
+    """Drop the variants of an instance whose ``image_url`` changed (call before saving)."""
+    if instance.image_source != (instance.image_url or ''):
+        instance.image_key = ''
+        instance.image_source = ''
+
+
+class ImageWorkerPool:
+    """Background threads rendering variants for saved rows.
+
+    Pillow releases the GIL while decoding and resizing, so threads
+    overlap well. With ``IMAGE_WORKERS = 0`` work runs inline.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix='images')
+            return self._executor
+
+    def schedule(self, instance, tags):
+        """Queue ``instance`` once the current transaction commits, if its variants are stale."""
+        url = instance.image_url
+        if not url or instance.image_source == url:
+            return
+        model, pk = type(instance), instance.pk
+        if settings.IMAGE_WORKERS:
+            transaction.on_commit(lambda: self.executor.submit(self._run_in_worker, model, pk, url, tags))
+        else:
+            transaction.on_commit(lambda: self._run(model, pk, url, tags))
+
+    def _run_in_worker(self, model, pk, url, tags):
+        close_old_connections()
+        try:
+            self._run(model, pk, url, tags)
+        finally:
+            close_old_connections()
+
+    def _run(self, model, pk, url, tags):
+        try:
+            process_row(model, pk, url)
+        except ImageError as exc:
+            logger.warning('Image for %s %s failed: %s', model._meta.label, pk, exc)
+            return
+        except Exception:
+            logger.exception('Image for %s %s failed', model._meta.label, pk)
+            return
+        response_cache.invalidate(*tags)
+
+
+image_workers = ImageWorkerPool()
@@ -0,0 +1,246 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    """Query count, DB time and named timings collected for one request."""
+
+    def __init__(self):
+        self.view_name = None
+        self.budget = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = {}
+        self.total = 0.0
+        self._active = set()
+        # Async views may run queries for one request on several threads.
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.queries += 1
+                self.db_time += elapsed
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.queries > self.budget
+
+
+def current_metrics():
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    """Make ``connection`` report its queries to the current request's metrics.
+
+    The recorder stays installed and looks the metrics up in a context
+    variable, which follows a request into the threads that async views
+    run their queries on. It goes first so that temporary wrappers,
+    which are popped off the end, never remove it.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to the current request's ``name`` timing.
+
+    Nested blocks with the same name are counted once, so a list
+    serializer and its per-row children do not add up twice.
+    """
+    metrics = _current.get()
+    if metrics is None or name in metrics._active:
+        yield
+        return
+    metrics._active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._active.discard(name)
+        metrics.timings[name] = metrics.timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def query_budget(budget):
+    """Declare the most queries a function-based view may run per request.
+
+    ``budget`` is an int or a ``{method: int}`` dict. Apply it outside
+    ``@api_view``; class-based views set a ``query_budget`` attribute.
+    """
+    def decorator(view_func):
+        view_func.query_budget = budget
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func, method):
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view_func, 'view_class', None), 'query_budget', None)
+    if isinstance(budget, dict):
+        budget = budget.get(method)
+    return budget
+
+
+class EndpointStats:
+    """Per-view aggregates of the metrics of this process's requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, metrics):
+        with self._lock:
+            entry = self._stats.setdefault(metrics.view_name, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0,
+                'serialize_ms': 0.0, 'total_ms': 0.0, 'max_total_ms': 0.0,
+                'budget': None, 'over_budget': 0,
+            })
+            total_ms = metrics.total * 1000
+            entry['requests'] += 1
+            entry['queries'] += metrics.queries
+            entry['max_queries'] = max(entry['max_queries'], metrics.queries)
+            entry['db_ms'] += metrics.db_time * 1000
+            entry['serialize_ms'] += metrics.timings.get('serialize', 0.0) * 1000
+            entry['total_ms'] += total_ms
+            entry['max_total_ms'] = max(entry['max_total_ms'], total_ms)
+            entry['budget'] = metrics.budget
+            entry['over_budget'] += metrics.over_budget
+
+    def snapshot(self):
+        with self._lock:
+            stats = {name: dict(entry) for name, entry in self._stats.items()}
+        for entry in stats.values():
+            requests = entry['requests']
+            for name in ('queries', 'db_ms', 'serialize_ms', 'total_ms'):
+                entry[f'avg_{name}'] = round(entry.pop(name) / requests, 3)
+            entry['max_total_ms'] = round(entry['max_total_ms'], 3)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+endpoint_stats = EndpointStats()
+
+
+class InstrumentationMiddleware:
+    """Record query count, DB time, serializer time and latency per view.
+
+    Adds a ``Server-Timing`` header when ``SERVER_TIMING`` is on, keeps
+    per-view aggregates for :func:`instrumentation_stats`, and logs
+    requests that run more queries than their view's ``query_budget``;
+    with ``QUERY_BUDGET_STRICT`` they raise :class:`QueryBudgetExceeded`.
+    The metrics are also attached to the response as ``response.metrics``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(metrics, token, started)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(metrics, token, started)
+        return self.finish(request, response, metrics)
+
+    def start(self):
+        # Connections opened before this module was imported missed the signal.
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        metrics = RequestMetrics()
+        return metrics, _current.set(metrics), time.perf_counter()
+
+    def stop(self, metrics, token, started):
+        metrics.total = time.perf_counter() - started
+        _current.reset(token)
+
+    def finish(self, request, response, metrics):
+        if metrics.view_name is not None:
+            endpoint_stats.record(metrics)
+            if metrics.over_budget:
+                message = (
+                    f'{request.method} {request.path} ran {metrics.queries} queries, '
+                    f'over the budget of {metrics.budget} for {metrics.view_name}'
+                )
+                if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+        if getattr(settings, 'SERVER_TIMING', False):
+            response['Server-Timing'] = self.server_timing(metrics)
+        response.metrics = metrics
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            match = request.resolver_match
+            metrics.view_name = (match.view_name if match else None) or view_func.__name__
+            metrics.budget = get_query_budget(view_func, request.method)
+
+    def server_timing(self, metrics):
+        parts = [f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"']
+        for name, seconds in sorted(metrics.timings.items()):
+            parts.append(f'{name};dur={seconds * 1000:.2f}')
+        parts.append(f'total;dur={metrics.total * 1000:.2f}')
+        return ', '.join(parts)
+
+
+@query_budget(2)
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def instrumentation_stats(request):
+    if request.method == 'DELETE':
+        endpoint_stats.reset()
+    return Response(endpoint_stats.snapshot())
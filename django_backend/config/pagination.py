@@ -0,0 +1,226 @@
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Page
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .async_views import gather_queries
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset pagination over the view's active ordering.
+
+    The cursor stores the ordering values of the last row served, and the
+    next page is fetched with a ``WHERE (ordering) > (cursor)`` condition
+    instead of an OFFSET, so every page costs the same regardless of
+    depth. An ``id`` tiebreak keeps the order total, and NULLs always
+    sort last so nullable columns such as ``fees`` page correctly.
+
+    The total count is only computed when ``count=true`` is passed.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count = queryset.count()
+
+        queryset = queryset.order_by(*[
+            F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+            for field, descending in self.ordering
+        ])
+        position = self.decode_cursor(request, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.build_after_condition(self.ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or ['-id']
+        if isinstance(ordering, str):
+            ordering = [ordering]
+
+        fields = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        if not any(field in ('id', 'pk') for field, _ in fields):
+            fields.append(('id', fields[0][1]))
+        return fields
+
+    def build_after_condition(self, ordering, position):
+        (field, descending), value = ordering[0], position[0]
+        rest = None
+        if len(ordering) > 1:
+            rest = self.build_after_condition(ordering[1:], position[1:])
+
+        if value is None:
+            # NULLs sort last, so only NULL rows further along can follow.
+            condition = Q(**{f'{field}__isnull': True})
+            return condition & rest if rest is not None else condition
+
+        lookup = 'lt' if descending else 'gt'
+        condition = Q(**{f'{field}__{lookup}': value}) | Q(**{f'{field}__isnull': True})
+        if rest is not None:
+            condition |= Q(**{field: value}) & rest
+        return condition
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            position = json.loads(urlsafe_b64decode(padded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return [self._decode_value(queryset, field, value) for (field, _), value in zip(self.ordering, position)]
+
+    def _decode_value(self, queryset, field, value):
+        # Cursors come back from clients: anything but a value of the column's type is refused.
+        if value is None:
+            return None
+        if isinstance(value, (bool, list, dict)) or (isinstance(value, float) and not math.isfinite(value)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            model_field = queryset.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            # Annotations such as search_rank are numbers.
+            if not isinstance(value, (int, float)):
+                raise NotFound(self.invalid_cursor_message)
+            return value
+        try:
+            return model_field.to_python(value)
+        except (TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        position = [self._encode_value(self._get_value(instance, field)) for field, _ in self.ordering]
+        raw = json.dumps(position, separators=(',', ':')).encode('ascii')
+        return urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def _get_value(self, instance, field):
+        # Pages may hold model instances or values() dicts.
+        if isinstance(instance, dict):
+            return instance[field]
+        return getattr(instance, field)
+
+    def _encode_value(self, value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        fields = [('next', self.get_next_link())]
+        if self.count is not None:
+            fields.append(('count', self.count))
+        fields.append(('results', data))
+        return Response(OrderedDict(fields))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+
+class CatalogPagination(PageNumberPagination):
+    """Page-number pagination that switches to keyset pagination on request.
+
+    Clients opt in with ``pagination=cursor`` (or by sending a ``cursor``
+    they were given); everything else keeps the default page numbers.
+    """
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (request.query_params.get(self.mode_query_param) == 'cursor'
+                or self.keyset_class.cursor_query_param in request.query_params):
+            self.keyset = self.keyset_class()
+            page = self.keyset.paginate_queryset(queryset, request, view)
+            self.keyset.base_url = replace_query_param(
+                remove_query_param(self.keyset.base_url, 'page'),
+                self.mode_query_param,
+                'cursor',
+            )
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async :meth:`paginate_queryset` that counts and fetches a numbered page concurrently."""
+        page_number = request.query_params.get(self.page_query_param) or '1'
+        page_size = self.get_page_size(request)
+        if (self.keyset_class.cursor_query_param in request.query_params
+                or request.query_params.get(self.mode_query_param) == 'cursor'
+                or not page_size or not page_number.isdigit() or int(page_number) < 1):
+            return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+        self.keyset = None
+        self.request = request
+        number = int(page_number)
+        offset = (number - 1) * page_size
+        count, rows = await gather_queries(queryset.count, lambda: list(queryset[offset:offset + page_size]))
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = count
+        try:
+            paginator.validate_number(number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page = Page(rows, number, paginator)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from django.db.models import Count, Max
+
+
+def table_version(queryset, field='updated_at'):
+    """``(row count, latest field)``, which moves when rows are added, deleted or saved."""
+    aggregate = queryset.order_by().aggregate(count=Count('pk'), latest=Max(field))
+    return aggregate['count'], aggregate['latest']
+
+
+class ProcessIndex:
+    """A structure built from the database and held in each process's memory.
+
+    ``loader`` builds it on first use. ``version`` returns a value read
+    from the database that changes with the data the index is built from;
+    every process compares it at most once per ``check_interval`` seconds
+    and rebuilds when it moved, so changes made by other processes (web
+    workers, management commands) are picked up without a shared cache.
+    :meth:`invalidate` makes this process check on its next call. A
+    process rebuilds at most once per ``rebuild_interval`` seconds, so a
+    burst of changes costs one rebuild.
+    """
+
+    def __init__(self, version, loader, check_interval=30, rebuild_interval=0):
+        self.version = version
+        self.loader = loader
+        self.check_interval = check_interval
+        self.rebuild_interval = rebuild_interval
+        self._value = None
+        self._version = None
+        self._checked = None
+        self._built = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < self.check_interval:
+            return self._value
+        with self._lock:
+            version = self.version()
+            if self._value is None or (version != self._version and now - self._built >= self.rebuild_interval):
+                self._value = self.loader()
+                self._version = version
+                self._built = now
+            self._checked = now
+        return self._value
+
+    def invalidate(self):
+        self._checked = None
@@ -0,0 +1,258 @@
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from .async_views import json_response
+from .instrumentation import query_budget
+
+# Every entry also depends on this tag, so bulk changes that bypass the
+# model signals can drop the whole cache with one version bump.
+CATALOG_TAG = 'catalog'
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+
+class ResponseCache:
+    """Cache of serialized API payloads with tag-based invalidation.
+
+    Every entry records the version of each tag it depends on (for
+    example ``course:12`` and ``university:3``). Invalidating a tag bumps
+    its version, so any entry that recorded an older version is treated
+    as a miss on its next read. This keeps invalidation O(1) per tag.
+
+    Entries also carry the ETag of their payload, so a cached body is
+    never sent under an ETag computed for different data.
+
+    Invalidations only reach the processes sharing the cache backend:
+    with the per-process default, ``RESPONSE_CACHE_ENABLED`` is off
+    unless there is a single worker (see settings).
+    """
+
+    def __init__(self, alias=None, timeout=None):
+        self.alias = alias or getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+        self.timeout = timeout or getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'RESPONSE_CACHE_ENABLED', True)
+
+    def make_key(self, namespace, request, kwargs=None):
+        # DRF requests and the plain Django requests of async views share keys.
+        query_params = getattr(request, 'query_params', request.GET)
+        params = []
+        for name in sorted(query_params):
+            values = sorted(value.strip() for value in query_params.getlist(name) if value.strip())
+            if values:
+                params.append(f'{name}={",".join(values)}')
+        path_args = ','.join(f'{name}={value}' for name, value in sorted((kwargs or {}).items()))
+        raw = f'{request.get_host()}|{path_args}|{"&".join(params)}'
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return f'response-cache:{namespace}:{digest}'
+
+    def _tag_key(self, tag):
+        return f'response-cache:tag:{tag}'
+
+    def _tag_versions(self, tags):
+        keys = {self._tag_key(tag): tag for tag in tags}
+        found = self.cache.get_many(list(keys))
+        versions = {}
+        for key, tag in keys.items():
+            if key not in found:
+                # Seed from the clock so a tag that was evicted and
+                # re-created can never repeat a version seen before.
+                self.cache.add(key, time.time_ns(), None)
+                found[key] = self.cache.get(key)
+            versions[tag] = found[key]
+        return versions
+
+    def lookup(self, key, etag=None):
+        """Return ``(data, etag)`` of a current entry, or ``(None, None)``.
+
+        With ``etag``, entries stored under another ETag are misses.
+        """
+        if not self.enabled:
+            return None, None
+        entry = self.cache.get(key)
+        if (
+            entry is not None
+            and (etag is None or entry['etag'] == etag)
+            and self._tag_versions(entry['tags']) == entry['tags']
+        ):
+            self._count(HITS_KEY)
+            return entry['data'], entry['etag']
+        self._count(MISSES_KEY)
+        return None, None
+
+    def get(self, key):
+        return self.lookup(key)[0]
+
+    def set(self, key, data, tags, etag=None):
+        """Store ``data`` and return its ETag, derived from the payload unless given."""
+        if etag is None:
+            etag = payload_etag(data)
+        if self.enabled:
+            entry = {'data': data, 'etag': etag, 'tags': self._tag_versions([CATALOG_TAG, *tags])}
+            self.cache.set(key, entry, self.timeout)
+        return etag
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            try:
+                self.cache.incr(self._tag_key(tag))
+            except ValueError:
+                # Never-seen tag: no entry can depend on it yet.
+                pass
+
+    def invalidate_all(self):
+        self.invalidate(CATALOG_TAG)
+
+    def _count(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 0, None)
+            self.cache.incr(key)
+
+    def stats(self):
+        counters = self.cache.get_many([HITS_KEY, MISSES_KEY])
+        hits = counters.get(HITS_KEY, 0)
+        misses = counters.get(MISSES_KEY, 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+        }
+
+    def reset_stats(self):
+        self.cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+response_cache = ResponseCache()
+
+
+def payload_etag(data):
+    return '"%s"' % hashlib.sha1(JSONRenderer().render(data)).hexdigest()
+
+
+def _resolve_tags(tags, data, kwargs):
+    if callable(tags):
+        return tags(data, **kwargs)
+    return tags
+
+
+def _validator_etag(request):
+    # Set by config.conditional when the view also has validators.
+    return getattr(request, 'conditional_etag', None)
+
+
+def _with_etag(request, response, etag):
+    response = get_conditional_response(request, etag=etag) or response
+    response['ETag'] = etag
+    return response
+
+
+def _cached_response(request, data, etag, build):
+    return _with_etag(request, build(data), etag)
+
+
+def _fresh_response(request, response, etag):
+    return response if etag is None else _with_etag(request, response, etag)
+
+
+def cache_response(namespace, tags):
+    """Cache successful GET responses of a function-based API view.
+
+    ``tags`` is either a list of tags or a callable receiving the response
+    data and the URL kwargs and returning the tags. Coroutine views must
+    return responses with a ``data`` attribute, as ``json_response`` does.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            return _async_cache_response(view_func, namespace, tags)
+
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+            key = response_cache.make_key(namespace, request, kwargs)
+            data, etag = response_cache.lookup(key, _validator_etag(request))
+            if data is not None:
+                return _cached_response(request, data, etag, Response)
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                etag = response_cache.set(key, response.data, _resolve_tags(tags, response.data, kwargs), _validator_etag(request))
+            return _fresh_response(request, response, etag)
+        return wrapped
+    return decorator
+
+
+def _async_cache_response(view_func, namespace, tags):
+    @wraps(view_func)
+    async def wrapped(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await view_func(request, *args, **kwargs)
+        key = response_cache.make_key(namespace, request, kwargs)
+        data, etag = await sync_to_async(response_cache.lookup)(key, _validator_etag(request))
+        if data is not None:
+            return _cached_response(request, data, etag, json_response)
+        response = await view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            # Tag callables may query the database.
+            def store():
+                return response_cache.set(key, response.data, _resolve_tags(tags, response.data, kwargs), _validator_etag(request))
+            etag = await sync_to_async(store)()
+        return _fresh_response(request, response, etag)
+    return wrapped
+
+
+class CachedResponseMixin:
+    """Cache successful GET responses of a generic API view.
+
+    Views set ``cache_namespace`` and either ``cache_tags`` or override
+    ``get_cache_tags``. Responses carry the entry's ETag and matching
+    ``If-None-Match`` requests get a 304.
+    """
+    cache_namespace = None
+    cache_tags = ()
+
+    def get_cache_tags(self, data):
+        return list(self.cache_tags)
+
+    def get(self, request, *args, **kwargs):
+        key = response_cache.make_key(self.cache_namespace, request, kwargs)
+        data, etag = response_cache.lookup(key, _validator_etag(request))
+        if data is not None:
+            return _cached_response(request, data, etag, Response)
+        response = super().get(request, *args, **kwargs)
+        etag = None
+        if response.status_code == 200:
+            etag = response_cache.set(key, response.data, self.get_cache_tags(response.data), _validator_etag(request))
+        return _fresh_response(request, response, etag)
+
+
+@query_budget(2)
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def response_cache_stats(request):
+    """Hit/miss counters of the response cache, as seen by the server.
+
+    Without a shared cache they are counted per worker process, and this
+    reports the process that answered.
+    """
+    stats = response_cache.stats()
+    if request.method == 'DELETE':
+        response_cache.reset_stats()
+    return Response(dict(stats, shared=settings.SHARED_CACHE))
@@ -26,6 +26,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.instrumentation.InstrumentationMiddleware',
+    'config.db_router.ReplicaPinningMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,6 +57,9 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+# The ASGI application serves the hot read paths with async views.
+ASGI_URLCONF = 'config.asgi_urls'
 
 DATABASES = {
     'default': {
@@ -64,9 +69,78 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Workers keep their connection between requests and check it before reuse.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas (config.db_router): comma-separated hosts that share the
+# primary's name and credentials. Safe reads go to a replica; writes, and
+# a client's reads for REPLICA_PIN_SECONDS after it writes, go to default.
+DB_REPLICA_HOSTS = [host.strip() for host in config('DB_REPLICA_HOSTS', default='').split(',') if host.strip()]
+for index, host in enumerate(DB_REPLICA_HOSTS, start=1):
+    DATABASES[f'replica{index}'] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['config.db_router.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+REDIS_URL = config('REDIS_URL', default='')
+
+# Local memory is per process; point REDIS_URL at a shared Redis so that
+# invalidations reach every worker.
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'responses',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'responses',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+
+# Without a shared cache, invalidations stay in the process that made
+# them, so the response cache is only on when one process serves
+# requests (main.py exports WEB_CONCURRENCY).
+SHARED_CACHE = bool(REDIS_URL)
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=SHARED_CACHE or WEB_CONCURRENCY == 1, cast=bool)
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Request instrumentation (config.instrumentation): Server-Timing headers,
+# and whether exceeding a view's query budget raises instead of logging.
+SERVER_TIMING = config('SERVER_TIMING', default=DEBUG, cast=bool)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+
+AUTH_USER_MODEL = 'users.CustomUser'
+
+# With a shared cache, sessions and the authenticated user are read from
+# it and only fall back to the database on a miss. Per-process caches
+# would keep serving a session or user that another worker logged out or
+# changed, so without REDIS_URL both are read from the database.
+SESSION_ENGINE = config(
+    'SESSION_ENGINE',
+    default='django.contrib.sessions.backends.cached_db' if SHARED_CACHE else 'django.contrib.sessions.backends.db',
+)
+AUTHENTICATION_BACKENDS = ['users.auth.CachedModelBackend' if SHARED_CACHE else 'django.contrib.auth.backends.ModelBackend']
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -90,6 +164,14 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+MEDIA_URL = config('MEDIA_URL', default='/media/')
+MEDIA_ROOT = config('MEDIA_ROOT', default=os.path.join(BASE_DIR, 'media'))
+
+# Thumbnail rendering (config.images): background threads per process, 0
+# renders inline. IMAGE_FETCHER is the dotted path of the source reader.
+IMAGE_WORKERS = config('IMAGE_WORKERS', default=2, cast=int)
+IMAGE_FETCHER = config('IMAGE_FETCHER', default='config.images.fetch_url')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
@@ -100,7 +182,9 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    'PAGE_SIZE': 20,
+    # CourseFilter uses ?format= for the course format, not the renderer.
+    'URL_FORMAT_OVERRIDE': None,
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -0,0 +1,120 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from .instrumentation import timed
+
+
+class SparseFields:
+    """Field selection parsed from ``?fields=`` and ``?expand=``.
+
+    ``fields`` is a comma separated list of output fields; dotted names
+    select fields of a nested object (``university.name``). A nested
+    object named without a dot is rendered as its id unless it is also
+    listed in ``expand`` or has dotted selections. Without ``fields`` the
+    default payload is returned unchanged.
+    """
+    fields_param = 'fields'
+    expand_param = 'expand'
+
+    def __init__(self, spec, expand):
+        self.spec = spec
+        self.expand = expand
+        self.key = self._canonical(spec) + '|' + ','.join(sorted(expand))
+
+    @classmethod
+    def from_request(cls, request):
+        raw = request.query_params.get(cls.fields_param, '')
+        names = [name.strip() for name in raw.split(',') if name.strip()]
+        if not names:
+            return None
+        expand = {
+            name.strip() for name in request.query_params.get(cls.expand_param, '').split(',') if name.strip()
+        }
+        spec = {}
+        for name in names:
+            node = spec
+            parts = name.split('.')
+            for part in parts[:-1]:
+                child = node.get(part)
+                if not isinstance(child, dict):
+                    child = node[part] = {}
+                node = child
+            node.setdefault(parts[-1], True)
+        return cls(spec, expand)
+
+    def _canonical(self, spec):
+        parts = []
+        for name in sorted(spec):
+            value = spec[name]
+            parts.append(name if value is True else f'{name}({self._canonical(value)})')
+        return ','.join(parts)
+
+    def child(self, name):
+        """Return the selection for nested ``name``: a dict, True (all) or None (id only)."""
+        value = self.spec[name]
+        if isinstance(value, dict):
+            return value
+        return True if name in self.expand else None
+
+
+def restrict_fields(fields, spec, path=''):
+    """Drop entries of a serializer's ``fields`` not selected by ``spec``."""
+    unknown = [name for name in spec if name not in fields]
+    if unknown:
+        raise ParseError(f"Unknown fields: {', '.join(path + name for name in unknown)}")
+    for name in list(fields):
+        if name not in spec:
+            fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """Serializer mixin applying the ``sparse_fields`` context entry."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        sparse = self.context.get('sparse_fields')
+        if sparse is None:
+            return
+        restrict_fields(self.fields, sparse.spec)
+        for name, field in list(self.fields.items()):
+            if not isinstance(field, serializers.BaseSerializer):
+                continue
+            selection = sparse.child(name)
+            if selection is None:
+                self.fields[name] = serializers.IntegerField(source=f'{field.source}_id', read_only=True)
+            elif isinstance(selection, dict):
+                restrict_fields(field.fields, selection, f'{name}.')
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
+
+
+class SparseFieldsViewMixin:
+    """Apply ``?fields=``/``?expand=`` to a view's serializer and queryset.
+
+    ``values_serializer`` is the :class:`ValuesSerializer` describing the
+    full payload; its restricted lookups become the ``.only()`` columns so
+    unrequested columns are never read from the database.
+    """
+    values_serializer = None
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = SparseFields.from_request(self.request)
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'GET':
+            context['sparse_fields'] = self.get_sparse_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        sparse = self.get_sparse_fields() if self.request.method == 'GET' else None
+        if sparse is None:
+            return queryset
+        lookups = self.values_serializer.restrict(sparse).lookups
+        if not any('__' in lookup for lookup in lookups):
+            queryset = queryset.select_related(None)
+        return queryset.only(*lookups)
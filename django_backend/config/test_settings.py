@@ -0,0 +1,21 @@
+"""Settings for the test suite: ``python manage.py test --settings=config.test_settings``.
+
+Tests run on SQLite. With ``TEST_DATABASE=postgresql`` they use the DB_*
+connection from the main settings instead, which also covers the
+PostgreSQL-only paths (full-text search, trigram indexes).
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, config
+
+if config('TEST_DATABASE', default='sqlite') == 'postgresql':
+    DATABASES = {'default': DATABASES['default']}
+else:
+    DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'test.sqlite3'}}
+
+# A mirror of the primary stands in for a read replica (config.db_router).
+# Reads only go to it in tests that list it in DATABASE_REPLICAS.
+DATABASES['replica1'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = []
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+IMAGE_WORKERS = 0
@@ -0,0 +1,35 @@
+from django.test import override_settings
+
+
+class QueryBudgetTestMixin:
+    """TestCase mixin checking responses against their view's query budget.
+
+    Requests made through the test client while the mixin is active also
+    fail immediately when they go over budget (``QUERY_BUDGET_STRICT``).
+    """
+
+    def setUp(self):
+        super().setUp()
+        strict = override_settings(QUERY_BUDGET_STRICT=True)
+        strict.enable()
+        self.addCleanup(strict.disable)
+
+    def assertWithinQueryBudget(self, response, budget=None):
+        metrics = getattr(response, 'metrics', None)
+        if metrics is None:
+            self.fail('Response carries no metrics; is InstrumentationMiddleware installed?')
+        budget = metrics.budget if budget is None else budget
+        if budget is None:
+            self.fail(f'{metrics.view_name} declares no query budget')
+        self.assertLessEqual(
+            metrics.queries, budget,
+            f'{metrics.view_name} ran {metrics.queries} queries, budget is {budget}',
+        )
+
+    def assertRequestWithinQueryBudget(self, method, path, data=None):
+        """Send a JSON request through the test client; it must succeed within its view's budget."""
+        extra = {} if method == 'get' else {'content_type': 'application/json'}
+        response = getattr(self.client, method)(path, data, **extra)
+        self.assertLess(response.status_code, 400, f'{method.upper()} {path}: {response.status_code}')
+        self.assertWithinQueryBudget(response)
+        return response
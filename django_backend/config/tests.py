@@ -0,0 +1,233 @@
+import io
+import json
+import socket
+import time
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from courses.models import Course
+from courses.serializers import CourseListSerializer, CourseSerializer, course_list_values, course_values
+from courses.tests import make_course, make_university
+from universities.models import University
+from users.models import SavedCourse
+from users.serializers import SavedCourseSerializer, saved_course_values
+from .db_router import PIN_COOKIE, use_primary
+from .images import ImageError, fetch_url
+from .response_cache import response_cache
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.course = make_course(make_university())
+
+    def test_cached_list_answers_its_etag_with_304(self):
+        first = self.client.get('/api/courses/')
+        self.assertIn('ETag', first)
+        second = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_list_etag_follows_the_body(self):
+        first = self.client.get('/api/courses/')
+        self.course.title = 'Applied Studies'
+        self.course.save()
+        second = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_entry_rendered_for_other_validators_is_a_miss(self):
+        url = f'/api/courses/{self.course.pk}/'
+        self.client.get(url)
+        # An edit whose invalidation this process never saw.
+        Course.objects.filter(pk=self.course.pk).update(
+            title='Applied Studies', updated_at=timezone.now() + timedelta(seconds=1),
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.json()['title'], 'Applied Studies')
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_disabled_cache_still_sends_etags(self):
+        first = self.client.get('/api/courses/')
+        self.assertFalse(response_cache.cache.has_key(response_cache.make_key('course-list', first.wsgi_request, {})))
+        second = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+
+class FetchUrlTests(TestCase):
+    def assertRefused(self, url):
+        with self.assertRaises(ImageError):
+            fetch_url(url)
+
+    def test_only_http_urls_are_fetched(self):
+        for url in ('/etc/passwd', 'file:///etc/passwd', 'ftp://example.com/a.png', 'http:///a.png'):
+            self.assertRefused(url)
+
+    def test_non_public_hosts_are_refused(self):
+        for host in ('127.0.0.1', 'localhost', '10.0.0.8', '192.168.1.1', '169.254.169.254', '[::1]', '0.0.0.0'):
+            with mock.patch('socket.create_connection') as connect:
+                self.assertRefused(f'http://{host}/image.png')
+            connect.assert_not_called()
+
+    def test_public_host_is_connected_to_at_the_checked_address(self):
+        resolved = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('93.184.215.14', 80))]
+        with mock.patch('socket.getaddrinfo', return_value=resolved), \
+                mock.patch('socket.create_connection', side_effect=ConnectionRefusedError) as connect:
+            self.assertRefused('http://images.example.com/image.png')
+        self.assertEqual(connect.call_args.args[0], ('93.184.215.14', 80))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTests(TransactionTestCase):
+    # TestCase would wrap every test in a transaction, which pins reads to the primary.
+    databases = {'default', 'replica1'}
+
+    def setUp(self):
+        response_cache.cache.clear()
+        self.course = make_course(make_university())
+
+    def read_aliases(self, method, path, data=None):
+        captured = {alias: CaptureQueriesContext(connections[alias]) for alias in ('default', 'replica1')}
+        with captured['default'], captured['replica1']:
+            response = getattr(self.client, method)(path, data, content_type='application/json')
+        self.assertLess(response.status_code, 400)
+        return {
+            alias for alias, queries in captured.items()
+            if any(query['sql'].startswith('SELECT') for query in queries)
+        }
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(Course.objects.all().db, 'replica1')
+        self.assertEqual(self.read_aliases('get', '/api/courses/'), {'replica1'})
+
+    def test_reads_in_a_transaction_go_to_the_primary(self):
+        with transaction.atomic():
+            self.assertEqual(Course.objects.all().db, 'default')
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(Course.objects.all().db, 'default')
+        self.assertEqual(Course.objects.all().db, 'replica1')
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        self.client.force_login(get_user_model().objects.create_user('ada', 'ada@example.com', 'secret'))
+        url = f'/api/courses/{self.course.pk}/'
+        self.assertEqual(self.read_aliases('patch', url, {'title': 'Applied Studies'}), {'default'})
+        self.assertIn(PIN_COOKIE, self.client.cookies)
+        self.assertEqual(self.read_aliases('get', url), {'default'})
+
+    def test_expired_or_malformed_pin_cookie_is_ignored(self):
+        for value in (str(int(time.time()) - 1), 'soon'):
+            response_cache.cache.clear()
+            self.client.cookies[PIN_COOKIE] = value
+            self.assertEqual(self.read_aliases('get', '/api/courses/'), {'replica1'})
+
+    def test_safe_requests_without_writes_set_no_cookie(self):
+        self.client.get('/api/courses/')
+        self.assertNotIn(PIN_COOKIE, self.client.cookies)
+
+
+@override_settings(ROOT_URLCONF='config.asgi_urls')
+class AsyncInterfaceTests(TransactionTestCase):
+    """The async middleware paths: metrics, replica pinning, pagination and the response cache."""
+    databases = {'default', 'replica1'}
+
+    def setUp(self):
+        response_cache.cache.clear()
+        university = make_university()
+        self.courses = [make_course(university, title=f'Course {number}') for number in range(3)]
+
+    async def test_list_matches_the_sync_view(self):
+        params = {'page': 1, 'page_size': 2, 'facets': 'true'}
+        response = await self.async_client.get('/api/courses/', params)
+        # The page, its count and the facets run on worker threads and still count.
+        self.assertGreaterEqual(response.metrics.queries, 3)
+        self.assertEqual(response.json()['count'], 3)
+        await response_cache.cache.aclear()
+        with override_settings(ROOT_URLCONF='config.urls'):
+            expected = await sync_to_async(self.client.get)('/api/courses/', params)
+        self.assertEqual(response.json(), expected.json())
+
+    async def test_cached_list_answers_its_etag_with_304(self):
+        first = await self.async_client.get('/api/courses/')
+        second = await self.async_client.get('/api/courses/', headers={'if-none-match': first['ETag']})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.metrics.queries, 0)
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_reads_follow_the_pin_cookie(self):
+        url = f'/api/courses/{self.courses[0].pk}/'
+        for cookie, alias in ((None, 'replica1'), (str(int(time.time()) + 60), 'default')):
+            response_cache.cache.clear()
+            if cookie:
+                self.async_client.cookies[PIN_COOKIE] = cookie
+            # The view's async ORM calls run on this thread, where the captures are.
+            captured = {name: CaptureQueriesContext(connections[name]) for name in ('default', 'replica1')}
+            with captured['default'], captured['replica1']:
+                response = async_to_sync(self.async_client.get)(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([name for name, queries in captured.items() if len(queries)], [alias])
+
+
+class ValuesSerializerParityTests(TestCase):
+    """The values() fast path renders the same JSON as the DRF serializers."""
+
+    def setUp(self):
+        university = make_university(established=1890, ranking=12)
+        University.objects.filter(pk=university.pk).update(image_key='ab' * 32)
+        make_course(university, title='Marine Biology', fees=12345.67, rating=4.5, credits=180, image_url='https://cdn.example.com/1.png')
+        make_course(university, title='Art History', description=None, application_deadline=None, rating=None)
+        Course.objects.filter(title='Art History').update(image_key='cd' * 32)
+        self.user = get_user_model().objects.create_user('ada', 'ada@example.com', 'secret')
+        for course in Course.objects.all():
+            SavedCourse.objects.create(user=self.user, course=course)
+
+    def assertSameJSON(self, fast, slow):
+        render = JSONRenderer().render
+        self.assertEqual(len(fast), 2)
+        self.assertEqual(json.loads(render(fast)), json.loads(render(slow)))
+        for fast_item, slow_item in zip(fast, slow):
+            self.assertEqual(list(fast_item), list(slow_item))
+
+    def test_course_serializers(self):
+        courses = Course.objects.select_related('university').order_by('id')
+        for values_serializer, serializer_class in ((course_values, CourseSerializer), (course_list_values, CourseListSerializer)):
+            with self.subTest(serializer_class.__name__):
+                fast = values_serializer.serialize(values_serializer.values(courses.order_by('id')))
+                self.assertSameJSON(fast, serializer_class(courses, many=True).data)
+
+    def test_saved_course_serializer(self):
+        saved = SavedCourse.objects.filter(user=self.user).order_by('id')
+        fast = saved_course_values.serialize(saved_course_values.values(saved))
+        self.assertSameJSON(fast, SavedCourseSerializer(saved.select_related('course__university'), many=True).data)
+
+
+class ResponseCacheStatsTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        make_course(make_university())
+        self.client.force_login(get_user_model().objects.create_superuser('root', 'root@example.com', 'secret'))
+
+    def test_endpoint_reports_the_server_counters(self):
+        self.client.get('/api/courses/')
+        self.client.get('/api/courses/')
+        stats = self.client.get('/api/instrumentation/response-cache/').json()
+        self.assertEqual((stats['hits'], stats['misses'], stats['shared']), (1, 1, False))
+        self.client.delete('/api/instrumentation/response-cache/')
+        self.assertEqual(self.client.get('/api/instrumentation/response-cache/').json()['hits'], 0)
+
+    def test_command_refuses_per_process_counters(self):
+        with self.assertRaises(CommandError):
+            call_command('response_cache_stats', stdout=mock.Mock())
+        with override_settings(SHARED_CACHE=True):
+            stdout = io.StringIO()
+            call_command('response_cache_stats', stdout=stdout)
+            self.assertIn('hit_rate', json.loads(stdout.getvalue()))
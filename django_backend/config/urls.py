@@ -1,10 +1,19 @@
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
+from config.instrumentation import instrumentation_stats
+from config.response_cache import response_cache_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('courses.urls')),
     path('api/', include('universities.urls')),
     path('api/', include('users.urls')),
+    path('api/instrumentation/stats/', instrumentation_stats, name='instrumentation-stats'),
+    path('api/instrumentation/response-cache/', response_cache_stats, name='response-cache-stats'),
 ]
+
+# Thumbnails are served by the web server in production.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,83 @@
+import logging
+import time
+from importlib import import_module
+from importlib.util import find_spec
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from rest_framework import serializers
+from .fast_serializers import ValuesSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def warm_urls():
+    # Building the reverse dict populates the whole resolver tree and imports every view.
+    return sum(len(get_resolver(urlconf).reverse_dict) for urlconf in (None, settings.ASGI_URLCONF))
+
+
+def warm_serializers():
+    """Build the field tree of every app model serializer and compile the values plans."""
+    count = 0
+    for app_config in apps.get_app_configs():
+        module_name = f'{app_config.name}.serializers'
+        if find_spec(module_name) is None:
+            continue
+        module = import_module(module_name)
+        for value in vars(module).values():
+            if isinstance(value, ValuesSerializer):
+                value._ensure_compiled()
+            elif (
+                isinstance(value, type) and issubclass(value, serializers.ModelSerializer)
+                and hasattr(value, 'Meta') and value.__module__ == module_name
+            ):
+                value().fields
+            else:
+                continue
+            count += 1
+    return count
+
+
+def warm_indexes():
+    from courses.autocomplete import autocomplete_index
+    from courses.recommendations import recommendation_index
+
+    autocomplete_index.get()
+    recommendation_index.get()
+    return 2
+
+
+def warm_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+STEPS = [
+    ('urls', warm_urls),
+    ('serializers', warm_serializers),
+    ('indexes', warm_indexes),
+    ('connections', warm_connections),
+]
+
+
+def warm_up(steps=None):
+    """Do the work the first requests would otherwise pay for.
+
+    Returns ``{step: (items warmed, seconds)}``. A failing step is logged
+    and skipped: a cold cache must not keep the server from starting.
+    """
+    results = {}
+    for name, step in STEPS:
+        if steps is not None and name not in steps:
+            continue
+        started = time.perf_counter()
+        try:
+            count = step()
+        except Exception:
+            logger.exception('Warm-up step %s failed', name)
+            continue
+        results[name] = (count, time.perf_counter() - started)
+    return results
@@ -1,6 +1,6 @@
 
 from django.contrib import admin
-from .models import Course
+from .models import Course, PopularCourse, SimilarCourse
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
@@ -8,3 +8,13 @@ class CourseAdmin(admin.ModelAdmin):
     list_filter = ['level', 'format', 'university__country']
     search_fields = ['title', 'subject', 'university__name']
     ordering = ['-created_at']
+
+@admin.register(PopularCourse)
+class PopularCourseAdmin(admin.ModelAdmin):
+    list_display = ['rank', 'course', 'score', 'save_count', 'comparison_count', 'computed_at']
+    ordering = ['rank']
+
+@admin.register(SimilarCourse)
+class SimilarCourseAdmin(admin.ModelAdmin):
+    list_display = ['course', 'similar', 'score', 'co_saves']
+    raw_id_fields = ['course', 'similar']
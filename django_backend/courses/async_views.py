@@ -0,0 +1,84 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import NotFound
+from config.async_views import api_request, async_api_view, gather_queries, json_response
+from config.conditional import conditional_response
+from config.instrumentation import query_budget
+from config.response_cache import cache_response
+from . import views
+from .comparison import ComparisonError
+from .facets import get_facets
+from .models import Course
+from .popularity import is_ranked
+from .serializers import course_list_values, course_values
+
+# Async versions of the hot read endpoints, served by config.asgi. They
+# share filters, serializers, cache keys and validators with the sync
+# views in courses.views, which still handle every other method.
+
+
+def course_list_view(request):
+    return views.CourseListCreateView(request=api_request(request), args=(), kwargs={}, format_kwarg=None)
+
+
+@query_budget(views.CourseListCreateView.query_budget)
+@async_api_view(views.CourseListCreateView.as_view())
+@cache_response('course-list', ['courses'])
+async def course_list(request):
+    view = course_list_view(request)
+    queryset = view.filter_queryset(view.get_queryset())
+    serializer = views.course_values_for(view.request, course_list_values)
+    rows = serializer.values(queryset, *views.course_list_columns(queryset))
+
+    # The page, its count and the facets are independent queries.
+    paginate = view.paginator.apaginate_queryset(rows, view.request, view)
+    if views.wants_facets(view.request):
+        page, (facets,) = await asyncio.gather(paginate, gather_queries(lambda: get_facets(view.request, queryset)))
+    else:
+        page, facets = await paginate, None
+
+    if page is not None:
+        data = view.paginator.get_paginated_response(serializer.serialize(page)).data
+    else:
+        data = serializer.serialize([row async for row in rows])
+    if facets is not None:
+        data = views.with_facets(data, facets)
+    return json_response(data)
+
+
+@query_budget(views.CourseDetailView.query_budget)
+@async_api_view(views.CourseDetailView.as_view())
+@conditional_response(views.course_detail_validators)
+@cache_response('course-detail', views.course_detail_tags)
+async def course_detail(request, pk):
+    serializer = views.course_values_for(api_request(request), course_values)
+    row = await serializer.values(Course.objects.filter(pk=pk)).afirst()
+    if row is None:
+        raise NotFound()
+    return json_response(serializer.to_representation(row))
+
+
+@query_budget(5)
+@async_api_view(views.get_popular_courses)
+@conditional_response(views.popular_courses_validators)
+@cache_response('popular-courses', ['courses', 'popular'])
+async def popular_courses(request):
+    limit = views.get_popular_limit(request.GET)
+    serializer = views.course_values_for(api_request(request), course_list_values)
+    queryset = views.popular_courses_queryset(limit, await sync_to_async(is_ranked)())
+    return json_response(serializer.serialize([row async for row in serializer.values(queryset)]))
+
+
+@query_budget(4)
+@async_api_view(views.compare_courses)
+@conditional_response(views.compare_courses_validators)
+async def compare_courses(request):
+    drf_request = api_request(request)
+    try:
+        course_ids = views.get_compare_ids(drf_request)
+    except ComparisonError as exc:
+        return json_response({'error': str(exc)}, status=400)
+    serializer = views.course_values_for(drf_request, course_values)
+    queryset = serializer.values(Course.objects.filter(id__in=course_ids))
+    return json_response(serializer.serialize([row async for row in queryset]))
@@ -0,0 +1,149 @@
+import heapq
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.db.models import Count
+from config.process_index import ProcessIndex, table_version
+from universities.models import University
+from .models import Course
+
+SUGGESTION_TYPES = ('course', 'subject', 'university', 'city')
+# Longer keys add memory without making prefixes more selective.
+MAX_KEY_LENGTH = 48
+# Upper bound on indexed keys; the least common suggestions are dropped first.
+MAX_KEYS = 200_000
+# Prefixes shared by more keys than this are answered from suggestions
+# ranked when the index is built instead of scanning their keys.
+MAX_CANDIDATES = 500
+MAX_SUGGESTIONS = 20
+
+_WORD_START_RE = re.compile(r'(?<![a-z0-9])[a-z0-9]')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(text):
+    return _SPACE_RE.sub(' ', (text or '').lower()).strip()
+
+
+def rank(entry, prefix):
+    # Whole-text matches first, then more courses, then alphabetical order.
+    _, _, count, normalized = entry
+    return not normalized.startswith(prefix), -count, normalized
+
+
+class AutocompleteIndex:
+    """Sorted array of lower-cased keys for prefix lookups with ``bisect``.
+
+    Each suggestion is stored under its full text and under every word
+    start, so "sci" finds "Computer Science". ``keys[i]`` points at
+    ``entries[refs[i]]``, a ``(text, type, count, normalized)`` tuple, and entries
+    are shared between their keys. ``buckets`` holds the best
+    ``MAX_SUGGESTIONS`` refs of each type for prefixes shared by more than
+    ``MAX_CANDIDATES`` keys.
+    """
+
+    def __init__(self, suggestions):
+        entries, pairs = [], []
+        for (text, kind), count in suggestions.most_common():
+            normalized = normalize(text)
+            if not normalized:
+                continue
+            ref = len(entries)
+            entries.append((text, kind, count, normalized))
+            for match in _WORD_START_RE.finditer(normalized):
+                pairs.append((normalized[match.start():match.start() + MAX_KEY_LENGTH], ref))
+            if len(pairs) >= MAX_KEYS:
+                break
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.refs = [ref for _, ref in pairs]
+        self.entries = entries
+        self.buckets = self._rank_crowded_prefixes()
+
+    def _rank_crowded_prefixes(self):
+        keys, refs, entries = self.keys, self.refs, self.entries
+        buckets = {}
+        for length in range(1, MAX_KEY_LENGTH + 1):
+            crowded = False
+            start = 0
+            while start < len(keys):
+                # Keys shorter than the prefixes of this pass cannot match them.
+                if len(keys[start]) < length:
+                    start += 1
+                    continue
+                prefix = keys[start][:length]
+                end = start + 1
+                while end < len(keys) and keys[end].startswith(prefix):
+                    end += 1
+                if end - start > MAX_CANDIDATES:
+                    crowded = True
+                    by_type = defaultdict(list)
+                    for ref in set(refs[start:end]):
+                        by_type[entries[ref][1]].append((rank(entries[ref], prefix), ref))
+                    buckets[prefix] = {
+                        kind: [ref for _, ref in heapq.nsmallest(MAX_SUGGESTIONS, ranked)]
+                        for kind, ranked in by_type.items()
+                    }
+                start = end
+            # Longer prefixes only split these ranges further.
+            if not crowded:
+                break
+        return buckets
+
+    @classmethod
+    def load(cls):
+        suggestions = Counter()
+        for title, subject in Course.objects.order_by().values_list('title', 'subject').iterator(chunk_size=5000):
+            suggestions[(title, 'course')] += 1
+            suggestions[(subject, 'subject')] += 1
+        # Universities without courses are still suggested, with a count of 0.
+        for name, city, count in University.objects.order_by().annotate(
+            course_count=Count('courses')
+        ).values_list('name', 'city', 'course_count').iterator(chunk_size=5000):
+            suggestions[(name, 'university')] += count
+            suggestions[(city, 'city')] += count
+        return cls(suggestions)
+
+    def suggest(self, query, limit=8, types=None):
+        """Rank suggestions whose text, or a word in it, starts with ``query``.
+
+        Whole-text matches come before word matches, then more courses
+        before fewer, then alphabetical order. ``limit`` is at most
+        ``MAX_SUGGESTIONS``.
+        """
+        prefix = normalize(query)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        entries = self.entries
+        bucket = self.buckets.get(prefix)
+        if bucket is not None:
+            candidates = [ref for kind, kind_refs in bucket.items() if not types or kind in types for ref in kind_refs]
+        else:
+            # At most MAX_CANDIDATES keys share a prefix without a bucket.
+            keys, candidates = self.keys, set()
+            position = bisect_left(keys, prefix)
+            end = min(len(keys), position + MAX_CANDIDATES)
+            while position < end and keys[position].startswith(prefix):
+                candidates.add(self.refs[position])
+                position += 1
+        ranked = []
+        for ref in candidates:
+            entry = entries[ref]
+            if types and entry[1] not in types:
+                continue
+            ranked.append((*rank(entry, prefix), ref))
+        ranked.sort()
+        return [
+            {'text': entries[ref][0], 'type': entries[ref][1], 'count': entries[ref][2]}
+            for *_, ref in ranked[:limit]
+        ]
+
+
+def index_version():
+    return table_version(Course.objects), table_version(University.objects)
+
+
+# Catalog edits in any process move the version; bursts of them (an
+# import, an admin bulk edit) are folded into one rebuild every 30 seconds.
+autocomplete_index = ProcessIndex(index_version, AutocompleteIndex.load, check_interval=10, rebuild_interval=30)
@@ -0,0 +1,128 @@
+from django.utils import timezone
+from config.response_cache import response_cache
+from .models import Course
+
+MAX_COMPARE_COURSES = 10
+
+LEVEL_RANKS = {'Certificate': 1, "Bachelor's": 2, "Master's": 3, 'PhD': 4}
+
+# (attribute, unit, which value is best: 'min', 'max' or None)
+COMPARISON_ROWS = [
+    ('annual_fees', 'currency/year', 'min'),
+    ('total_fees', 'currency', 'min'),
+    ('duration_months', 'months', 'min'),
+    ('level', None, None),
+    ('format', None, None),
+    ('credits', 'credits', 'max'),
+    ('deadline_days', 'days', 'max'),
+    ('rating', 'out of 5', 'max'),
+]
+
+MATRIX_COLUMNS = [
+    'id', 'title', 'university_id', 'university__name', 'annual_fees', 'total_fees', 'duration_months',
+    'level', 'format', 'credits', 'application_deadline', 'rating',
+]
+
+
+class ComparisonError(ValueError):
+    pass
+
+
+def normalize_course_ids(course_ids):
+    """Return the sorted, de-duplicated ids, or raise :class:`ComparisonError`."""
+    ids = set()
+    for value in course_ids or []:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            raise ComparisonError(f'Invalid course id: {value!r}')
+    if len(ids) > MAX_COMPARE_COURSES:
+        raise ComparisonError(f'At most {MAX_COMPARE_COURSES} courses can be compared')
+    return sorted(ids)
+
+
+def _number(value):
+    return None if value is None else float(value)
+
+
+def _attributes(row, today):
+    deadline = row['application_deadline']
+    return {
+        'annual_fees': _number(row['annual_fees']),
+        'total_fees': _number(row['total_fees']),
+        'duration_months': row['duration_months'],
+        'level': row['level'],
+        'format': row['format'],
+        'credits': row['credits'],
+        'deadline_days': (timezone.localdate(deadline) - today).days if deadline else None,
+        'rating': _number(row['rating']),
+    }
+
+
+def _best_ids(course_ids, values, better):
+    candidates = [(value, course_id) for course_id, value in zip(course_ids, values) if value is not None]
+    if better is None or len(candidates) < 2:
+        return []
+    pick = min if better == 'min' else max
+    best = pick(value for value, _ in candidates)
+    return [course_id for value, course_id in candidates if value == best]
+
+
+def build_matrix(course_ids, today=None):
+    """Compute the comparison matrix for ``course_ids`` with one query.
+
+    Rows hold one normalized value per course, in the order of
+    ``courses``, and ``best`` lists the ids holding the best value of rows
+    with a preferred direction. Passed deadlines are never best.
+    """
+    today = today or timezone.localdate()
+    rows = list(Course.objects.filter(id__in=course_ids).order_by('id').values(*MATRIX_COLUMNS))
+    ids = [row['id'] for row in rows]
+    attributes = [_attributes(row, today) for row in rows]
+    matrix_rows = []
+    for name, unit, better in COMPARISON_ROWS:
+        values = [item[name] for item in attributes]
+        candidates = values
+        if name == 'deadline_days':
+            candidates = [None if value is not None and value < 0 else value for value in values]
+        matrix_rows.append({
+            'attribute': name,
+            'unit': unit,
+            'better': better,
+            'values': values,
+            'best': _best_ids(ids, candidates, better),
+        })
+    return {
+        'course_ids': ids,
+        'courses': [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'university_id': row['university_id'],
+                'university': row['university__name'],
+                'level_rank': LEVEL_RANKS.get(row['level']),
+            }
+            for row in rows
+        ],
+        'rows': matrix_rows,
+        'as_of': today.isoformat(),
+    }
+
+
+def get_matrix(course_ids):
+    """Return the cached matrix for an id set; ``course_ids`` must be normalized.
+
+    The key is the sorted id set plus today's date, which deadline
+    distances depend on. Saving or deleting any of the courses, or their
+    universities, invalidates it.
+    """
+    today = timezone.localdate()
+    key = f"response-cache:comparison-matrix:{today.isoformat()}:{','.join(map(str, course_ids))}"
+    matrix = response_cache.get(key)
+    if matrix is None:
+        matrix = build_matrix(course_ids, today)
+        tags = [f'course:{course_id}' for course_id in course_ids]
+        university_ids = {course['university_id'] for course in matrix['courses']}
+        tags += [f'university:{university_id}' for university_id in university_ids]
+        response_cache.set(key, matrix, tags)
+    return matrix
@@ -0,0 +1,72 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (column name, values() lookup)
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('title', 'title'),
+    ('university_id', 'university_id'),
+    ('university_name', 'university__name'),
+    ('university_country', 'university__country'),
+    ('university_city', 'university__city'),
+    ('level', 'level'),
+    ('subject', 'subject'),
+    ('duration', 'duration'),
+    ('duration_months', 'duration_months'),
+    ('format', 'format'),
+    ('fees', 'fees'),
+    ('fees_type', 'fees_type'),
+    ('credits', 'credits'),
+    ('rating', 'rating'),
+    ('application_deadline', 'application_deadline'),
+    ('start_date', 'start_date'),
+    ('description', 'description'),
+    ('requirements', 'requirements'),
+    ('course_structure', 'course_structure'),
+    ('image_url', 'image_url'),
+    ('updated_at', 'updated_at'),
+]
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_rows(queryset):
+    """Yield plain row tuples straight from a server-side cursor."""
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    return queryset.order_by('id').values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def encode_ndjson(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def encode_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    structure = [lookup for _, lookup in EXPORT_COLUMNS].index('course_structure')
+    for row in rows:
+        row = list(row)
+        if row[structure] is not None:
+            row[structure] = json.dumps(row[structure], cls=DjangoJSONEncoder)
+        yield writer.writerow(row)
+
+
+ENCODERS = {
+    'ndjson': encode_ndjson,
+    'csv': encode_csv,
+}
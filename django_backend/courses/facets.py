@@ -0,0 +1,112 @@
+import hashlib
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+FACET_PARAMS = [
+    'search', 'country', 'level', 'subject', 'duration', 'minDuration', 'maxDuration',
+    'minFees', 'maxFees', 'feesBasis', 'format',
+]
+
+# (key, lower bound inclusive, upper bound exclusive) on the annual cost
+FEE_BANDS = [
+    ('0-5000', 0, 5000),
+    ('5000-15000', 5000, 15000),
+    ('15000-30000', 15000, 30000),
+    ('30000-50000', 30000, 50000),
+    ('50000+', 50000, None),
+]
+
+FACET_FIELDS = OrderedDict([
+    ('country', 'university__country'),
+    ('level', 'level'),
+    ('format', 'format'),
+    ('fees', 'fee_band'),
+])
+
+# Only states with at most this many active filters are cached; deeper
+# combinations are rarely repeated and would just churn the cache. Without
+# a shared cache nothing is cached: a write in one process could not
+# invalidate the counts held by the others.
+FACET_CACHE_MAX_FILTERS = 1
+FACET_CACHE_TIMEOUT = 60 * 10
+FACET_CACHE_VERSION_KEY = 'courses:facets:version'
+
+
+def fee_band_expression():
+    whens = []
+    for key, low, high in FEE_BANDS:
+        condition = Q(annual_fees__gte=low)
+        if high is not None:
+            condition &= Q(annual_fees__lt=high)
+        whens.append(When(condition, then=Value(key)))
+    return Case(*whens, default=Value(None), output_field=CharField())
+
+
+def compute_facets(queryset):
+    """Count courses per country, level, format and fee band.
+
+    All four facets come from one GROUP BY over their combined values,
+    then get rolled up per facet in Python; the number of groups is
+    bounded by the facet cardinalities, not by the number of courses.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(fee_band=fee_band_expression())
+        .values(*FACET_FIELDS.values())
+        .annotate(count=Count('id'))
+    )
+
+    counters = {name: Counter() for name in FACET_FIELDS}
+    for row in rows:
+        for name, field in FACET_FIELDS.items():
+            if row[field] is not None:
+                counters[name][row[field]] += row['count']
+
+    facets = {}
+    for name, counter in counters.items():
+        if name == 'fees':
+            buckets = [
+                {'value': key, 'min': low, 'max': high, 'count': counter[key]}
+                for key, low, high in FEE_BANDS
+            ]
+        else:
+            buckets = [
+                {'value': value, 'count': count}
+                for value, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+            ]
+        facets[name] = buckets
+    return facets
+
+
+def _cache_key(params):
+    version = cache.get_or_set(FACET_CACHE_VERSION_KEY, 1, None)
+    raw = '&'.join(f'{key}={value}' for key, value in sorted(params.items()))
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return f'courses:facets:{version}:{digest}'
+
+
+def get_facets(request, queryset):
+    params = {
+        key: request.query_params[key].strip()
+        for key in FACET_PARAMS
+        if request.query_params.get(key, '').strip()
+    }
+    if not settings.SHARED_CACHE or len(params) > FACET_CACHE_MAX_FILTERS:
+        return compute_facets(queryset)
+
+    key = _cache_key(params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate_facets():
+    try:
+        cache.incr(FACET_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(FACET_CACHE_VERSION_KEY, 1, None)
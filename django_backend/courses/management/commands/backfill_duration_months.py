@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from config.response_cache import response_cache
+from courses.facets import invalidate_facets
+from courses.models import Course
+from courses.normalization import backfill_duration_months
+from universities.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Re-parse the free-text duration of every course into duration_months and recompute its fees'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = backfill_duration_months(Course, batch_size=options['batch_size'])
+        if updated:
+            # bulk_update sends no signals, so nothing else saw the new values.
+            rebuild_stats()
+            invalidate_facets()
+            response_cache.invalidate_all()
+        self.stdout.write(self.style.SUCCESS(f'Updated duration_months for {updated} courses'))
@@ -0,0 +1,62 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from config.images import ImageError, record_key, render_url
+from config.response_cache import response_cache
+from courses.models import Course
+from universities.models import University
+
+MODELS = {'courses': Course, 'universities': University}
+
+
+def _render(url):
+    # Runs in a worker; errors come back as values so one bad URL does not stop the run.
+    try:
+        return url, render_url(url), None
+    except ImageError as exc:
+        return url, None, str(exc)
+    except Exception as exc:
+        return url, None, f'{type(exc).__name__}: {exc}'
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnail variants for every course and university image that has none or a stale set'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=list(MODELS), action='append', help='Only these models (repeatable)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Parallel workers')
+        parser.add_argument('--threads', action='store_true', help='Use threads instead of processes (I/O-bound sources)')
+        parser.add_argument('--force', action='store_true', help='Re-render images that already have variants')
+        parser.add_argument('--limit', type=int, help='Process at most this many distinct images per model')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be positive')
+        executor_class = ThreadPoolExecutor if options['threads'] else ProcessPoolExecutor
+        started = time.monotonic()
+        rendered = failed = updated = 0
+        with executor_class(max_workers=options['workers']) as executor:
+            for name in options['model'] or list(MODELS):
+                queryset = MODELS[name].objects.exclude(image_url__isnull=True).exclude(image_url='')
+                pending = queryset if options['force'] else queryset.exclude(image_source=F('image_url'))
+                # Rows sharing an image are fetched and rendered once.
+                urls = list(pending.order_by().values_list('image_url', flat=True).distinct()[:options['limit']])
+                self.stdout.write(f'{name}: {len(urls)} images to render')
+                futures = [executor.submit(_render, url) for url in urls]
+                for future in as_completed(futures):
+                    url, key, error = future.result()
+                    if error is not None:
+                        failed += 1
+                        self.stderr.write(f'{name}: {url}: {error}')
+                        continue
+                    rendered += 1
+                    updated += record_key(queryset, url, key)
+        if updated:
+            response_cache.invalidate_all()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {rendered} images for {updated} rows, {failed} failed, in {elapsed:.1f}s'
+        ))
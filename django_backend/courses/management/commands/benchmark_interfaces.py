@@ -0,0 +1,139 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.test import AsyncClient, Client, override_settings
+from config.response_cache import response_cache
+from courses.models import Course
+from .run_benchmarks import Command as BenchmarkCommand, percentile
+
+# Scenarios whose endpoints have async views under ASGI.
+ASYNC_SCENARIOS = ['list', 'list_search', 'list_facets', 'detail', 'popular', 'compare', 'saved_check']
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Compare throughput of concurrent requests through the WSGI and ASGI handlers, in-process. '
+        'WSGI requests run on a thread pool, ASGI requests as tasks on one event loop.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario and interface')
+        parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight at once')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per scenario and interface')
+        parser.add_argument('--cold', action='store_true', help='Clear the response cache before every request')
+        parser.add_argument('--interface', choices=['wsgi', 'asgi'], action='append', help='Only run these interfaces')
+        parser.add_argument('--scenario', action='append', help=f"Scenarios to run (default: {', '.join(ASYNC_SCENARIOS)})")
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--list', action='store_true', help='List the scenario names and exit')
+
+    def handle(self, *args, **options):
+        if not Course.objects.exists():
+            raise CommandError('No courses to benchmark; run generate_catalog first')
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+        scenarios = self.build_scenarios()
+        if options['list']:
+            self.stdout.write('\n'.join(scenarios))
+            return
+        selected = options['scenario'] or [name for name in ASYNC_SCENARIOS if name in scenarios]
+        unknown = [name for name in selected if name not in scenarios]
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(unknown)}")
+
+        # Clients carry the session of the benchmark user, when there is one.
+        login = Client()
+        if self.user is not None:
+            login.force_login(self.user)
+        self.cookies = login.cookies
+
+        results = {}
+        for name in selected:
+            results[name] = {}
+            for interface in options['interface'] or ['wsgi', 'asgi']:
+                run = self.run_wsgi if interface == 'wsgi' else self.run_asgi
+                requests = scenarios[name]
+                run(requests, options['warmup'], options['concurrency'], options['cold'])
+                result = run(requests, options['requests'], options['concurrency'], options['cold'])
+                results[name][interface] = result
+                self.stderr.write(
+                    f"{name:<16} {interface}  {result['throughput_rps']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms"
+                )
+            if len(results[name]) == 2 and results[name]['wsgi']['throughput_rps']:
+                results[name]['asgi_speedup'] = round(
+                    results[name]['asgi']['throughput_rps'] / results[name]['wsgi']['throughput_rps'], 2
+                )
+
+        meta = self.meta(options)
+        meta.update(concurrency=options['concurrency'], asgi_urlconf=settings.ASGI_URLCONF)
+        self.write_report({'meta': meta, 'scenarios': results}, options['output'])
+
+    def write_report(self, report, path):
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if path:
+            with open(path, 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f'Wrote {path}')
+        else:
+            self.stdout.write(output)
+
+    def run_wsgi(self, requests, count, concurrency, cold):
+        local = threading.local()
+
+        def send(index):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+                local.client.cookies = self.cookies
+            _, method, path, params = requests[index % len(requests)]
+            if cold:
+                response_cache.cache.clear()
+            started = time.perf_counter()
+            response = getattr(local.client, method)(path, params)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(send, range(count)))
+        return self.summarize(samples, time.perf_counter() - started)
+
+    def run_asgi(self, requests, count, concurrency, cold):
+        async def run():
+            client = AsyncClient()
+            client.cookies = self.cookies
+            slots = asyncio.Semaphore(concurrency)
+
+            async def send(index):
+                _, method, path, params = requests[index % len(requests)]
+                async with slots:
+                    if cold:
+                        response_cache.cache.clear()
+                    started = time.perf_counter()
+                    response = await getattr(client, method)(path, params)
+                    return time.perf_counter() - started, response.status_code
+
+            started = time.perf_counter()
+            samples = await asyncio.gather(*(send(index) for index in range(count)))
+            return samples, time.perf_counter() - started
+
+        with override_settings(ROOT_URLCONF=settings.ASGI_URLCONF):
+            samples, wall = asyncio.run(run())
+        return self.summarize(samples, wall)
+
+    def summarize(self, samples, wall):
+        latencies = [elapsed * 1000 for elapsed, _ in samples]
+        return {
+            'requests': len(samples),
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'max_ms': round(max(latencies), 3),
+            'throughput_rps': round(len(samples) / wall, 1) if wall else None,
+            'status_codes': dict(Counter(str(status) for _, status in samples)),
+        }
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from courses.models import Course
+from courses.serializers import CourseListSerializer, CourseSerializer, course_list_values, course_values
+from universities.models import University
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare ModelSerializer and values()-driven serialization time per 1k courses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        try:
+            with transaction.atomic():
+                missing = rows - Course.objects.count()
+                if missing > 0:
+                    self.stdout.write(f'Adding {missing} temporary courses (rolled back afterwards)')
+                    self._create_courses(missing)
+                self._run(rows, repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _create_courses(self, count):
+        university = University.objects.create(
+            name='Benchmark University', country='Benchmark', city='Benchmark',
+            description='Benchmark university description. ' * 20,
+        )
+        Course.objects.bulk_create([
+            Course(
+                title=f'Benchmark course {index}', university=university, level="Master's",
+                subject='Computer Science', duration='2 years', format='Online', fees=12000 + index,
+                fees_type='yearly', rating='4.20', description='Benchmark course description. ' * 20,
+                course_structure={'modules': ['Algorithms', 'Systems', 'Thesis']},
+            )
+            for index in range(count)
+        ])
+
+    def _run(self, rows, repeat):
+        queryset = Course.objects.select_related('university').order_by('id')[:rows]
+        cases = [
+            ('list', CourseListSerializer, course_list_values),
+            ('detail', CourseSerializer, course_values),
+        ]
+        for name, serializer_class, values_serializer in cases:
+            instances = list(queryset)
+            values = list(values_serializer.values(queryset))
+            before = self._time(lambda: serializer_class(instances, many=True).data, repeat)
+            after = self._time(lambda: values_serializer.serialize(values), repeat)
+            per_k = 1000 / len(instances)
+            self.stdout.write(
+                f'{name:<7} ModelSerializer {before * per_k * 1000:8.2f} ms/1k rows   '
+                f'ValuesSerializer {after * per_k * 1000:8.2f} ms/1k rows   '
+                f'speedup x{before / after:.1f}'
+            )
+
+    def _time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
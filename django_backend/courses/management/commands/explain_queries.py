@@ -0,0 +1,91 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from courses.models import Course, SimilarCourse
+from courses.views import CourseListCreateView, popular_courses_queryset
+from universities.models import University
+from universities.views import UniversityListCreateView
+from users.models import SavedCourse
+
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # SQLite prints "SCAN table" for full scans and "SEARCH table USING INDEX" otherwise.
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! USING (?:COVERING )?INDEX)'),
+}
+
+# (name, query params) of list requests the index strategy must serve.
+COURSE_LIST_QUERIES = [
+    ('course_list', {}),
+    ('course_list_level', {'level': "Master's"}),
+    ('course_list_format', {'format': 'Online'}),
+    ('course_list_country', {'country': 'Germany'}),
+    ('course_list_subject', {'subject': 'science'}),
+    ('course_list_fees_range', {'minFees': 5000, 'maxFees': 20000, 'ordering': 'fees'}),
+    ('course_list_level_fees', {'level': "Master's", 'maxFees': 20000, 'ordering': 'fees'}),
+    ('course_list_online_by_fees', {'format': 'Online', 'ordering': 'fees'}),
+    ('course_list_duration_range', {'minDuration': 12, 'maxDuration': 24}),
+    ('course_list_by_rating', {'ordering': '-rating'}),
+]
+UNIVERSITY_LIST_QUERIES = [
+    ('university_list_country', {'country': 'Germany', 'ordering': 'ranking'}),
+    ('university_list_by_ranking', {'ordering': 'ranking'}),
+    ('university_list_search', {'search': 'tech'}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the canonical catalog queries and flag sequential scans. '
+        'Run it against a realistically sized database (see generate_catalog): '
+        'planners rightly prefer full scans on tiny tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE (PostgreSQL)')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only flagged ones')
+        parser.add_argument('--fail-on-seq-scan', action='store_true', help='Exit with an error when any scan is flagged')
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'Unsupported database vendor: {connection.vendor}')
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+
+        flagged = []
+        for name, queryset in self.canonical_queries():
+            plan = queryset.explain(**explain_options)
+            scans = sorted(set(pattern.findall(plan)))
+            if scans:
+                flagged.append(name)
+                self.stdout.write(self.style.WARNING(f"{name}: sequential scan on {', '.join(scans)}"))
+            else:
+                self.stdout.write(f'{name}: ok')
+            if scans or options['verbose_plans']:
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f"Sequential scans in: {', '.join(flagged)}")
+        self.stdout.write(self.style.SUCCESS(f'{len(flagged)} of the canonical queries use a sequential scan'))
+
+    def canonical_queries(self):
+        for name, params in COURSE_LIST_QUERIES:
+            yield name, self.list_queryset(CourseListCreateView, '/api/courses/', params)[:20]
+        for name, params in UNIVERSITY_LIST_QUERIES:
+            yield name, self.list_queryset(UniversityListCreateView, '/api/universities/', params)[:20]
+
+        course_id = Course.objects.order_by().values_list('id', flat=True).first() or 0
+        user_id = SavedCourse.objects.order_by().values_list('user_id', flat=True).first() or 0
+        yield 'course_detail', Course.objects.select_related('university').filter(pk=course_id)
+        yield 'popular_courses', popular_courses_queryset(6)
+        yield 'similar_courses', SimilarCourse.objects.filter(course_id=course_id).order_by('-score')[:10]
+        yield 'saved_courses', SavedCourse.objects.filter(user_id=user_id).select_related('course__university')
+        yield 'universities_by_country', University.objects.filter(country='Germany')
+
+    def list_queryset(self, view_class, path, params):
+        view = view_class()
+        view.request = Request(APIRequestFactory().get(path, params))
+        view.args, view.kwargs, view.format_kwarg = (), {}, None
+        return view.filter_queryset(view.get_queryset())
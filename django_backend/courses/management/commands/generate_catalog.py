@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from config.db_router import use_primary
+from courses.popularity import rebuild_popularity
+from courses.recommendations import rebuild_recommendations
+from courses.synthetic import CatalogGenerator, delete_synthetic_data
+from universities.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Generate a reproducible synthetic catalog with users and their saved courses and comparisons'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--universities', type=int, default=100)
+        parser.add_argument('--courses', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--saves-per-user', type=int, default=5)
+        parser.add_argument('--comparisons-per-user', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--clear', action='store_true', help='Delete earlier synthetic data first')
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Do not rebuild the popularity ranking, course similarities and catalog stats afterwards',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['universities'], options['courses'], options['users']) < 0:
+            raise CommandError('Sizes must not be negative')
+        if options['clear']:
+            self.stdout.write(f'Deleted {delete_synthetic_data()} synthetic rows')
+        generator = CatalogGenerator(options['seed'], options['batch_size'], self.stdout)
+        with use_primary():
+            counts = generator.generate(
+                options['universities'], options['courses'], options['users'],
+                options['saves_per_user'], options['comparisons_per_user'],
+            )
+            if not options['skip_rebuild']:
+                rebuild_popularity()
+                rebuild_recommendations()
+                rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(
+            'Generated ' + ', '.join(f'{count} {name}' for name, count in counts.items())
+        ))
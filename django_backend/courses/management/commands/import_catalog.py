@@ -0,0 +1,227 @@
+import csv
+import json
+import operator
+import sys
+import time
+from contextlib import ExitStack
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from config.db_router import use_primary
+from config.response_cache import response_cache
+from courses.autocomplete import autocomplete_index
+from courses.facets import invalidate_facets
+from courses.models import Course
+from courses.search import refresh_university
+from universities.models import University
+from universities.stats import refresh_stats
+
+UNIVERSITY_KEY = ['name', 'country']
+UNIVERSITY_FIELDS = ['name', 'country', 'city', 'description', 'image_url', 'website', 'ranking', 'established']
+
+COURSE_KEY = ['university', 'title', 'level']
+COURSE_FIELDS = [
+    'title', 'description', 'level', 'subject', 'duration', 'format', 'fees', 'fees_type',
+    'credits', 'application_deadline', 'start_date', 'requirements', 'course_structure',
+    'rating', 'image_url',
+]
+# Derived on the instance before writing, since bulk_create skips save().
+COURSE_DERIVED_FIELDS = ['duration_months', 'annual_fees', 'total_fees']
+
+
+def read_rows(stream, input_format):
+    """Yield ``(line_number, row)`` pairs one at a time from CSV or JSONL."""
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+            continue
+        yield line_number, row
+
+
+class Command(BaseCommand):
+    help = 'Stream universities or courses from CSV/JSONL and upsert them in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=['universities', 'courses'])
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Validate rows without writing anything')
+        parser.add_argument('--errors', help='Write rejected rows to this JSONL file')
+
+    def handle(self, *args, **options):
+        input_format = options['format']
+        if input_format is None:
+            input_format = 'csv' if options['path'].endswith('.csv') else 'jsonl'
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        self.model = options['model']
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        self.university_ids = {
+            self._university_key(name, country): pk
+            for pk, name, country in University.objects.values_list('id', 'name', 'country').iterator()
+        }
+        self.known_university_ids = set(self.university_ids.values())
+        self.touched_universities = set()
+        self.processed = self.written = self.rejected = 0
+        self.started = time.monotonic()
+
+        # Derived data is rebuilt from the rows just written, which replicas may not have yet.
+        with use_primary():
+            with ExitStack() as files:
+                stream = sys.stdin
+                if options['path'] != '-':
+                    stream = files.enter_context(open(options['path'], newline='', encoding='utf-8'))
+                self.error_file = None
+                if options['errors']:
+                    self.error_file = files.enter_context(open(options['errors'], 'w', encoding='utf-8'))
+                self._import(read_rows(stream, input_format))
+
+            if self.written:
+                self._refresh_derived_data()
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Validated' if self.dry_run else 'Imported'} {self.processed - self.rejected} {self.model}, "
+            f'rejected {self.rejected}, in {elapsed:.1f}s ({self._rate():.0f} rows/s)'
+        ))
+
+    def _import(self, rows):
+        batch = {}
+        for line_number, row in rows:
+            self.processed += 1
+            obj = self._build(line_number, row)
+            if obj is not None:
+                # Later rows win over earlier rows with the same natural key.
+                batch[self._natural_key(obj)] = obj
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = {}
+        if batch:
+            self._flush(batch)
+
+    def _build(self, line_number, row):
+        if isinstance(row, Exception):
+            self._reject(line_number, {'__all__': [f'Invalid JSON: {row}']}, None)
+            return None
+        if not isinstance(row, dict):
+            self._reject(line_number, {'__all__': ['Row must be an object']}, row)
+            return None
+
+        if self.model == 'universities':
+            model, fields = University, UNIVERSITY_FIELDS
+        else:
+            model, fields = Course, COURSE_FIELDS
+
+        values, errors = {}, {}
+        for name in fields:
+            field = model._meta.get_field(name)
+            raw = row.get(name)
+            if raw == '' or raw is None:
+                if field.has_default():
+                    raw = field.get_default()
+                else:
+                    raw = None if field.null else ''
+            if name == 'course_structure' and isinstance(raw, str):
+                try:
+                    raw = json.loads(raw)
+                except ValueError:
+                    errors[name] = ['Enter valid JSON.']
+                    continue
+            try:
+                values[name] = field.clean(raw, None)
+            except ValidationError as exc:
+                errors[name] = exc.messages
+
+        if model is Course:
+            university_id = self._resolve_university(row)
+            if university_id is None:
+                errors['university'] = ['Unknown university; give university_id or university and university_country.']
+            values['university_id'] = university_id
+
+        if errors:
+            self._reject(line_number, errors, row)
+            return None
+        obj = model(**values)
+        if model is Course:
+            obj.update_derived_fields()
+        return obj
+
+    def _resolve_university(self, row):
+        if row.get('university_id') not in (None, ''):
+            try:
+                university_id = int(row['university_id'])
+            except (TypeError, ValueError):
+                return None
+            return university_id if university_id in self.known_university_ids else None
+        return self.university_ids.get(
+            self._university_key(row.get('university') or '', row.get('university_country') or '')
+        )
+
+    def _university_key(self, name, country):
+        return name.strip().lower(), country.strip().lower()
+
+    def _natural_key(self, obj):
+        if isinstance(obj, University):
+            return obj.name, obj.country
+        return obj.university_id, obj.title, obj.level
+
+    def _flush(self, batch):
+        objs = list(batch.values())
+        if not self.dry_run:
+            if self.model == 'universities':
+                self._upsert(University, objs, UNIVERSITY_KEY, UNIVERSITY_FIELDS)
+                # Only the (name, country) pairs just written, not every country sharing a name.
+                pairs = reduce(operator.or_, (Q(name=obj.name, country=obj.country) for obj in objs))
+                for pk, name, country in University.objects.filter(pairs).values_list('id', 'name', 'country'):
+                    self.university_ids[self._university_key(name, country)] = pk
+                    self.known_university_ids.add(pk)
+            else:
+                self._upsert(Course, objs, COURSE_KEY, COURSE_FIELDS + COURSE_DERIVED_FIELDS)
+                self.touched_universities.update(obj.university_id for obj in objs)
+            self.written += len(objs)
+        self.stdout.write(f'{self.processed} rows processed ({self._rate():.0f} rows/s)')
+
+    def _upsert(self, model, objs, unique_fields, fields):
+        update_fields = [name for name in fields if name not in unique_fields] + ['updated_at']
+        with transaction.atomic():
+            model.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields,
+            )
+
+    def _refresh_derived_data(self):
+        # bulk_create skips the model signals, so rebuild what they maintain.
+        for university in University.objects.filter(id__in=self.touched_universities).only('id', 'name'):
+            refresh_university(university)
+        refresh_stats(self.touched_universities)
+        invalidate_facets()
+        autocomplete_index.invalidate()
+        response_cache.invalidate_all()
+
+    def _reject(self, line_number, errors, row):
+        self.rejected += 1
+        if self.error_file:
+            self.error_file.write(json.dumps({'line': line_number, 'errors': errors, 'row': row}, default=str) + '\n')
+
+    def _rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.processed / elapsed if elapsed else 0.0
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from universities.stats import rebuild_stats, refresh_medians
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-university and per-country course statistics (after bulk loads, or to repair drift)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--medians', action='store_true',
+            help='Only recompute the fee medians, which course changes leave stale (run on a schedule, e.g. cron)',
+        )
+
+    def handle(self, *args, **options):
+        if options['medians']:
+            refresh_medians()
+            self.stdout.write(self.style.SUCCESS('Recomputed the fee medians'))
+            return
+        universities, countries = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f'Computed stats for {universities} universities and {countries} countries'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from courses.popularity import POPULAR_TOP_N, rebuild_popularity
+
+
+class Command(BaseCommand):
+    help = 'Recompute popularity scores and store the top-N ranking (run on a schedule, e.g. cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=POPULAR_TOP_N)
+
+    def handle(self, *args, **options):
+        ranked = rebuild_popularity(options['top'])
+        self.stdout.write(self.style.SUCCESS(f'Ranked {ranked} popular courses'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from courses.recommendations import rebuild_recommendations, update_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the course similarity table from saved-course co-occurrence (run on a schedule, e.g. cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Only recompute courses whose saves changed since the last run',
+        )
+
+    def handle(self, *args, **options):
+        if options['incremental']:
+            written = update_recommendations()
+        else:
+            written = rebuild_recommendations()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} similarity rows'))
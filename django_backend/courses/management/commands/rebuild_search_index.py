@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from universities.models import University
+from courses.search import refresh_university
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the weighted full-text search document for every course'
+
+    def handle(self, *args, **options):
+        updated = 0
+        for university in University.objects.only('id', 'name').iterator():
+            updated += refresh_university(university)
+        self.stdout.write(self.style.SUCCESS(f'Reindexed {updated} courses'))
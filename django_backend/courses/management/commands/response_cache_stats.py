@@ -0,0 +1,23 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from config.response_cache import response_cache
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters for the API response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        if not settings.SHARED_CACHE:
+            # This process would only see its own, empty, counters.
+            raise CommandError(
+                'Without a shared cache (REDIS_URL) the counters live in each server process; '
+                'read them from /api/instrumentation/response-cache/ instead'
+            )
+        self.stdout.write(json.dumps(response_cache.stats()))
+        if options['reset']:
+            response_cache.reset_stats()
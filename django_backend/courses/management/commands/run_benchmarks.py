@@ -0,0 +1,185 @@
+import json
+import platform
+import statistics
+import time
+from collections import Counter
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from config.response_cache import response_cache
+from courses.models import Course
+from courses.synthetic import USER_EMAIL_DOMAIN
+from universities.models import University
+from users.models import SavedCourse
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Drive the main API endpoints in-process and report latency, throughput and query counts as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+        parser.add_argument('--cold', action='store_true', help='Clear the response cache before every request')
+        parser.add_argument('--scenario', action='append', help='Only run these scenarios (repeatable)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--list', action='store_true', help='List the scenario names and exit')
+
+    def handle(self, *args, **options):
+        if not Course.objects.exists():
+            raise CommandError('No courses to benchmark; run generate_catalog first')
+        scenarios = self.build_scenarios()
+        if options['list']:
+            self.stdout.write('\n'.join(scenarios))
+            return
+        selected = options['scenario'] or list(scenarios)
+        unknown = [name for name in selected if name not in scenarios]
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(unknown)}")
+
+        self.anonymous = Client()
+        self.authenticated = Client()
+        if self.user is not None:
+            self.authenticated.force_login(self.user)
+
+        results = {}
+        for name in selected:
+            results[name] = self.run_scenario(scenarios[name], options['requests'], options['warmup'], options['cold'])
+            self.stderr.write(
+                f"{name:<24} p50 {results[name]['p50_ms']:8.2f} ms  p95 {results[name]['p95_ms']:8.2f} ms  "
+                f"queries {results[name]['queries_mean']:.1f}"
+            )
+
+        report = {'meta': self.meta(options), 'scenarios': results}
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def build_scenarios(self):
+        """Map scenario names to ``(client name, method, path, params)`` request lists.
+
+        Each scenario cycles through its requests, so detail and compare
+        scenarios touch different rows instead of one cached entry.
+        """
+        sample = Course.objects.select_related('university').order_by('id')
+        course_ids = list(sample.values_list('id', flat=True)[:200])
+        first = sample.first()
+        subject = first.subject.split()[0]
+        search = first.title.split()[-1]
+        university_ids = list(University.objects.order_by('id').values_list('id', flat=True)[:50])
+
+        self.user = (
+            get_user_model().objects.filter(email__endswith=f'@{USER_EMAIL_DOMAIN}', saved_courses__isnull=False)
+            .order_by('id').first()
+        )
+        if self.user is None:
+            saved_user_id = SavedCourse.objects.order_by('id').values_list('user_id', flat=True).first()
+            self.user = get_user_model().objects.filter(id=saved_user_id).first()
+
+        def list_with(params):
+            return [('anonymous', 'get', '/api/courses/', params)]
+
+        scenarios = {
+            'list': list_with({}),
+            'list_search': list_with({'search': search}),
+            'list_country': list_with({'country': first.university.country}),
+            'list_level': list_with({'level': first.level}),
+            'list_subject': list_with({'subject': subject}),
+            'list_duration': list_with({'duration': first.duration}),
+            'list_duration_range': list_with({'minDuration': 12, 'maxDuration': 36}),
+            'list_fees_range': list_with({'minFees': 5000, 'maxFees': 30000}),
+            'list_fees_total': list_with({'maxFees': 40000, 'feesBasis': 'total'}),
+            'list_format': list_with({'format': first.format}),
+            'list_ordering_fees': list_with({'ordering': 'fees'}),
+            'list_cursor': list_with({'pagination': 'cursor'}),
+            'list_facets': list_with({'facets': 'true'}),
+            'list_sparse_fields': list_with({'fields': 'id,title,fees'}),
+            'search_autocomplete': [
+                ('anonymous', 'get', '/api/courses/autocomplete/', {'q': search[:length]}) for length in (1, 2, 3, 4)
+            ],
+            'detail': [('anonymous', 'get', f'/api/courses/{pk}/', {}) for pk in course_ids],
+            'university_list': [('anonymous', 'get', '/api/universities/', {})],
+            'university_detail': [('anonymous', 'get', f'/api/universities/{pk}/', {}) for pk in university_ids],
+            'popular': [('anonymous', 'get', '/api/courses/popular/', {'limit': 6})],
+            'recommendations': [('anonymous', 'get', f'/api/courses/{pk}/recommendations/', {}) for pk in course_ids],
+            'compare': [
+                ('anonymous', 'get', '/api/compare-courses/', {'courseIds': ','.join(map(str, course_ids[i:i + 3]))})
+                for i in range(0, max(1, len(course_ids) - 3), 3)
+            ],
+            'compare_matrix': [
+                ('anonymous', 'get', '/api/compare-courses/matrix/', {'courseIds': ','.join(map(str, course_ids[i:i + 3]))})
+                for i in range(0, max(1, len(course_ids) - 3), 3)
+            ],
+        }
+        if self.user is not None:
+            scenarios['saved_courses'] = [('authenticated', 'get', '/api/saved-courses/', {})]
+            scenarios['saved_check'] = [
+                ('authenticated', 'get', '/api/saved-courses/check/', {'ids': ','.join(map(str, course_ids[:20]))})
+            ]
+            scenarios['user_recommendations'] = [('authenticated', 'get', '/api/recommendations/', {})]
+        return scenarios
+
+    def run_scenario(self, requests, count, warmup, cold):
+        for index in range(warmup):
+            self.request(requests[index % len(requests)], cold)
+        latencies, queries, statuses = [], [], Counter()
+        started = time.perf_counter()
+        for index in range(count):
+            elapsed, query_count, status = self.request(requests[index % len(requests)], cold)
+            latencies.append(elapsed * 1000)
+            queries.append(query_count)
+            statuses[str(status)] += 1
+        wall = time.perf_counter() - started
+        return {
+            'requests': count,
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'max_ms': round(max(latencies), 3),
+            'throughput_rps': round(count / wall, 1) if wall else None,
+            'queries_mean': round(statistics.fmean(queries), 2),
+            'queries_max': max(queries),
+            'status_codes': dict(statuses),
+        }
+
+    def request(self, spec, cold):
+        client_name, method, path, params = spec
+        client = self.authenticated if client_name == 'authenticated' else self.anonymous
+        if cold:
+            response_cache.cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, params)
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        return elapsed, len(queries), response.status_code
+
+    def meta(self, options):
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'cache': caches['default'].__class__.__name__,
+            'courses': Course.objects.count(),
+            'universities': University.objects.count(),
+            'requests_per_scenario': options['requests'],
+            'warmup': options['warmup'],
+            'cold': options['cold'],
+        }
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('universities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Course',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.TextField()),
+                ('description', models.TextField(blank=True, null=True)),
+                ('level', models.CharField(choices=[("Bachelor's", "Bachelor's"), ("Master's", "Master's"), ('PhD', 'PhD'), ('Certificate', 'Certificate')], max_length=20)),
+                ('subject', models.CharField(max_length=200)),
+                ('duration', models.CharField(max_length=100)),
+                ('format', models.CharField(choices=[('On-campus', 'On-campus'), ('Online', 'Online'), ('Hybrid', 'Hybrid')], max_length=20)),
+                ('fees', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('fees_type', models.CharField(choices=[('total', 'Total'), ('yearly', 'Yearly'), ('monthly', 'Monthly')], default='total', max_length=10)),
+                ('credits', models.IntegerField(blank=True, null=True)),
+                ('application_deadline', models.DateTimeField(blank=True, null=True)),
+                ('start_date', models.DateTimeField(blank=True, null=True)),
+                ('requirements', models.TextField(blank=True, null=True)),
+                ('course_structure', models.JSONField(blank=True, null=True)),
+                ('rating', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('image_url', models.URLField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='courses', to='universities.university')),
+            ],
+        ),
+    ]
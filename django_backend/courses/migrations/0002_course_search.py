@@ -0,0 +1,70 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:27
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Lower
+
+# The search document as of this migration (courses.search may change later).
+SEARCH_WEIGHTS = [('title', 'A'), ('subject', 'B'), ('university__name', 'C'), ('description', 'D')]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS courses_course_search_vector_gin '
+        'ON courses_course USING gin (search_vector)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS courses_course_search_vector_gin')
+
+
+def backfill_search_index(apps, schema_editor):
+    University = apps.get_model('universities', 'University')
+    Course = apps.get_model('courses', 'Course')
+    db_alias = schema_editor.connection.alias
+    postgres = schema_editor.connection.vendor == 'postgresql'
+    for university in University.objects.using(db_alias).only('id', 'name').iterator():
+        expressions = [
+            Value(university.name) if field == 'university__name' else Coalesce(F(field), Value(''), output_field=TextField())
+            for field, _ in SEARCH_WEIGHTS
+        ]
+        parts = []
+        for expression in expressions:
+            parts.extend([Value(' '), expression] if parts else [expression])
+        values = {'search_document': Lower(Concat(*parts))}
+        if postgres:
+            vector = None
+            for expression, (_, weight) in zip(expressions, SEARCH_WEIGHTS):
+                part = SearchVector(expression, config='english', weight=weight)
+                vector = part if vector is None else vector + part
+            values['search_vector'] = vector
+        Course.objects.using(db_alias).filter(university_id=university.pk).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_course_search'),
+        ('universities', '0002_catalog_natural_keys'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='course',
+            constraint=models.UniqueConstraint(fields=('university', 'title', 'level'), name='unique_course_per_university'),
+        ),
+    ]
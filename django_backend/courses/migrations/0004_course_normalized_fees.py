@@ -0,0 +1,78 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:37
+
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+# Fee normalization as of this migration (courses.normalization may change later).
+DEFAULT_DURATION_MONTHS = 12
+DURATION_PATTERN = re.compile(
+    r'(?P<amount>\d+(?:[.,]\d+)?)\s*\+?\s*(?P<unit>years?|yrs?|y|months?|mos?|m|weeks?|wks?|w|semesters?|terms?)\b',
+    re.IGNORECASE,
+)
+MONTHS_PER_UNIT = {'y': Decimal(12), 'm': Decimal(1), 'w': Decimal(12) / Decimal(52), 's': Decimal(6), 't': Decimal(4)}
+CENTS = Decimal('0.01')
+BATCH_SIZE = 1000
+
+
+def parse_duration_months(text):
+    total = Decimal(0)
+    found = False
+    for match in DURATION_PATTERN.finditer(text or ''):
+        total += Decimal(match.group('amount').replace(',', '.')) * MONTHS_PER_UNIT[match.group('unit')[0].lower()]
+        found = True
+    if not found or total <= 0:
+        return None
+    return int(total.to_integral_value(rounding=ROUND_HALF_UP)) or 1
+
+
+def normalize_fees(fees, fees_type, duration_months):
+    if fees is None:
+        return None, None
+    fees = Decimal(fees)
+    months = Decimal(duration_months or DEFAULT_DURATION_MONTHS)
+    if fees_type == 'monthly':
+        annual, total = fees * 12, fees * months
+    elif fees_type == 'yearly':
+        annual, total = fees, fees * months / 12
+    else:
+        annual, total = fees * 12 / months, fees
+    return annual.quantize(CENTS, ROUND_HALF_UP), total.quantize(CENTS, ROUND_HALF_UP)
+
+
+def backfill(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    courses = Course.objects.using(schema_editor.connection.alias)
+    batch = []
+    for course in courses.only('id', 'fees', 'fees_type', 'duration').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        course.annual_fees, course.total_fees = normalize_fees(
+            course.fees, course.fees_type, parse_duration_months(course.duration),
+        )
+        batch.append(course)
+        if len(batch) >= BATCH_SIZE:
+            courses.bulk_update(batch, ['annual_fees', 'total_fees'])
+            batch = []
+    if batch:
+        courses.bulk_update(batch, ['annual_fees', 'total_fees'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_catalog_natural_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='annual_fees',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='total_fees',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
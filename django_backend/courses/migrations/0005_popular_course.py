@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_normalized_fees'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularCourse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField(unique=True)),
+                ('score', models.FloatField()),
+                ('save_count', models.PositiveIntegerField(default=0)),
+                ('comparison_count', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='popularity', to='courses.course')),
+            ],
+            options={
+                'ordering': ['rank'],
+            },
+        ),
+    ]
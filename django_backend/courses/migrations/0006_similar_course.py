@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_popular_course'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarCourse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('co_saves', models.PositiveIntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_courses', to='courses.course')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course')),
+            ],
+            options={
+                'ordering': ['course', '-score'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similarcourse',
+            constraint=models.UniqueConstraint(fields=('course', 'similar'), name='unique_similar_course'),
+        ),
+    ]
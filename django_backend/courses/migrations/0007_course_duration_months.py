@@ -0,0 +1,55 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:44
+
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+# The duration parser as of this migration (courses.normalization may change later).
+DURATION_PATTERN = re.compile(
+    r'(?P<amount>\d+(?:[.,]\d+)?)\s*\+?\s*(?P<unit>years?|yrs?|y|months?|mos?|m|weeks?|wks?|w|semesters?|terms?)\b',
+    re.IGNORECASE,
+)
+MONTHS_PER_UNIT = {'y': Decimal(12), 'm': Decimal(1), 'w': Decimal(12) / Decimal(52), 's': Decimal(6), 't': Decimal(4)}
+BATCH_SIZE = 1000
+
+
+def parse_duration_months(text):
+    total = Decimal(0)
+    found = False
+    for match in DURATION_PATTERN.finditer(text or ''):
+        total += Decimal(match.group('amount').replace(',', '.')) * MONTHS_PER_UNIT[match.group('unit')[0].lower()]
+        found = True
+    if not found or total <= 0:
+        return None
+    return int(total.to_integral_value(rounding=ROUND_HALF_UP)) or 1
+
+
+def backfill(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    courses = Course.objects.using(schema_editor.connection.alias)
+    batch = []
+    for course in courses.only('id', 'duration').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        course.duration_months = parse_duration_months(course.duration)
+        batch.append(course)
+        if len(batch) >= BATCH_SIZE:
+            courses.bulk_update(batch, ['duration_months'])
+            batch = []
+    if batch:
+        courses.bulk_update(batch, ['duration_months'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_similar_course'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='duration_months',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:49
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Django compiles icontains to UPPER(column::text) LIKE UPPER(%s) on
+# PostgreSQL, so the trigram indexes are built on that expression.
+TRIGRAM_INDEXES = [
+    ('courses_course_subject_trgm', 'courses_course', 'subject'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_course_duration_months'),
+        ('universities', '0003_university_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created_at', '-id'], name='course_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-rating', '-created_at'], name='course_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['level', '-created_at'], name='course_level_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['format', '-created_at'], name='course_format_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['level', 'annual_fees'], name='course_level_fees_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('format', 'Online')), fields=['annual_fees'], name='course_online_fees_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
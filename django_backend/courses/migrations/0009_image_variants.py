@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_course_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='image_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='image_source',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
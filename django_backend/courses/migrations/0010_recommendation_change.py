@@ -0,0 +1,25 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField()),
+                ('course_id', models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='recommendationchange',
+            constraint=models.UniqueConstraint(fields=('user_id', 'course_id'), name='unique_recommendation_change'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from universities.models import University
+from .normalization import normalize_fees, parse_duration_months
 
 class Course(models.Model):
     LEVEL_CHOICES = [
@@ -28,9 +30,14 @@ class Course(models.Model):
     level = models.CharField(max_length=20, choices=LEVEL_CHOICES)
     subject = models.CharField(max_length=200)
     duration = models.CharField(max_length=100)
+    # Parsed from duration on save; used for range filtering and ordering.
+    duration_months = models.PositiveIntegerField(blank=True, null=True, editable=False, db_index=True)
     format = models.CharField(max_length=20, choices=FORMAT_CHOICES)
     fees = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     fees_type = models.CharField(max_length=10, choices=FEES_TYPE_CHOICES, default='total')
+    # Derived from fees, fees_type and duration on save; used for filtering and ordering.
+    annual_fees = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, editable=False, db_index=True)
+    total_fees = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, editable=False, db_index=True)
     credits = models.IntegerField(blank=True, null=True)
     application_deadline = models.DateTimeField(blank=True, null=True)
     start_date = models.DateTimeField(blank=True, null=True)
@@ -38,8 +45,87 @@ class Course(models.Model):
     course_structure = models.JSONField(blank=True, null=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, blank=True, null=True)
     image_url = models.URLField(blank=True, null=True)
+    # Content hash of the thumbnails rendered from image_source (config.images).
+    image_key = models.CharField(max_length=64, blank=True, default='', editable=False)
+    image_source = models.TextField(blank=True, default='', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_document = models.TextField(blank=True, default='', editable=False)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
 
     def __str__(self):
         return self.title
+
+    def update_derived_fields(self):
+        self.duration_months = parse_duration_months(self.duration)
+        self.annual_fees, self.total_fees = normalize_fees(self.fees, self.fees_type, self.duration_months)
+
+    def save(self, *args, **kwargs):
+        self.update_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'fees', 'fees_type', 'duration'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'duration_months', 'annual_fees', 'total_fees'}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['university', 'title', 'level'], name='unique_course_per_university'),
+        ]
+        # Matched to CourseFilter: an equality filter followed by the list
+        # ordering. Trigram indexes for the substring filters are created
+        # in migration 0008 on PostgreSQL only.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='course_created_idx'),
+            models.Index(fields=['-rating', '-created_at'], name='course_rating_idx'),
+            models.Index(fields=['level', '-created_at'], name='course_level_created_idx'),
+            models.Index(fields=['format', '-created_at'], name='course_format_created_idx'),
+            models.Index(fields=['level', 'annual_fees'], name='course_level_fees_idx'),
+            models.Index(
+                fields=['annual_fees'], name='course_online_fees_idx', condition=models.Q(format='Online'),
+            ),
+        ]
+
+class PopularCourse(models.Model):
+    """Precomputed top-N popularity ranking, rebuilt by ``rebuild_popularity``."""
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, related_name='popularity')
+    rank = models.PositiveIntegerField(unique=True)
+    score = models.FloatField()
+    save_count = models.PositiveIntegerField(default=0)
+    comparison_count = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['rank']
+
+    def __str__(self):
+        return f'#{self.rank} {self.course}'
+
+class SimilarCourse(models.Model):
+    """Item-to-item neighbours from saved-course co-occurrence, rebuilt by ``rebuild_recommendations``."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='similar_courses')
+    similar = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    co_saves = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['course', '-score']
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'similar'], name='unique_similar_course'),
+        ]
+
+    def __str__(self):
+        return f'{self.course_id} -> {self.similar_id} ({self.score:.3f})'
+
+class RecommendationChange(models.Model):
+    """A saved-course add or removal not yet folded into SimilarCourse.
+
+    Plain ids rather than foreign keys: the course or user may be gone by
+    the time ``rebuild_recommendations --incremental`` reads the row.
+    """
+    user_id = models.BigIntegerField()
+    course_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'course_id'], name='unique_recommendation_change'),
+        ]
@@ -0,0 +1,105 @@
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.utils import timezone
+
+# Used to annualize or total fees when a course's duration cannot be parsed.
+DEFAULT_DURATION_MONTHS = 12
+
+_DURATION_PATTERN = re.compile(
+    r'(?P<amount>\d+(?:[.,]\d+)?)\s*\+?\s*(?P<unit>years?|yrs?|y|months?|mos?|m|weeks?|wks?|w|semesters?|terms?)\b',
+    re.IGNORECASE,
+)
+_MONTHS_PER_UNIT = {
+    'y': Decimal(12),
+    'm': Decimal(1),
+    'w': Decimal(12) / Decimal(52),
+    's': Decimal(6),
+    't': Decimal(4),
+}
+_CENTS = Decimal('0.01')
+
+
+def parse_duration_months(text):
+    """Parse free-text durations such as '2 years', '18 months' or '1.5 yrs'.
+
+    Multiple parts are added up ('1 year 6 months'). Returns ``None`` when
+    nothing recognizable is found.
+    """
+    if not text:
+        return None
+    total = Decimal(0)
+    found = False
+    for match in _DURATION_PATTERN.finditer(text):
+        amount = Decimal(match.group('amount').replace(',', '.'))
+        unit = match.group('unit')[0].lower()
+        total += amount * _MONTHS_PER_UNIT[unit]
+        found = True
+    if not found or total <= 0:
+        return None
+    return int(total.to_integral_value(rounding=ROUND_HALF_UP)) or 1
+
+
+def normalize_fees(fees, fees_type, duration_months):
+    """Return ``(annual_fees, total_fees)`` for a course's quoted fees."""
+    if fees is None:
+        return None, None
+    fees = Decimal(fees)
+    months = Decimal(duration_months or DEFAULT_DURATION_MONTHS)
+    if fees_type == 'monthly':
+        annual, total = fees * 12, fees * months
+    elif fees_type == 'yearly':
+        annual, total = fees, fees * months / 12
+    else:
+        annual, total = fees * 12 / months, fees
+    return annual.quantize(_CENTS, ROUND_HALF_UP), total.quantize(_CENTS, ROUND_HALF_UP)
+
+
+def _backfill(course_model, fields, derive, using, batch_size):
+    # bulk_update skips auto_now, so changed rows get updated_at set here to
+    # move their ETags; unchanged rows are left alone.
+    queryset = course_model.objects.using(using).only('id', 'fees', 'fees_type', 'duration', *fields).order_by('id')
+    now = timezone.now()
+    batch, updated = [], 0
+    for course in queryset.iterator(chunk_size=batch_size):
+        before = [getattr(course, name) for name in fields]
+        derive(course)
+        if [getattr(course, name) for name in fields] == before:
+            continue
+        course.updated_at = now
+        batch.append(course)
+        if len(batch) >= batch_size:
+            updated += course_model.objects.using(using).bulk_update(batch, [*fields, 'updated_at'])
+            batch = []
+    if batch:
+        updated += course_model.objects.using(using).bulk_update(batch, [*fields, 'updated_at'])
+    return updated
+
+
+def _derive_fees(course):
+    course.annual_fees, course.total_fees = normalize_fees(
+        course.fees, course.fees_type, parse_duration_months(course.duration),
+    )
+
+
+def backfill_normalized_fees(course_model, using='default', batch_size=1000):
+    """Recompute annual/total fees for every course; returns the number changed.
+
+    Like any bulk update this sends no signals: callers refresh the stats
+    and caches that depend on fees.
+    """
+    return _backfill(course_model, ['annual_fees', 'total_fees'], _derive_fees, using, batch_size)
+
+
+def _derive_duration(course):
+    course.duration_months = parse_duration_months(course.duration)
+    course.annual_fees, course.total_fees = normalize_fees(course.fees, course.fees_type, course.duration_months)
+
+
+def backfill_duration_months(course_model, using='default', batch_size=1000):
+    """Re-parse ``duration`` into ``duration_months`` for every course; returns the number changed.
+
+    Fees are annualized or totalled over the duration, so they are
+    recomputed in the same pass.
+    """
+    return _backfill(course_model, ['duration_months', 'annual_fees', 'total_fees'], _derive_duration, using, batch_size)
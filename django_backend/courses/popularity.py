@@ -0,0 +1,91 @@
+import heapq
+import math
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from config.response_cache import response_cache
+from users.models import CourseComparison
+from .models import Course, PopularCourse
+
+# Only this many courses are ranked; the popular endpoint never serves more.
+POPULAR_TOP_N = 100
+
+RATING_WEIGHT = 1.0
+SAVE_WEIGHT = 1.0
+COMPARISON_WEIGHT = 0.5
+
+# Whether a ranking is stored, remembered briefly so the popular endpoint
+# does not check on every request.
+RANKED_CACHE_KEY = 'courses:popularity:ranked'
+RANKED_CACHE_TIMEOUT = 60
+
+
+def popularity_score(rating, save_count, comparison_count):
+    """Blend the 0-5 rating with log-damped engagement counts."""
+    return (
+        RATING_WEIGHT * float(rating or 0)
+        + SAVE_WEIGHT * math.log1p(save_count)
+        + COMPARISON_WEIGHT * math.log1p(comparison_count)
+    )
+
+
+def count_comparison_appearances():
+    counts = Counter()
+    for course_ids in CourseComparison.objects.values_list('course_ids', flat=True).iterator():
+        if not isinstance(course_ids, list):
+            continue
+        for course_id in set(course_ids):
+            try:
+                counts[int(course_id)] += 1
+            except (TypeError, ValueError):
+                continue
+    return counts
+
+
+def is_ranked():
+    """Whether ``rebuild_popularity`` has stored a ranking yet."""
+    ranked = cache.get(RANKED_CACHE_KEY)
+    if ranked is None:
+        ranked = PopularCourse.objects.exists()
+        cache.set(RANKED_CACHE_KEY, ranked, RANKED_CACHE_TIMEOUT)
+    return ranked
+
+
+def rebuild_popularity(top_n=POPULAR_TOP_N):
+    """Recompute every course's score and store the best ``top_n``.
+
+    Courses are streamed once; only a heap of ``top_n`` entries is kept
+    in memory. Ties fall back to the newest course, as before.
+    """
+    comparison_counts = count_comparison_appearances()
+    rows = (
+        Course.objects.order_by()
+        .annotate(save_count=Count('savedcourse'))
+        .values_list('id', 'rating', 'created_at', 'save_count')
+        .iterator(chunk_size=5000)
+    )
+    top = heapq.nlargest(
+        top_n,
+        (
+            (popularity_score(rating, save_count, comparison_counts[pk]), created_at, pk, save_count)
+            for pk, rating, created_at, save_count in rows
+        ),
+    )
+
+    computed_at = timezone.now()
+    entries = [
+        PopularCourse(
+            course_id=pk, rank=rank, score=score, save_count=save_count,
+            comparison_count=comparison_counts[pk], computed_at=computed_at,
+        )
+        for rank, (score, _, pk, save_count) in enumerate(top, start=1)
+    ]
+    with transaction.atomic():
+        PopularCourse.objects.all().delete()
+        PopularCourse.objects.bulk_create(entries)
+    cache.set(RANKED_CACHE_KEY, bool(entries), RANKED_CACHE_TIMEOUT)
+    response_cache.invalidate('popular')
+    return len(entries)
@@ -0,0 +1,205 @@
+import heapq
+import math
+import re
+from array import array
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from config.process_index import ProcessIndex, table_version
+from config.response_cache import response_cache
+from users.models import SavedCourse
+from .models import Course, RecommendationChange, SimilarCourse
+
+# Neighbours kept per course, and courses kept per subject for interest matching.
+TOP_K = 20
+SUBJECT_TOP_K = 50
+# Users with more saves than this add noise and quadratic work; they are skipped.
+MAX_BASKET_SIZE = 200
+# Weight of a study_interest subject match relative to a cosine similarity (0-1).
+SUBJECT_WEIGHT = 0.5
+
+# Pending changes past this many make an incremental run a full rebuild.
+MAX_CHANGES = 10000
+# How often a process checks whether another process rebuilt the index.
+INDEX_CHECK_INTERVAL = 30
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def _words(text):
+    return frozenset(_WORD_RE.findall((text or '').lower()))
+
+
+def load_baskets(user_ids=None):
+    """Return ``{user_id: [course_id, ...]}`` for the SavedCourse matrix."""
+    queryset = SavedCourse.objects.order_by()
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    baskets = defaultdict(list)
+    for user_id, course_id in queryset.values_list('user_id', 'course_id').iterator(chunk_size=5000):
+        baskets[user_id].append(course_id)
+    return baskets
+
+
+def item_counts():
+    return Counter(dict(
+        SavedCourse.objects.order_by().values('course_id').annotate(n=Count('id')).values_list('course_id', 'n')
+    ))
+
+
+def compute_neighbors(baskets, counts, targets=None, top_k=TOP_K):
+    """Cosine neighbours for ``targets`` (all courses when None).
+
+    This is the sparse product X^T X of the binary user x course matrix:
+    only pairs that co-occur in some basket are ever touched, and each
+    row is cut to its ``top_k`` entries.
+    """
+    co = defaultdict(Counter)
+    for items in baskets.values():
+        if len(items) < 2 or len(items) > MAX_BASKET_SIZE:
+            continue
+        for course_id in items:
+            if targets is not None and course_id not in targets:
+                continue
+            row = co[course_id]
+            for other_id in items:
+                if other_id != course_id:
+                    row[other_id] += 1
+    neighbors = {}
+    for course_id, row in co.items():
+        n = counts[course_id]
+        neighbors[course_id] = heapq.nlargest(
+            top_k,
+            ((shared / math.sqrt(n * counts[other_id]), other_id, shared) for other_id, shared in row.items()),
+        )
+    return neighbors
+
+
+def _write_neighbors(neighbors, course_ids):
+    rows = [
+        SimilarCourse(course_id=course_id, similar_id=other_id, score=score, co_saves=shared)
+        for course_id, entries in neighbors.items()
+        for score, other_id, shared in entries
+    ]
+    with transaction.atomic():
+        stale = SimilarCourse.objects.all()
+        if course_ids is not None:
+            stale = stale.filter(course_id__in=course_ids)
+        stale.delete()
+        SimilarCourse.objects.bulk_create(rows, batch_size=5000)
+    recommendation_index.invalidate()
+    response_cache.invalidate('recommendations')
+    return len(rows)
+
+
+def rebuild_recommendations():
+    """Recompute the whole similarity table. Returns the number of rows written."""
+    RecommendationChange.objects.all().delete()
+    return _write_neighbors(compute_neighbors(load_baskets(), item_counts()), None)
+
+
+def update_recommendations():
+    """Recompute only the courses whose co-saves changed since the last run.
+
+    A change touches its course and every course in the user's current
+    basket. Only the baskets of users who saved one of those courses are
+    read.
+    """
+    changes = list(
+        RecommendationChange.objects.order_by('id').values_list('id', 'user_id', 'course_id')[:MAX_CHANGES + 1]
+    )
+    if not changes:
+        return 0
+    if len(changes) > MAX_CHANGES:
+        return rebuild_recommendations()
+    # Claimed before the baskets are read, so a change made meanwhile gets a new row.
+    RecommendationChange.objects.filter(id__lte=changes[-1][0]).delete()
+    dirty = {course_id for _, _, course_id in changes}
+    dirty.update(SavedCourse.objects.filter(
+        user_id__in={user_id for _, user_id, _ in changes},
+    ).values_list('course_id', flat=True))
+    user_ids = SavedCourse.objects.filter(course_id__in=dirty).values('user_id')
+    neighbors = compute_neighbors(load_baskets(user_ids), item_counts(), targets=dirty)
+    return _write_neighbors(neighbors, dirty)
+
+
+def mark_changed(user_id, course_id):
+    """Record a saved-course change; one INSERT that repeats of the same change collapse into."""
+    RecommendationChange.objects.bulk_create(
+        [RecommendationChange(user_id=user_id, course_id=course_id)], ignore_conflicts=True,
+    )
+
+
+class RecommendationIndex:
+    """In-memory neighbour lists and subject lists, keyed by course id.
+
+    Rows are packed into ``array`` objects (ids as signed 64-bit, scores as
+    doubles), so a lookup is a dict access and a slice, with no query.
+    """
+
+    def __init__(self, neighbors, subjects):
+        self.neighbors = neighbors
+        self.subjects = subjects
+
+    @classmethod
+    def load(cls):
+        neighbors = {}
+        current, ids, scores = None, None, None
+        for course_id, other_id, score in SimilarCourse.objects.order_by('course_id', '-score').values_list(
+            'course_id', 'similar_id', 'score'
+        ).iterator(chunk_size=5000):
+            if course_id != current:
+                current, ids, scores = course_id, array('q'), array('d')
+                neighbors[course_id] = (ids, scores)
+            ids.append(other_id)
+            scores.append(score)
+
+        subjects = {}
+        for course_id, subject in Course.objects.order_by('-rating', '-created_at').values_list(
+            'id', 'subject'
+        ).iterator(chunk_size=5000):
+            words = _words(subject)
+            if not words:
+                continue
+            ids = subjects.setdefault(words, array('q'))
+            if len(ids) < SUBJECT_TOP_K:
+                ids.append(course_id)
+        return cls(neighbors, subjects)
+
+    def similar(self, course_id, limit, exclude=()):
+        ids, scores = self.neighbors.get(course_id, ((), ()))
+        return [(other_id, score) for other_id, score in zip(ids, scores) if other_id not in exclude][:limit]
+
+    def matching_subjects(self, interest):
+        """Subjects whose words all appear in ``interest``."""
+        words = _words(interest)
+        if not words:
+            return []
+        return [ids for subject_words, ids in self.subjects.items() if subject_words <= words]
+
+    def for_user(self, saved_ids, interest, limit):
+        scores = Counter()
+        for course_id in saved_ids:
+            ids, sims = self.neighbors.get(course_id, ((), ()))
+            for other_id, score in zip(ids, sims):
+                scores[other_id] += score
+        for ids in self.matching_subjects(interest):
+            for other_id in ids:
+                scores[other_id] += SUBJECT_WEIGHT
+        for course_id in saved_ids:
+            scores.pop(course_id, None)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+def index_version():
+    # Rebuilds and incremental runs replace rows, so the count or the
+    # highest id moves; they run as their own process.
+    return table_version(SimilarCourse.objects, 'id')
+
+
+recommendation_index = ProcessIndex(index_version, RecommendationIndex.load, INDEX_CHECK_INTERVAL)
+
+
+def get_index():
+    return recommendation_index.get()
@@ -0,0 +1,130 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import Case, F, FloatField, IntegerField, OuterRef, Q, Subquery, TextField, Value, When
+from django.db.models.functions import Cast, Coalesce, Concat, Lower
+
+SEARCH_CONFIG = 'english'
+
+# Relative weight of each field in the search document, highest first.
+# Postgres uses the letter weights; the SQLite fallback uses the scores.
+SEARCH_WEIGHTS = [
+    ('title', 'A', 8),
+    ('subject', 'B', 4),
+    ('university__name', 'C', 2),
+    ('description', 'D', 1),
+]
+
+# Course fields the search columns are built from; the university's name
+# is tracked by the university itself.
+INDEXED_FIELDS = ('title', 'subject', 'description', 'university_id')
+UNIVERSITY_INDEXED_FIELDS = ('name',)
+
+
+def is_postgres(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def _field_expression(field, university_name):
+    if field == 'university__name':
+        if not hasattr(university_name, 'resolve_expression'):
+            university_name = Value(university_name)
+        return Coalesce(university_name, Value(''), output_field=TextField())
+    # Without an explicit type, SearchVector cannot resolve TextField vs CharField.
+    return Coalesce(F(field), Value(''), output_field=TextField())
+
+
+def refresh_search_index(queryset, university_name):
+    """Rebuild the search columns for courses that share one university.
+
+    The university name (a string or an expression) is passed in rather
+    than joined because UPDATE statements cannot follow relations.
+    """
+    parts = []
+    for field, _, _ in SEARCH_WEIGHTS:
+        if parts:
+            parts.append(Value(' '))
+        parts.append(_field_expression(field, university_name))
+    values = {'search_document': Lower(Concat(*parts))}
+
+    if is_postgres(queryset):
+        vector = None
+        for field, weight, _ in SEARCH_WEIGHTS:
+            part = SearchVector(
+                _field_expression(field, university_name),
+                config=SEARCH_CONFIG,
+                weight=weight,
+            )
+            vector = part if vector is None else vector + part
+        values['search_vector'] = vector
+
+    return queryset.update(**values)
+
+
+DEFERRED = object()
+
+
+def indexed_state(instance, fields):
+    # Read from __dict__ so that deferred fields are not loaded; they count as changed.
+    return tuple(instance.__dict__.get(name, DEFERRED) for name in fields)
+
+
+def remember_indexed_state(instance, fields):
+    """Record the values of ``fields`` that ``instance`` was loaded or last indexed with."""
+    instance._search_state = indexed_state(instance, fields)
+
+
+def is_indexed(instance, fields):
+    """Whether ``fields`` still hold the values recorded by :func:`remember_indexed_state`."""
+    state = indexed_state(instance, fields)
+    return DEFERRED not in state and getattr(instance, '_search_state', None) == state
+
+
+def refresh_course(course):
+    """Rebuild one course's search columns, reusing its university when already loaded."""
+    from universities.models import University
+    from .models import Course
+
+    if Course.university.is_cached(course):
+        university_name = course.university.name
+    else:
+        university_name = Subquery(University.objects.filter(pk=OuterRef('university_id')).values('name')[:1])
+    updated = refresh_search_index(Course.objects.filter(pk=course.pk), university_name)
+    remember_indexed_state(course, INDEXED_FIELDS)
+    return updated
+
+
+def refresh_university(university):
+    updated = refresh_search_index(university.courses.all(), university.name)
+    remember_indexed_state(university, UNIVERSITY_INDEXED_FIELDS)
+    return updated
+
+
+def search_courses(queryset, search):
+    """Filter ``queryset`` down to courses matching ``search``.
+
+    Matches are annotated with ``search_rank`` so callers can order by
+    relevance.
+    """
+    if is_postgres(queryset):
+        query = SearchQuery(search, config=SEARCH_CONFIG, search_type='websearch')
+        # ts_rank is a float4. As double precision, the rank a keyset cursor
+        # carries back compares equal to the row it was read from.
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+        )
+
+    terms = search.lower().split()
+    if not terms:
+        return queryset.annotate(search_rank=Value(0, output_field=IntegerField()))
+
+    condition = Q()
+    rank = Value(0, output_field=IntegerField())
+    for term in terms:
+        condition &= Q(search_document__contains=term)
+        for field, _, score in SEARCH_WEIGHTS:
+            rank = rank + Case(
+                When(**{f'{field}__icontains': term}, then=Value(score)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+    return queryset.filter(condition).annotate(search_rank=rank)
@@ -2,18 +2,27 @@
 from rest_framework import serializers
 from .models import Course
 from universities.serializers import UniversitySerializer
+from config.fast_serializers import ValuesSerializer
+from config.images import ImageVariantsField
+from config.sparse_fields import SparseFieldsMixin
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     university = UniversitySerializer(read_only=True)
     university_id = serializers.IntegerField(write_only=True)
+    images = ImageVariantsField()
 
     class Meta:
         model = Course
-        fields = '__all__'
+        exclude = ['search_document', 'search_vector', 'image_key', 'image_source']
 
 class CourseListSerializer(serializers.ModelSerializer):
     university = UniversitySerializer(read_only=True)
+    images = ImageVariantsField()
 
     class Meta:
         model = Course
-        fields = ['id', 'title', 'university', 'level', 'subject', 'duration', 'format', 'fees', 'fees_type', 'rating', 'image_url']
+        fields = ['id', 'title', 'university', 'level', 'subject', 'duration', 'format', 'fees', 'fees_type', 'rating', 'image_url', 'images']
+
+# values()-driven equivalents of the serializers above for read-only lists.
+course_values = ValuesSerializer(CourseSerializer)
+course_list_values = ValuesSerializer(CourseListSerializer)
@@ -0,0 +1,76 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from config.images import clear_stale_key, image_workers
+from config.response_cache import response_cache
+from universities.models import University
+from .models import Course
+from .autocomplete import autocomplete_index
+from . import facets, search
+
+
+@receiver(post_init, sender=Course)
+def remember_course_search_state(sender, instance, **kwargs):
+    search.remember_indexed_state(instance, search.INDEXED_FIELDS)
+
+
+@receiver(post_init, sender=University)
+def remember_university_search_state(sender, instance, **kwargs):
+    search.remember_indexed_state(instance, search.UNIVERSITY_INDEXED_FIELDS)
+
+
+@receiver(post_save, sender=Course)
+def refresh_course_search(sender, instance, created, raw=False, **kwargs):
+    # Saves that leave the indexed fields alone keep the current columns.
+    if raw or (not created and search.is_indexed(instance, search.INDEXED_FIELDS)):
+        return
+    search.refresh_course(instance)
+
+
+@receiver(post_save, sender=University)
+def refresh_university_course_search(sender, instance, created, raw=False, **kwargs):
+    if raw or (not created and search.is_indexed(instance, search.UNIVERSITY_INDEXED_FIELDS)):
+        return
+    search.refresh_university(instance)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+def invalidate_course_facets(sender, **kwargs):
+    facets.invalidate_facets()
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_responses(sender, instance, **kwargs):
+    response_cache.invalidate('courses', f'course:{instance.pk}')
+
+
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+def invalidate_course_lists_for_university(sender, instance, **kwargs):
+    # Course lists embed the university and can be filtered by its country.
+    response_cache.invalidate('courses')
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+def refresh_autocomplete(sender, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete_index.invalidate()
+
+
+@receiver(pre_save, sender=Course)
+def clear_course_image(sender, instance, raw=False, **kwargs):
+    if not raw:
+        clear_stale_key(instance)
+
+
+@receiver(post_save, sender=Course)
+def render_course_image(sender, instance, raw=False, **kwargs):
+    if not raw:
+        image_workers.schedule(instance, ['courses', f'course:{instance.pk}'])
@@ -0,0 +1,198 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from config.response_cache import response_cache
+from universities.models import University
+from users.models import CourseComparison, SavedCourse
+from .autocomplete import autocomplete_index
+from .facets import invalidate_facets
+from .models import Course
+from .search import refresh_university
+
+# Synthetic rows are recognisable by these markers, so they can be removed again.
+UNIVERSITY_PREFIX = 'Synthetic'
+USER_EMAIL_DOMAIN = 'synthetic.example.com'
+USER_PASSWORD = 'synthetic-password'
+
+COUNTRIES = {
+    'United States': ['Boston', 'Austin', 'Seattle', 'Chicago', 'Denver'],
+    'United Kingdom': ['London', 'Leeds', 'Bristol', 'Glasgow'],
+    'Germany': ['Berlin', 'Munich', 'Hamburg'],
+    'Canada': ['Toronto', 'Montreal', 'Vancouver'],
+    'Australia': ['Sydney', 'Melbourne', 'Perth'],
+    'Netherlands': ['Amsterdam', 'Utrecht'],
+    'Japan': ['Tokyo', 'Osaka'],
+    'India': ['Bangalore', 'Delhi', 'Mumbai'],
+}
+SUBJECTS = [
+    'Computer Science', 'Data Science', 'Business Administration', 'Mechanical Engineering',
+    'Economics', 'Psychology', 'Medicine', 'Law', 'History', 'Physics', 'Biology',
+    'Architecture', 'Marketing', 'Finance', 'Education', 'Public Health',
+]
+TITLE_PATTERNS = ['{subject}', 'Applied {subject}', 'Advanced {subject}', '{subject} and Society', '{subject} Research']
+# (level, weight, durations)
+LEVELS = [
+    ("Bachelor's", 4, ['3 years', '4 years', '36 months']),
+    ("Master's", 3, ['1 year', '2 years', '18 months', '12 months']),
+    ('PhD', 1, ['3 years', '4 years', '5 years']),
+    ('Certificate', 2, ['6 months', '9 months', '12 weeks', '1 semester']),
+]
+FORMATS = [('On-campus', 5), ('Online', 3), ('Hybrid', 2)]
+# (fees_type, weight, (low, high))
+FEES_TYPES = [('yearly', 5, (2_000, 60_000)), ('total', 3, (1_000, 90_000)), ('monthly', 2, (200, 4_000))]
+
+
+def _weighted(rng, options):
+    return rng.choices(options, weights=[option[1] for option in options])[0]
+
+
+class CatalogGenerator:
+    """Build a reproducible synthetic catalog: the same ``seed`` and sizes give the same rows."""
+
+    def __init__(self, seed=0, batch_size=1000, stdout=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.stdout = stdout
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def generate(self, universities, courses, users, saves_per_user=5, comparisons_per_user=1):
+        with transaction.atomic():
+            university_rows = self.create_universities(universities)
+            course_ids = self.create_courses(university_rows, courses)
+            user_ids = self.create_users(users)
+            self.create_history(user_ids, course_ids, saves_per_user, comparisons_per_user)
+        for university in university_rows:
+            refresh_university(university)
+        invalidate_facets()
+        autocomplete_index.invalidate()
+        response_cache.invalidate_all()
+        return {
+            'universities': len(university_rows),
+            'courses': len(course_ids),
+            'users': len(user_ids),
+            'saved_courses': SavedCourse.objects.filter(user_id__in=user_ids).count(),
+            'comparisons': CourseComparison.objects.filter(user_id__in=user_ids).count(),
+        }
+
+    def create_universities(self, count):
+        start = University.objects.filter(name__startswith=f'{UNIVERSITY_PREFIX} ').count()
+        rows = []
+        for index in range(start, start + count):
+            country = self.rng.choice(list(COUNTRIES))
+            city = self.rng.choice(COUNTRIES[country])
+            rows.append(University(
+                name=f'{UNIVERSITY_PREFIX} University of {city} {index}',
+                country=country,
+                city=city,
+                description=f'A synthetic research university in {city}, {country}.',
+                website=f'https://university-{index}.{USER_EMAIL_DOMAIN}',
+                ranking=index + 1,
+                established=self.rng.randint(1450, 2010),
+            ))
+        University.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.log(f'Created {len(rows)} universities')
+        # bulk_create only returns primary keys on some backends.
+        return list(
+            University.objects.filter(name__startswith=f'{UNIVERSITY_PREFIX} ').order_by('-id').only('id', 'name')[:count]
+        )
+
+    def create_courses(self, universities, count):
+        if not universities:
+            return []
+        now = timezone.now()
+        seen, created = set(), []
+        batch = []
+        attempts = 0
+        while len(created) + len(batch) < count and attempts < count * 5:
+            attempts += 1
+            university = self.rng.choice(universities)
+            level, _, durations = _weighted(self.rng, LEVELS)
+            subject = self.rng.choice(SUBJECTS)
+            title = self.rng.choice(TITLE_PATTERNS).format(subject=subject)
+            if (university.id, title, level) in seen:
+                continue
+            seen.add((university.id, title, level))
+            fees_type, _, (low, high) = _weighted(self.rng, FEES_TYPES)
+            course = Course(
+                title=title,
+                university_id=university.id,
+                level=level,
+                subject=subject,
+                duration=self.rng.choice(durations),
+                format=_weighted(self.rng, FORMATS)[0],
+                fees=Decimal(self.rng.randrange(low, high, 50)) if self.rng.random() > 0.05 else None,
+                fees_type=fees_type,
+                credits=self.rng.choice([None, 30, 60, 90, 120, 180, 240]),
+                application_deadline=now + timedelta(days=self.rng.randint(-60, 300)) if self.rng.random() > 0.2 else None,
+                start_date=now + timedelta(days=self.rng.randint(30, 400)) if self.rng.random() > 0.3 else None,
+                description=f'{title} ({level}) covering {subject.lower()} fundamentals and practice.',
+                requirements='Relevant prior qualification and English proficiency.',
+                course_structure={'modules': self.rng.sample(SUBJECTS, 3)},
+                rating=Decimal(self.rng.randint(250, 500)) / 100,
+            )
+            course.update_derived_fields()
+            batch.append(course)
+            if len(batch) >= self.batch_size:
+                created.extend(Course.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            created.extend(Course.objects.bulk_create(batch))
+        self.log(f'Created {len(created)} courses')
+        return list(
+            Course.objects.filter(university_id__in=[university.id for university in universities])
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def create_users(self, count):
+        User = get_user_model()
+        start = User.objects.filter(email__endswith=f'@{USER_EMAIL_DOMAIN}').count()
+        # Hashing once keeps generation fast; every synthetic user shares the password.
+        password = make_password(USER_PASSWORD)
+        rows = [
+            User(
+                username=f'synthetic{index}',
+                email=f'synthetic{index}@{USER_EMAIL_DOMAIN}',
+                password=password,
+                study_interest=self.rng.choice(SUBJECTS),
+            )
+            for index in range(start, start + count)
+        ]
+        User.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.log(f'Created {len(rows)} users')
+        return list(
+            User.objects.filter(email__endswith=f'@{USER_EMAIL_DOMAIN}').order_by('-id').values_list('id', flat=True)[:count]
+        )
+
+    def create_history(self, user_ids, course_ids, saves_per_user, comparisons_per_user):
+        if not course_ids:
+            return
+        # Skewed towards a popular head so co-occurrence and popularity have signal.
+        weights = [1 / (rank + 1) ** 0.8 for rank in range(len(course_ids))]
+        saved, comparisons = [], []
+        for user_id in user_ids:
+            picks = set(self.rng.choices(course_ids, weights=weights, k=saves_per_user))
+            saved.extend(SavedCourse(user_id=user_id, course_id=course_id) for course_id in picks)
+            for _ in range(comparisons_per_user):
+                size = min(len(course_ids), self.rng.randint(2, 4))
+                comparisons.append(CourseComparison(user_id=user_id, course_ids=sorted(self.rng.sample(course_ids, size))))
+        SavedCourse.objects.bulk_create(saved, batch_size=self.batch_size, ignore_conflicts=True)
+        CourseComparison.objects.bulk_create(comparisons, batch_size=self.batch_size)
+        self.log(f'Created {len(saved)} saved courses and {len(comparisons)} comparisons')
+
+
+def delete_synthetic_data():
+    """Remove every synthetic university (with its courses) and user."""
+    users, _ = get_user_model().objects.filter(email__endswith=f'@{USER_EMAIL_DOMAIN}').delete()
+    universities, _ = University.objects.filter(name__startswith=f'{UNIVERSITY_PREFIX} ').delete()
+    invalidate_facets()
+    autocomplete_index.invalidate()
+    response_cache.invalidate_all()
+    return users + universities
@@ -0,0 +1,733 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+from base64 import urlsafe_b64encode
+from collections import Counter
+from datetime import timedelta
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from config.process_index import ProcessIndex
+from config.testing import QueryBudgetTestMixin
+from config.response_cache import response_cache
+from universities.models import University
+from users.models import SavedCourse
+from .autocomplete import AutocompleteIndex, autocomplete_index
+from .comparison import MAX_COMPARE_COURSES
+from .export import EXPORT_COLUMNS
+from .facets import compute_facets
+from .models import Course, RecommendationChange, SimilarCourse
+from .popularity import rebuild_popularity
+from .recommendations import get_index, rebuild_recommendations, recommendation_index, update_recommendations
+
+
+def make_university(**fields):
+    fields = {'name': 'Harbour University', 'country': 'Norway', 'city': 'Bergen', **fields}
+    return University.objects.create(**fields)
+
+
+def make_course(university, **fields):
+    fields = {
+        'title': 'General Studies', 'level': "Bachelor's", 'subject': 'Humanities', 'duration': '3 years',
+        'format': 'On-campus', 'fees': 9000, 'fees_type': 'yearly', 'rating': 4, **fields,
+    }
+    return Course.objects.create(university=university, **fields)
+
+
+class SearchRankingMixin:
+    """Ranking checks shared by the PostgreSQL and fallback search paths."""
+
+    def setUp(self):
+        university = make_university()
+        self.title = make_course(university, title='Marine Biology', description='Life in the oceans')
+        self.subject = make_course(university, title='Coastal Ecology', subject='Marine Science')
+        self.description = make_course(university, title='Art History', description='Includes marine painting')
+        self.unrelated = make_course(university, title='Accounting', subject='Business')
+
+    def search(self, query):
+        response = self.client.get('/api/courses/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [course['id'] for course in response.json()['results']]
+
+    def test_orders_by_field_weight(self):
+        self.assertEqual(self.search('marine'), [self.title.id, self.subject.id, self.description.id])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('marine oceans'), [self.title.id])
+
+    def test_explicit_ordering_wins(self):
+        response = self.client.get('/api/courses/', {'search': 'marine', 'ordering': 'created_at'})
+        ids = [course['id'] for course in response.json()['results']]
+        self.assertEqual(ids, [self.title.id, self.subject.id, self.description.id])
+
+    def test_follows_course_edits(self):
+        self.unrelated.description = 'Accounting for marine shipping'
+        self.unrelated.save()
+        self.assertIn(self.unrelated.id, self.search('shipping'))
+
+    def test_follows_university_renames(self):
+        university = self.title.university
+        university.name = 'Fjord Institute'
+        university.save()
+        self.assertEqual(len(self.search('fjord')), 4)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+class PostgresSearchTests(SearchRankingMixin, TestCase):
+    def test_uses_the_search_vector(self):
+        self.assertTrue(Course.objects.filter(pk=self.title.pk, search_vector__isnull=False).exists())
+
+    def test_matches_word_stems(self):
+        self.assertEqual(self.search('paintings'), [self.description.id])
+
+
+class FallbackSearchTests(SearchRankingMixin, TestCase):
+    """The per-term document match used on SQLite, forced on every backend."""
+
+    def setUp(self):
+        patcher = mock.patch('courses.search.is_postgres', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_document_is_lowercased(self):
+        self.title.refresh_from_db()
+        self.assertEqual(self.title.search_document, 'marine biology humanities harbour university life in the oceans')
+
+    def test_matches_substrings_case_insensitively(self):
+        self.assertEqual(self.search('MARIN'), [self.title.id, self.subject.id, self.description.id])
+
+
+def index_updates(queries):
+    # The search refresh is the UPDATE that derives the document in SQL.
+    return [query for query in queries if query['sql'].startswith('UPDATE') and 'LOWER(' in query['sql'].upper()]
+
+
+class SearchIndexMaintenanceTests(TestCase):
+    def setUp(self):
+        self.university = make_university()
+        self.course = make_course(self.university)
+
+    def test_unrelated_edit_skips_the_index_update(self):
+        course = Course.objects.get(pk=self.course.pk)
+        course.rating = 3
+        with CaptureQueriesContext(connection) as queries:
+            course.save()
+        self.assertEqual(len(index_updates(queries)), 0)
+
+    def test_indexing_reuses_the_loaded_university(self):
+        course = Course.objects.select_related('university').get(pk=self.course.pk)
+        course.title = 'Applied Studies'
+        with CaptureQueriesContext(connection) as queries:
+            course.save()
+        self.assertEqual(len(index_updates(queries)), 1)
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('SELECT') and 'FROM "universities_university"' in query['sql']
+        ])
+        course.refresh_from_db()
+        self.assertIn('applied studies', course.search_document)
+
+    def test_university_without_a_rename_skips_its_courses(self):
+        university = University.objects.get(pk=self.university.pk)
+        university.ranking = 10
+        with CaptureQueriesContext(connection) as queries:
+            university.save()
+        self.assertEqual(len(index_updates(queries)), 0)
+
+
+class PopularCoursesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        response_cache.cache.clear()
+        university = make_university()
+        self.low = make_course(university, title='Low', rating=2)
+        self.high = make_course(university, title='High', rating=5)
+
+    def get(self, **headers):
+        return self.client.get('/api/courses/popular/', {'limit': 1}, **headers)
+
+    def test_falls_back_to_rating_until_ranked(self):
+        self.assertEqual([course['id'] for course in self.get().json()], [self.high.id])
+
+    def test_etag_follows_a_rebuild(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        rebuild_popularity()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_validators_only_read_the_served_rows(self):
+        rebuild_popularity()
+        etag = self.get()['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('LIMIT 1', queries[0]['sql'])
+
+
+class CourseFilterTests(TestCase):
+    def setUp(self):
+        university = make_university()
+        self.cheap = make_course(university, title='Cheap', fees=3000, duration='1 year')
+        self.dear = make_course(university, title='Dear', fees=30000, duration='4 years')
+
+    def ids(self, **params):
+        response = self.client.get('/api/courses/', params)
+        self.assertEqual(response.status_code, 200)
+        return {course['id'] for course in response.json()['results']}
+
+    def test_fee_bounds(self):
+        self.assertEqual(self.ids(minFees='10000'), {self.dear.id})
+        self.assertEqual(self.ids(maxFees='10000'), {self.cheap.id})
+
+    def test_malformed_fee_bounds_are_ignored(self):
+        for value in ('x', 'nan', 'inf', ''):
+            self.assertEqual(self.ids(minFees=value, maxFees=value), {self.cheap.id, self.dear.id})
+
+    def test_large_fee_bounds(self):
+        self.assertEqual(self.ids(minFees='1e30'), set())
+
+    def test_duration_bounds(self):
+        self.assertEqual(self.ids(minDuration='24'), {self.dear.id})
+        self.assertEqual(self.ids(maxDuration='24'), {self.cheap.id})
+
+    def test_malformed_duration_bounds_are_ignored(self):
+        for value in ('abc', '1.5', ''):
+            self.assertEqual(self.ids(minDuration=value, maxDuration=value), {self.cheap.id, self.dear.id})
+
+    def test_large_duration_bounds(self):
+        self.assertEqual(self.ids(minDuration='9' * 30), set())
+
+
+class AutocompleteTests(TestCase):
+    def build(self, suggestions):
+        return AutocompleteIndex(Counter(suggestions))
+
+    def texts(self, index, query, limit=3, types=None):
+        return [item['text'] for item in index.suggest(query, limit, types)]
+
+    def test_crowded_prefixes_rank_every_match(self):
+        suggestions = {(f'Aa {number}', 'course'): 1 for number in range(10)}
+        suggestions[('Azure Studies', 'course')] = 50
+        suggestions[('Art', 'city')] = 5
+        with mock.patch('courses.autocomplete.MAX_CANDIDATES', 3):
+            index = self.build(suggestions)
+            self.assertIn('a', index.buckets)
+            self.assertEqual(self.texts(index, 'a', 2), ['Azure Studies', 'Art'])
+            self.assertEqual(self.texts(index, 'a', 1, {'city'}), ['Art'])
+            self.assertEqual(self.texts(index, 'st'), ['Azure Studies'])
+
+    def test_edits_by_another_process_reach_the_index(self):
+        course = make_course(make_university(), title='Glaciology')
+        autocomplete_index.invalidate()
+        self.assertIn('Glaciology', self.texts(autocomplete_index.get(), 'glac'))
+        # An import or another worker: no local invalidate().
+        Course.objects.filter(pk=course.pk).update(title='Volcanology', updated_at=timezone.now())
+        with mock.patch('time.monotonic', return_value=time.monotonic() + autocomplete_index.rebuild_interval + 1):
+            self.assertEqual(self.texts(autocomplete_index.get(), 'glac'), [])
+            self.assertIn('Volcanology', self.texts(autocomplete_index.get(), 'volc'))
+
+    def test_rebuilds_are_debounced(self):
+        loads, changes = [], []
+        index = ProcessIndex(lambda: len(changes), lambda: loads.append(1) or len(loads), check_interval=0, rebuild_interval=60)
+        self.assertEqual(index.get(), 1)
+        changes.append(1)
+        index.invalidate()
+        changes.append(1)
+        self.assertEqual(index.get(), 1)
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(index.get(), 2)
+
+
+class RecommendationUpdateTests(TestCase):
+    def setUp(self):
+        university = make_university()
+        self.courses = [make_course(university, title=f'Course {number}') for number in range(5)]
+        self.users = [
+            get_user_model().objects.create_user(f'user{number}', f'user{number}@example.com', 'secret')
+            for number in range(3)
+        ]
+        for user, indexes in zip(self.users, ([0, 1, 2], [1, 2], [2, 3])):
+            for index in indexes:
+                SavedCourse.objects.create(user=user, course=self.courses[index])
+        rebuild_recommendations()
+
+    def similarities(self):
+        return set(SimilarCourse.objects.values_list('course_id', 'similar_id', 'co_saves'))
+
+    def test_a_save_records_one_change_without_reading_the_basket(self):
+        with CaptureQueriesContext(connection) as queries:
+            SavedCourse.objects.create(user=self.users[2], course=self.courses[4])
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT')])
+        SavedCourse.objects.filter(user=self.users[2], course=self.courses[4]).delete()
+        self.assertEqual(RecommendationChange.objects.count(), 1)
+
+    def test_incremental_update_matches_a_rebuild(self):
+        SavedCourse.objects.create(user=self.users[2], course=self.courses[4])
+        SavedCourse.objects.get(user=self.users[0], course=self.courses[0]).delete()
+        update_recommendations()
+        self.assertFalse(RecommendationChange.objects.exists())
+        updated = self.similarities()
+        rebuild_recommendations()
+        self.assertEqual(updated, self.similarities())
+
+    def test_rebuild_by_another_process_reaches_the_index(self):
+        self.assertNotIn(self.courses[4].pk, dict(get_index().similar(self.courses[2].pk, 10)))
+        SavedCourse.objects.create(user=self.users[2], course=self.courses[4])
+        # The command's invalidate() runs in its own process.
+        with mock.patch.object(recommendation_index, 'invalidate'):
+            update_recommendations()
+        with mock.patch('time.monotonic', return_value=time.monotonic() + recommendation_index.check_interval + 1):
+            self.assertIn(self.courses[4].pk, dict(get_index().similar(self.courses[2].pk, 10)))
+
+    def test_too_many_changes_rebuild_everything(self):
+        SavedCourse.objects.create(user=self.users[2], course=self.courses[4])
+        SavedCourse.objects.create(user=self.users[1], course=self.courses[4])
+        with mock.patch('courses.recommendations.MAX_CHANGES', 1), \
+                mock.patch('courses.recommendations.rebuild_recommendations', return_value=0) as rebuild:
+            update_recommendations()
+        rebuild.assert_called_once()
+
+
+class ImportCatalogTests(TestCase):
+    def run_import(self, model, rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as source:
+            source.writelines(json.dumps(row) + '\n' for row in rows)
+        self.addCleanup(os.remove, source.name)
+        with tempfile.NamedTemporaryFile('r', suffix='.jsonl') as errors:
+            call_command('import_catalog', model, source.name, errors=errors.name, stdout=mock.Mock())
+            return [json.loads(line) for line in errors]
+
+    def test_courses_resolve_universities_by_name_and_country(self):
+        make_university(name='Central University', country='Kenya', city='Nairobi')
+        rows = [{'name': 'Central University', 'country': 'Chile', 'city': 'Santiago'}]
+        self.assertEqual(self.run_import('universities', rows), [])
+        errors = self.run_import('courses', [{
+            'title': 'Geology', 'level': "Master's", 'subject': 'Science', 'duration': '2 years',
+            'format': 'On-campus', 'fees': 1000, 'university': 'Central University', 'university_country': 'Chile',
+        }, {'title': 'Orphan', 'university': 'Central University', 'university_country': 'Peru'}])
+        self.assertEqual(Course.objects.get(title='Geology').university.country, 'Chile')
+        self.assertEqual([error['line'] for error in errors], [2])
+
+
+class CourseQueryBudgetTests(QueryBudgetTestMixin, TransactionTestCase):
+    """Every course view on a cold cache, as an authenticated user, including the on_commit work of writes."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        response_cache.cache.clear()
+        self.university = make_university()
+        self.courses = [make_course(self.university, title=f'Course {number}') for number in range(3)]
+        self.user = get_user_model().objects.create_user('ada', 'ada@example.com', 'secret')
+        for course in self.courses[:2]:
+            SavedCourse.objects.create(user=self.user, course=course)
+        rebuild_popularity()
+        rebuild_recommendations()
+        self.client.force_login(self.user)
+        self.ids = ','.join(str(course.pk) for course in self.courses)
+
+    def test_reads(self):
+        pk = self.courses[0].pk
+        for path, params in [
+            ('/api/courses/', {}),
+            ('/api/courses/', {'search': 'course', 'facets': 'true', 'minFees': '100'}),
+            ('/api/courses/', {'pagination': 'cursor', 'count': 'false'}),
+            ('/api/courses/popular/', {}),
+            ('/api/courses/autocomplete/', {'q': 'cou'}),
+            ('/api/courses/export/', {}),
+            (f'/api/courses/{pk}/', {}),
+            (f'/api/courses/{pk}/recommendations/', {}),
+            ('/api/compare-courses/', {'courseIds': self.ids}),
+            ('/api/compare-courses/matrix/', {'courseIds': self.ids}),
+        ]:
+            with self.subTest(path=path, params=params):
+                self.assertRequestWithinQueryBudget('get', path, params)
+
+    def test_posts(self):
+        self.assertRequestWithinQueryBudget('post', '/api/courses/', {
+            'university_id': self.university.pk, 'title': 'Geology', 'level': "Master's", 'subject': 'Science',
+            'duration': '2 years', 'format': 'Online', 'fees': 4000, 'fees_type': 'yearly',
+        })
+        course_ids = [course.pk for course in self.courses]
+        self.assertRequestWithinQueryBudget('post', '/api/compare-courses/', {'courseIds': course_ids})
+        self.assertRequestWithinQueryBudget('post', '/api/compare-courses/matrix/', {'courseIds': course_ids})
+
+    def test_detail_writes(self):
+        url = f'/api/courses/{self.courses[0].pk}/'
+        course = self.assertRequestWithinQueryBudget('get', url).json()
+        self.assertRequestWithinQueryBudget('patch', url, {'fees': 5000, 'title': 'Applied Studies'})
+        course.update(university_id=self.university.pk, title='Marine Studies', fees=6000)
+        self.assertRequestWithinQueryBudget('put', url, course)
+        self.assertRequestWithinQueryBudget('delete', url)
+
+    @override_settings(ROOT_URLCONF='config.asgi_urls')
+    def test_async_reads(self):
+        pk = self.courses[0].pk
+        for path, params in [
+            ('/api/courses/', {'search': 'course'}),
+            ('/api/courses/popular/', {}),
+            (f'/api/courses/{pk}/', {}),
+            ('/api/compare-courses/', {'courseIds': self.ids}),
+        ]:
+            with self.subTest(path=path):
+                self.assertRequestWithinQueryBudget('get', path, params)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        response_cache.cache.clear()
+        norway, chile = make_university(), make_university(name='Andes University', country='Chile')
+        make_course(norway, title='Cheap', fees=3000)
+        make_course(norway, title='Online', fees=20000, format='Online', level="Master's")
+        self.course = make_course(chile, title='Free', fees=None)
+
+    def facets(self, **params):
+        response_cache.cache.clear()
+        response = self.client.get('/api/courses/', {'facets': 'true', **params})
+        self.assertEqual(response.status_code, 200)
+        facets = response.json()['facets']
+        return {
+            name: {bucket['value']: bucket['count'] for bucket in buckets if bucket['count']}
+            for name, buckets in facets.items()
+        }
+
+    def test_counts(self):
+        self.assertEqual(self.facets(), {
+            'country': {'Norway': 2, 'Chile': 1},
+            'level': {"Bachelor's": 2, "Master's": 1},
+            'format': {'On-campus': 2, 'Online': 1},
+            'fees': {'0-5000': 1, '15000-30000': 1},
+        })
+        self.assertEqual(self.facets(country='Chile')['level'], {"Bachelor's": 1})
+
+    def test_fee_bands_list_every_band(self):
+        response = self.client.get('/api/courses/', {'facets': 'true'})
+        self.assertEqual(
+            [(band['value'], band['min'], band['max']) for band in response.json()['facets']['fees']],
+            [('0-5000', 0, 5000), ('5000-15000', 5000, 15000), ('15000-30000', 15000, 30000),
+             ('30000-50000', 30000, 50000), ('50000+', 50000, None)],
+        )
+
+    @override_settings(SHARED_CACHE=True)
+    def test_cached_counts_follow_course_edits(self):
+        with mock.patch('courses.facets.compute_facets', wraps=compute_facets) as compute:
+            self.facets()
+            self.assertEqual(self.facets()['country'], {'Norway': 2, 'Chile': 1})
+        self.assertEqual(compute.call_count, 1)
+        self.course.delete()
+        self.assertEqual(self.facets()['country'], {'Norway': 2})
+
+    def test_counts_are_not_cached_without_a_shared_cache(self):
+        self.facets()
+        with mock.patch('courses.facets.cache') as facet_cache:
+            self.facets()
+        facet_cache.get.assert_not_called()
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        university = make_university()
+        # Ties on every sort key, and NULLs in the nullable ones.
+        for number in range(9):
+            make_course(
+                university, title=f'Marine {number}', fees=[None, 5000, 9000][number % 3],
+                duration=['1 year', '2 years', 'flexible'][number // 3], rating=[None, 4, 4, 5][number % 4],
+                description='marine' if number % 2 else 'ocean marine',
+            )
+        Course.objects.filter(title__in=['Marine 1', 'Marine 2', 'Marine 3']).update(created_at=timezone.now())
+        self.ids = set(Course.objects.values_list('id', flat=True))
+
+    def walk(self, **params):
+        ids, cursor = [], None
+        for _ in range(len(self.ids) + 1):
+            query = {'pagination': 'cursor', 'page_size': 2, **params}
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get('/api/courses/', query)
+            self.assertEqual(response.status_code, 200)
+            ids += [course['id'] for course in response.json()['results']]
+            next_link = response.json()['next']
+            if next_link is None:
+                return ids
+            cursor = parse_qs(urlparse(next_link).query)['cursor'][0]
+        self.fail('pagination did not end')
+
+    def test_every_ordering_visits_each_course_once(self):
+        orderings = ['fees', 'duration', 'rating', 'created_at']
+        for ordering in [None] + orderings + [f'-{name}' for name in orderings]:
+            for basis in ('annual', 'total'):
+                params = {'ordering': ordering, 'feesBasis': basis} if ordering else {}
+                with self.subTest(ordering=ordering, basis=basis):
+                    ids = self.walk(**params)
+                    self.assertEqual(len(ids), len(set(ids)))
+                    self.assertEqual(set(ids), self.ids)
+
+    def test_search_rank_ordering_visits_each_match_once(self):
+        ids = self.walk(search='marine ocean')
+        self.assertEqual(sorted(ids), sorted(set(ids)))
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(self.walk(search='marine')), len(self.ids))
+
+    def test_malformed_or_tampered_cursors_are_rejected(self):
+        def encode(position):
+            return urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+        for cursor in [
+            'not a cursor!', encode({'id': 1}), encode([1]), encode(['yesterday', 1]),
+            encode([{'$gt': 1}, 1]), encode(['2026-01-01T00:00:00+00:00', 'one']), encode([True, 1]), encode([5, 1]),
+            urlsafe_b64encode(b'[NaN, 1]').decode(),
+        ]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/courses/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        quoted = make_university(name='University of "Arts", Design', city='Paris, France', country='France')
+        self.quoted = make_course(
+            quoted, title='Drawing, "Advanced"', fees=4000, level="Master's",
+            description='Line one\nline two', course_structure={'modules': ['Ink', 'Paint']},
+        )
+        self.other = make_course(make_university(), title='Accounting', fees=20000)
+
+    def export(self, **params):
+        response = self.client.get('/api/courses/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson_rows(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="courses.ndjson"')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.quoted.id, self.other.id])
+        self.assertEqual(list(rows[0]), [name for name, _ in EXPORT_COLUMNS])
+        self.assertEqual(rows[0]['university_name'], 'University of "Arts", Design')
+        self.assertEqual(rows[0]['fees'], '4000.00')
+        self.assertEqual(rows[0]['course_structure'], {'modules': ['Ink', 'Paint']})
+
+    def test_csv_escapes_commas_quotes_and_newlines(self):
+        response, body = self.export(output='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="courses.csv"')
+        self.assertIn('"Drawing, ""Advanced"""', body)
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 2)
+        row = rows[0]
+        self.assertEqual(list(row), [name for name, _ in EXPORT_COLUMNS])
+        self.assertEqual(row['title'], 'Drawing, "Advanced"')
+        self.assertEqual(row['university_name'], 'University of "Arts", Design')
+        self.assertEqual(row['university_city'], 'Paris, France')
+        self.assertEqual(row['description'], 'Line one\nline two')
+        self.assertEqual(json.loads(row['course_structure']), {'modules': ['Ink', 'Paint']})
+
+    def test_filters_apply_to_the_export(self):
+        for params, expected in [
+            ({'country': 'France'}, [self.quoted.id]),
+            ({'maxFees': '10000'}, [self.quoted.id]),
+            ({'level': "Bachelor's"}, [self.other.id]),
+            ({'search': 'accounting'}, [self.other.id]),
+        ]:
+            with self.subTest(params=params):
+                _, body = self.export(**params)
+                self.assertEqual([json.loads(line)['id'] for line in body.splitlines()], expected)
+
+    def test_unknown_output_is_rejected(self):
+        self.assertEqual(self.client.get('/api/courses/export/', {'output': 'xml'}).status_code, 400)
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.university = make_university()
+        self.course = make_course(self.university, description='Long text that no sparse payload asks for')
+
+    def list_results(self, **params):
+        response = self.client.get('/api/courses/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_list_returns_only_the_requested_keys(self):
+        for params, expected in [
+            ({'fields': 'id,title'}, {'id': self.course.id, 'title': 'General Studies'}),
+            ({'fields': 'id, fees ,'}, {'id': self.course.id, 'fees': '9000.00'}),
+            ({'fields': 'id,university.name'}, {'id': self.course.id, 'university': {'name': 'Harbour University'}}),
+            ({'fields': 'id,university'}, {'id': self.course.id, 'university': self.university.id}),
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.list_results(**params), [expected])
+
+    def test_expand_renders_the_whole_nested_object(self):
+        [row] = self.list_results(fields='id,university', expand='university')
+        self.assertEqual(set(row), {'id', 'university'})
+        self.assertEqual(row['university']['name'], 'Harbour University')
+        self.assertIn('country', row['university'])
+
+    def test_fields_beyond_the_list_payload_can_be_selected(self):
+        [row] = self.list_results(fields='id,description')
+        self.assertEqual(row, {'id': self.course.id, 'description': 'Long text that no sparse payload asks for'})
+
+    def test_unrequested_columns_are_not_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.list_results(fields='id,title')
+        self.assertFalse([query for query in queries if 'description' in query['sql']])
+
+    def test_blank_fields_return_the_default_payload(self):
+        [row] = self.list_results(fields=' , ')
+        [default] = self.list_results()
+        self.assertEqual(row, default)
+
+    def test_detail_returns_only_the_requested_keys(self):
+        response = self.client.get(f'/api/courses/{self.course.pk}/', {'fields': 'id,title,university.city'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'id': self.course.id, 'title': 'General Studies', 'university': {'city': 'Bergen'}})
+
+    def test_unknown_fields_are_rejected(self):
+        for path, fields, unknown in [
+            ('/api/courses/', 'id,bogus', 'bogus'),
+            ('/api/courses/', 'id,university.bogus', 'university.bogus'),
+            (f'/api/courses/{self.course.pk}/', 'id,bogus', 'bogus'),
+            ('/api/universities/', 'id,bogus', 'bogus'),
+        ]:
+            with self.subTest(path=path, fields=fields):
+                response = self.client.get(path, {'fields': fields})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'detail': f'Unknown fields: {unknown}'})
+
+
+@override_settings(SHARED_CACHE=True)
+class BackfillTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        response_cache.cache.clear()
+        self.university = make_university()
+        self.course = make_course(self.university, title='Monthly', fees=1000, fees_type='monthly', duration='2 years')
+        self.other = make_course(self.university, title='Yearly', fees=8000, duration='1 year')
+
+    def course_ids(self, **params):
+        return [course['id'] for course in self.client.get('/api/courses/', params).json()['results']]
+
+    def fee_bands(self):
+        facets = self.client.get('/api/courses/', {'facets': 'true', 'country': 'Norway'}).json()['facets']
+        return {band['value']: band['count'] for band in facets['fees'] if band['count']}
+
+    def university_stats(self):
+        return self.client.get(f'/api/universities/{self.university.pk}/').json()
+
+    def test_fee_backfill_refreshes_stats_and_caches(self):
+        # A bulk write that bypassed save(), as the backfill is meant to repair.
+        Course.objects.filter(pk=self.course.pk).update(annual_fees=500, total_fees=500)
+        call_command('rebuild_catalog_stats', stdout=io.StringIO())
+        self.assertEqual(self.course_ids(maxFees='1000'), [self.course.id])
+        self.assertEqual(self.fee_bands(), {'0-5000': 1, '5000-15000': 1})
+        self.assertEqual(self.university_stats()['min_annual_fee'], '500.00')
+        stamps = dict(Course.objects.values_list('id', 'updated_at'))
+
+        out = io.StringIO()
+        call_command('backfill_normalized_fees', stdout=out)
+
+        self.assertIn('for 1 courses', out.getvalue())
+        self.assertEqual(self.course_ids(maxFees='1000'), [])
+        self.assertEqual(self.fee_bands(), {'5000-15000': 2})
+        self.assertEqual(self.university_stats()['min_annual_fee'], '8000.00')
+        self.assertGreater(Course.objects.get(pk=self.course.pk).updated_at, stamps[self.course.id])
+        self.assertEqual(Course.objects.get(pk=self.other.pk).updated_at, stamps[self.other.id])
+
+    def test_duration_backfill_recomputes_fees_and_refreshes_caches(self):
+        lump = make_course(self.university, title='Lump sum', fees=24000, fees_type='total', duration='2 years')
+        # Derived before durations could be parsed: the fees assumed a year.
+        Course.objects.filter(pk=lump.pk).update(duration_months=None, annual_fees=24000, total_fees=24000)
+        call_command('rebuild_catalog_stats', stdout=io.StringIO())
+        self.assertEqual(self.course_ids(minDuration='20', ordering='created_at'), [self.course.id])
+        self.assertEqual(self.fee_bands(), {'5000-15000': 2, '15000-30000': 1})
+        self.assertEqual(self.university_stats()['max_annual_fee'], '24000.00')
+
+        out = io.StringIO()
+        call_command('backfill_duration_months', stdout=out)
+
+        self.assertIn('for 1 courses', out.getvalue())
+        lump.refresh_from_db()
+        self.assertEqual((lump.duration_months, lump.annual_fees, lump.total_fees), (24, 12000, 24000))
+        self.assertEqual(self.course_ids(minDuration='20', ordering='created_at'), [self.course.id, lump.id])
+        self.assertEqual(self.fee_bands(), {'5000-15000': 3})
+        self.assertEqual(self.university_stats()['max_annual_fee'], '12000.00')
+
+
+class ComparisonMatrixTests(TestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        university = make_university()
+        now = timezone.now()
+        self.short = make_course(
+            university, title='Short', fees=8000, duration='1 year', credits=60, rating='4.5',
+            application_deadline=now + timedelta(days=10),
+        )
+        self.long = make_course(
+            university, title='Long', fees=8000, duration='2 years', credits=60, rating=None,
+            application_deadline=now - timedelta(days=5),
+        )
+        self.unpriced = make_course(
+            university, title='Unpriced', fees=None, duration='3 years', credits=None, rating=3,
+            application_deadline=now + timedelta(days=30),
+        )
+
+    def matrix(self, *courses):
+        response = self.client.get('/api/compare-courses/matrix/', {'courseIds': ','.join(str(course.pk) for course in courses)})
+        self.assertEqual(response.status_code, 200)
+        matrix = response.json()
+        return {row['attribute']: row for row in matrix['rows']}
+
+    def test_ties_share_the_best_flag_and_nulls_never_win(self):
+        rows = self.matrix(self.short, self.long, self.unpriced)
+        self.assertEqual(rows['annual_fees']['values'], [8000.0, 8000.0, None])
+        self.assertEqual(rows['annual_fees']['best'], [self.short.pk, self.long.pk])
+        self.assertEqual(rows['total_fees']['best'], [self.short.pk])
+        self.assertEqual(rows['duration_months']['best'], [self.short.pk])
+        self.assertEqual(rows['credits']['best'], [self.short.pk, self.long.pk])
+        self.assertEqual(rows['rating']['values'], [4.5, None, 3.0])
+        self.assertEqual(rows['rating']['best'], [self.short.pk])
+        self.assertEqual(rows['level']['best'], [])
+
+    def test_passed_deadlines_are_never_best(self):
+        rows = self.matrix(self.short, self.long, self.unpriced)
+        self.assertLess(rows['deadline_days']['values'][1], 0)
+        self.assertEqual(rows['deadline_days']['best'], [self.unpriced.pk])
+
+    def test_a_single_value_is_not_flagged(self):
+        rows = self.matrix(self.long, self.unpriced)
+        self.assertEqual(rows['rating']['best'], [])
+        self.assertEqual(rows['annual_fees']['best'], [])
+        self.assertEqual(rows['deadline_days']['best'], [])
+
+    def test_course_count_is_capped(self):
+        ids = list(range(1, MAX_COMPARE_COURSES + 1))
+        for path in ('/api/compare-courses/matrix/', '/api/compare-courses/'):
+            with self.subTest(path=path):
+                # Duplicates count once.
+                response = self.client.get(path, {'courseIds': ','.join(map(str, ids + ids[:1]))})
+                self.assertEqual(response.status_code, 200)
+                response = self.client.get(path, {'courseIds': ','.join(map(str, ids + [MAX_COMPARE_COURSES + 1]))})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': f'At most {MAX_COMPARE_COURSES} courses can be compared'})
+                response = self.client.post(path, {'courseIds': ids + [MAX_COMPARE_COURSES + 1]}, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_invalid_ids_are_rejected(self):
+        response = self.client.post('/api/compare-courses/matrix/', {'courseIds': [self.short.pk, 'x']}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': "Invalid course id: 'x'"})
+        response = self.client.post('/api/compare-courses/matrix/', {'courseIds': str(self.short.pk)}, content_type='application/json')
+        self.assertEqual(response.json(), {'error': 'courseIds must be a list'})
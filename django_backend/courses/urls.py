@@ -5,6 +5,10 @@ from . import views
 urlpatterns = [
     path('courses/', views.CourseListCreateView.as_view(), name='course-list-create'),
     path('courses/popular/', views.get_popular_courses, name='popular-courses'),
+    path('courses/autocomplete/', views.autocomplete, name='course-autocomplete'),
+    path('courses/export/', views.export_courses, name='course-export'),
     path('courses/<int:pk>/', views.CourseDetailView.as_view(), name='course-detail'),
+    path('courses/<int:pk>/recommendations/', views.course_recommendations, name='course-recommendations'),
     path('compare-courses/', views.compare_courses, name='compare-courses'),
+    path('compare-courses/matrix/', views.compare_courses_matrix, name='compare-courses-matrix'),
 ]
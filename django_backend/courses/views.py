@@ -1,11 +1,40 @@
+import math
 
 from rest_framework import generics, filters
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from config.pagination import CatalogPagination
+from config.response_cache import CachedResponseMixin, cache_response
+from config.conditional import ConditionalGetMixin, conditional_response, queryset_validators, row_validators, slice_validators
+from config.sparse_fields import SparseFields, SparseFieldsViewMixin
+from config.instrumentation import query_budget
 from .models import Course
-from .serializers import CourseSerializer, CourseListSerializer
+from .serializers import CourseSerializer, CourseListSerializer, course_list_values, course_values
+from .normalization import parse_duration_months
+from .search import search_courses
+from .facets import get_facets
+from .export import ENCODERS, EXPORT_FORMATS, export_rows
+from .recommendations import get_index
+from .popularity import is_ranked
+from .autocomplete import MAX_SUGGESTIONS, SUGGESTION_TYPES, autocomplete_index
+from .comparison import ComparisonError, get_matrix, normalize_course_ids
+
+FEES_COLUMNS = {'annual': 'annual_fees', 'total': 'total_fees'}
+
+def get_fees_column(request):
+    return FEES_COLUMNS.get(request.query_params.get('feesBasis'), 'annual_fees')
+
+def parse_bound(value, cast=float):
+    # Range bounds that are not finite numbers are ignored, like other
+    # malformed query parameters.
+    try:
+        bound = cast(value)
+    except (TypeError, ValueError):
+        return None
+    return bound if math.isfinite(bound) else None
 
 class CourseFilter(filters.BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
@@ -14,17 +43,14 @@ class CourseFilter(filters.BaseFilterBackend):
         level = request.query_params.get('level')
         subject = request.query_params.get('subject')
         duration = request.query_params.get('duration')
-        min_fees = request.query_params.get('minFees')
-        max_fees = request.query_params.get('maxFees')
+        min_duration = parse_bound(request.query_params.get('minDuration'), int)
+        max_duration = parse_bound(request.query_params.get('maxDuration'), int)
+        min_fees = parse_bound(request.query_params.get('minFees'))
+        max_fees = parse_bound(request.query_params.get('maxFees'))
         format_type = request.query_params.get('format')
 
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(subject__icontains=search) |
-                Q(university__name__icontains=search)
-            )
+            queryset = search_courses(queryset, search)
         
         if country:
             queryset = queryset.filter(university__country=country)
@@ -36,45 +62,276 @@ class CourseFilter(filters.BaseFilterBackend):
             queryset = queryset.filter(subject__icontains=subject)
         
         if duration:
-            queryset = queryset.filter(duration__icontains=duration)
+            # "1 year" and "12 months" match the same courses; text that
+            # does not parse as a duration keeps the substring match.
+            duration_months = parse_duration_months(duration)
+            if duration_months is not None:
+                queryset = queryset.filter(duration_months=duration_months)
+            else:
+                queryset = queryset.filter(duration__icontains=duration)
+
+        if min_duration is not None:
+            queryset = queryset.filter(duration_months__gte=min_duration)
+
+        if max_duration is not None:
+            queryset = queryset.filter(duration_months__lte=max_duration)
         
         if format_type:
             queryset = queryset.filter(format=format_type)
         
-        if min_fees:
-            queryset = queryset.filter(fees__gte=float(min_fees))
+        # Fee bounds compare the normalized annual (or total) cost, so
+        # yearly, monthly and whole-course prices are comparable.
+        fees_column = get_fees_column(request)
+
+        if min_fees is not None:
+            queryset = queryset.filter(**{f'{fees_column}__gte': min_fees})
         
-        if max_fees:
-            queryset = queryset.filter(fees__lte=float(max_fees))
+        if max_fees is not None:
+            queryset = queryset.filter(**{f'{fees_column}__lte': max_fees})
 
         return queryset
 
-class CourseListCreateView(generics.ListCreateAPIView):
+class CourseOrderingFilter(filters.OrderingFilter):
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        columns = {'fees': get_fees_column(request), 'duration': 'duration_months'}
+        mapped = []
+        for field in ordering:
+            name = field.lstrip('-')
+            mapped.append(field.replace(name, columns[name]) if name in columns else field)
+        return mapped
+
+    def get_default_ordering(self, view):
+        if view.request.query_params.get('search'):
+            return ['-search_rank', '-created_at']
+        return super().get_default_ordering(view)
+
+# Course payloads embed their university, so both timestamps feed the validators.
+COURSE_TIMESTAMPS = ('updated_at', 'university__updated_at')
+
+def course_values_for(request, default):
+    # ?fields= may select any CourseSerializer field, not only the default ones.
+    sparse = SparseFields.from_request(request)
+    return course_values.restrict(sparse) if sparse is not None else default
+
+def course_list_columns(queryset):
+    # Keyset cursors need the ordering columns alongside the payload.
+    extra = ['id', 'created_at', 'rating', 'annual_fees', 'total_fees', 'duration_months']
+    if 'search_rank' in queryset.query.annotations:
+        extra.append('search_rank')
+    return extra
+
+def wants_facets(request):
+    return request.query_params.get('facets', '').lower() in ('1', 'true')
+
+def with_facets(data, facets):
+    if isinstance(data, dict):
+        data['facets'] = facets
+        return data
+    return {'results': data, 'facets': facets}
+
+def parse_course_ids(value):
+    if isinstance(value, str):
+        value = value.split(',')
+    ids = []
+    for item in value or []:
+        try:
+            ids.append(int(item))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+class CourseListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = Course.objects.select_related('university').all()
     serializer_class = CourseListSerializer
-    filter_backends = [CourseFilter, filters.OrderingFilter]
-    ordering_fields = ['fees', 'rating', 'created_at']
+    filter_backends = [CourseFilter, CourseOrderingFilter]
+    ordering_fields = ['fees', 'duration', 'rating', 'created_at']
     ordering = ['-created_at']
+    pagination_class = CatalogPagination
+    cache_namespace = 'course-list'
+    cache_tags = ['courses']
+    # ETags come from the response cache; a per-request aggregate would
+    # also undo the count-free keyset pages. Budgets include the session
+    # and user lookups; POST also covers the catalog stats update on commit.
+    query_budget = {'GET': 5, 'POST': 10}
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return CourseSerializer
         return CourseListSerializer
 
-class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = course_values_for(request, course_list_values)
+        rows = serializer.values(queryset, *course_list_columns(queryset))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            response = self.get_paginated_response(serializer.serialize(page))
+        else:
+            response = Response(serializer.serialize(rows))
+
+        if wants_facets(request):
+            response.data = with_facets(response.data, get_facets(request, self.filter_queryset(self.get_queryset())))
+        return response
+
+def course_detail_validators(request, pk):
+    return row_validators(Course.objects.filter(pk=pk), f'course:{pk}', COURSE_TIMESTAMPS)
+
+def course_detail_tags(data, pk):
+    university = data.get('university')
+    if isinstance(university, dict) and 'id' in university:
+        university_id = university['id']
+    elif isinstance(university, int):
+        university_id = university
+    else:
+        university_id = Course.objects.filter(pk=pk).values_list('university_id', flat=True).first()
+    return [f'course:{pk}', f'university:{university_id}']
+
+class CourseDetailView(ConditionalGetMixin, CachedResponseMixin, SparseFieldsViewMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Course.objects.select_related('university').all()
     serializer_class = CourseSerializer
+    values_serializer = course_values
+    cache_namespace = 'course-detail'
+    # Write budgets cover the catalog stats update on commit, including the
+    # MIN/MAX re-read when the fee removed was an extreme; a delete adds one
+    # row per save of the course for the recommendation changes.
+    query_budget = {'GET': 4, 'PUT': 12, 'PATCH': 12, 'DELETE': 17}
+
+    def get_validators(self, request, *args, **kwargs):
+        return course_detail_validators(request, kwargs['pk'])
 
+    def get_cache_tags(self, data):
+        return course_detail_tags(data, self.kwargs['pk'])
+
+MAX_POPULAR_LIMIT = 50
+
+def get_popular_limit(params):
+    try:
+        limit = int(params.get('limit', 6))
+    except (TypeError, ValueError):
+        limit = 6
+    return max(1, min(limit, MAX_POPULAR_LIMIT))
+
+def popular_courses_queryset(limit, ranked=None):
+    # Served from the precomputed ranking; until rebuild_popularity has
+    # run once, fall back to ordering by rating.
+    if ranked is None:
+        ranked = is_ranked()
+    if ranked:
+        queryset = Course.objects.filter(popularity__isnull=False).order_by('popularity__rank')
+    else:
+        queryset = Course.objects.order_by('-rating', '-created_at')
+    return queryset[:limit]
+
+def popular_courses_validators(request):
+    # Only the served rows are read; a rebuild moves their computed_at.
+    limit = get_popular_limit(request.GET)
+    ranked = is_ranked()
+    timestamps = COURSE_TIMESTAMPS + (('popularity__computed_at',) if ranked else ())
+    return slice_validators(popular_courses_queryset(limit, ranked), f'popular:{limit}', timestamps)
+
+@query_budget(5)
+@conditional_response(popular_courses_validators)
 @api_view(['GET'])
+@cache_response('popular-courses', ['courses', 'popular'])
 def get_popular_courses(request):
-    limit = int(request.query_params.get('limit', 6))
-    courses = Course.objects.select_related('university').order_by('-rating', '-created_at')[:limit]
-    serializer = CourseListSerializer(courses, many=True)
-    return Response(serializer.data)
+    limit = get_popular_limit(request.query_params)
+    serializer = course_values_for(request, course_list_values)
+    courses = serializer.values(popular_courses_queryset(limit))
+    return Response(serializer.serialize(courses))
 
-@api_view(['POST'])
-def compare_courses(request):
+MAX_RECOMMENDATIONS = 50
+
+def get_recommendation_limit(params):
+    try:
+        limit = int(params.get('limit', 10))
+    except (TypeError, ValueError):
+        limit = 10
+    return max(1, min(limit, MAX_RECOMMENDATIONS))
+
+def ranked_courses_payload(request, ranked):
+    """Serialize ``(course_id, score)`` pairs in order, adding each ``score``."""
+    serializer = course_values_for(request, course_list_values)
+    rows = {
+        row['id']: row
+        for row in serializer.values(Course.objects.filter(id__in=[course_id for course_id, _ in ranked]), 'id')
+    }
+    ranked = [(course_id, score) for course_id, score in ranked if course_id in rows]
+    data = serializer.serialize(rows[course_id] for course_id, _ in ranked)
+    for item, (_, score) in zip(data, ranked):
+        item['score'] = round(score, 4)
+    return data
+
+# Up to three check the recommendation index version and reload it (config.process_index).
+@query_budget(6)
+@api_view(['GET'])
+@cache_response('course-recommendations', ['courses', 'recommendations'])
+def course_recommendations(request, pk):
+    limit = get_recommendation_limit(request.query_params)
+    ranked = get_index().similar(pk, limit, exclude={pk})
+    return Response(ranked_courses_payload(request, ranked))
+
+# Up to four check the index version and reload it (config.process_index).
+@query_budget(6)
+@api_view(['GET'])
+def autocomplete(request):
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 8)), MAX_SUGGESTIONS))
+    except (TypeError, ValueError):
+        limit = 8
+    types = {name for name in request.query_params.get('types', '').split(',') if name in SUGGESTION_TYPES}
+    suggestions = autocomplete_index.get().suggest(request.query_params.get('q', ''), limit, types)
+    return Response(suggestions)
+
+def compare_courses_validators(request):
+    try:
+        course_ids = normalize_course_ids(parse_course_ids(request.GET.get('courseIds', '')))
+    except ComparisonError:
+        return None, None
+    key = 'compare:' + ','.join(map(str, course_ids))
+    return queryset_validators(Course.objects.filter(id__in=course_ids), key, COURSE_TIMESTAMPS)
+
+def get_compare_ids(request):
+    if request.method == 'GET':
+        return normalize_course_ids(parse_course_ids(request.query_params.get('courseIds', '')))
     course_ids = request.data.get('courseIds', [])
-    courses = Course.objects.filter(id__in=course_ids).select_related('university')
-    serializer = CourseSerializer(courses, many=True)
-    return Response(serializer.data)
+    if not isinstance(course_ids, list):
+        raise ComparisonError('courseIds must be a list')
+    return normalize_course_ids(course_ids)
+
+@query_budget(4)
+@conditional_response(compare_courses_validators)
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+def compare_courses(request):
+    try:
+        course_ids = get_compare_ids(request)
+    except ComparisonError as exc:
+        return Response({'error': str(exc)}, status=400)
+    serializer = course_values_for(request, course_values)
+    courses = serializer.values(Course.objects.filter(id__in=course_ids))
+    return Response(serializer.serialize(courses))
+
+@query_budget(3)
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+def compare_courses_matrix(request):
+    try:
+        course_ids = get_compare_ids(request)
+    except ComparisonError as exc:
+        return Response({'error': str(exc)}, status=400)
+    return Response(get_matrix(course_ids))
+
+@query_budget(2)
+@api_view(['GET'])
+def export_courses(request):
+    output = request.query_params.get('output', 'ndjson')
+    if output not in EXPORT_FORMATS:
+        return Response({'error': f"output must be one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+    queryset = CourseFilter().filter_queryset(request, Course.objects.all(), None)
+    response = StreamingHttpResponse(ENCODERS[output](export_rows(queryset)), content_type=EXPORT_FORMATS[output])
+    response['Content-Disposition'] = f'attachment; filename="courses.{output}"'
+    return response
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='University',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.TextField()),
+                ('country', models.CharField(max_length=100)),
+                ('city', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('image_url', models.URLField(blank=True, null=True)),
+                ('website', models.URLField(blank=True, null=True)),
+                ('ranking', models.IntegerField(blank=True, null=True)),
+                ('established', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Universities',
+            },
+        ),
+    ]
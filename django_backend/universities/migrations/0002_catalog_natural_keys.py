@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='university',
+            constraint=models.UniqueConstraint(fields=('name', 'country'), name='unique_university_name_country'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:49
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Django compiles icontains to UPPER(column::text) LIKE UPPER(%s) on
+# PostgreSQL, so the trigram indexes are built on that expression.
+TRIGRAM_INDEXES = [
+    ('universities_university_name_trgm', 'universities_university', 'name'),
+    ('universities_university_city_trgm', 'universities_university', 'city'),
+    ('universities_university_description_trgm', 'universities_university', 'description'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0002_catalog_natural_keys'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='university',
+            index=models.Index(fields=['country', 'ranking'], name='university_country_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='university',
+            index=models.Index(fields=['ranking'], name='university_ranking_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0004_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountryStats',
+            fields=[
+                ('course_count', models.PositiveIntegerField(default=0)),
+                ('min_annual_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('median_annual_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('max_annual_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('average_rating', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('level_counts', models.JSONField(default=dict)),
+                ('format_counts', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField()),
+                ('country', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('university_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Country stats',
+                'ordering': ['country'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UniversityStats',
+            fields=[
+                ('course_count', models.PositiveIntegerField(default=0)),
+                ('min_annual_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('median_annual_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('max_annual_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('average_rating', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('level_counts', models.JSONField(default=dict)),
+                ('format_counts', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField()),
+                ('university', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='universities.university')),
+            ],
+            options={
+                'verbose_name_plural': 'University stats',
+            },
+        ),
+    ]
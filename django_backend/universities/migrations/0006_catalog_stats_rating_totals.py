@@ -0,0 +1,58 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:32
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_rating_totals(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    db_alias = schema_editor.connection.alias
+    for model_name, group, key in (
+        ('UniversityStats', 'university_id', 'university_id'), ('CountryStats', 'university__country', 'country'),
+    ):
+        model = apps.get_model('universities', model_name)
+        totals = defaultdict(lambda: (Decimal(0), 0))
+        rows = (
+            Course.objects.using(db_alias).order_by().values(group)
+            .annotate(total=models.Sum('rating'), count=models.Count('rating'))
+        )
+        for row in rows:
+            totals[row[group]] = (Decimal(str(row['total'] or 0)), row['count'])
+        stats = list(model.objects.using(db_alias).all())
+        for entry in stats:
+            entry.rating_total, entry.rated_count = totals[getattr(entry, key)]
+        model.objects.using(db_alias).bulk_update(stats, ['rating_total', 'rated_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0005_catalog_stats'),
+        ('courses', '0009_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='countrystats',
+            name='rated_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='countrystats',
+            name='rating_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='universitystats',
+            name='rated_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='universitystats',
+            name='rating_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
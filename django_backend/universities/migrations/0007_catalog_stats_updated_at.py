@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-17 06:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0006_catalog_stats_rating_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='countrystats',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='universitystats',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
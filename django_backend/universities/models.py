@@ -7,6 +7,9 @@ class University(models.Model):
     city = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     image_url = models.URLField(blank=True, null=True)
+    # Content hash of the thumbnails rendered from image_source (config.images).
+    image_key = models.CharField(max_length=64, blank=True, default='', editable=False)
+    image_source = models.TextField(blank=True, default='', editable=False)
     website = models.URLField(blank=True, null=True)
     ranking = models.IntegerField(blank=True, null=True)
     established = models.IntegerField(blank=True, null=True)
@@ -18,3 +21,57 @@ class University(models.Model):
 
     class Meta:
         verbose_name_plural = "Universities"
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'country'], name='unique_university_name_country'),
+        ]
+        # Trigram indexes for ?search= are created in migration 0003 on PostgreSQL only.
+        indexes = [
+            models.Index(fields=['country', 'ranking'], name='university_country_rank_idx'),
+            models.Index(fields=['ranking'], name='university_ranking_idx'),
+        ]
+
+class CatalogStats(models.Model):
+    """Course statistics of a catalog scope, maintained by ``universities.stats``.
+
+    Fees are the normalized annual cost (``Course.annual_fees``). Course
+    changes update every field except the median, which
+    ``rebuild_catalog_stats --medians`` refreshes. ``computed_at`` is when
+    every field, median included, was last computed; ``updated_at`` moves
+    with any change.
+    """
+    course_count = models.PositiveIntegerField(default=0)
+    min_annual_fee = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    median_annual_fee = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    max_annual_fee = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, blank=True, null=True)
+    # Running sum and count of course ratings, so edits can update the average.
+    rating_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    rated_count = models.PositiveIntegerField(default=0)
+    # {value: course count} for Course.level and Course.format
+    level_counts = models.JSONField(default=dict)
+    format_counts = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+class UniversityStats(CatalogStats):
+    university = models.OneToOneField(University, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+
+    class Meta:
+        verbose_name_plural = "University stats"
+
+    def __str__(self):
+        return f'{self.university_id}: {self.course_count} courses'
+
+class CountryStats(CatalogStats):
+    country = models.CharField(max_length=100, primary_key=True)
+    university_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Country stats"
+        ordering = ['country']
+
+    def __str__(self):
+        return f'{self.country}: {self.course_count} courses'
@@ -1,8 +1,30 @@
 
 from rest_framework import serializers
-from .models import University
+from .models import CountryStats, University
+from config.fast_serializers import ValuesSerializer
+from config.images import ImageVariantsField
+from config.sparse_fields import SparseFieldsMixin
+
+class UniversitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    images = ImageVariantsField()
 
-class UniversitySerializer(serializers.ModelSerializer):
     class Meta:
         model = University
-        fields = '__all__'
+        exclude = ['image_key', 'image_source']
+
+class UniversityWithStatsSerializer(UniversitySerializer):
+    # Flattened from UniversityStats (universities.stats); null until computed.
+    course_count = serializers.IntegerField(source='stats.course_count', read_only=True)
+    min_annual_fee = serializers.DecimalField(max_digits=12, decimal_places=2, source='stats.min_annual_fee', read_only=True)
+    median_annual_fee = serializers.DecimalField(max_digits=12, decimal_places=2, source='stats.median_annual_fee', read_only=True)
+    max_annual_fee = serializers.DecimalField(max_digits=12, decimal_places=2, source='stats.max_annual_fee', read_only=True)
+    average_rating = serializers.DecimalField(max_digits=3, decimal_places=2, source='stats.average_rating', read_only=True)
+    level_counts = serializers.JSONField(source='stats.level_counts', read_only=True)
+    format_counts = serializers.JSONField(source='stats.format_counts', read_only=True)
+
+class CountryStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CountryStats
+        exclude = ['rating_total', 'rated_count']
+
+university_values = ValuesSerializer(UniversityWithStatsSerializer)
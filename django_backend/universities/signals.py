@@ -0,0 +1,61 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from config.images import clear_stale_key, image_workers
+from config.response_cache import response_cache
+from courses.models import Course
+from .models import University
+from . import stats
+
+
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+def invalidate_university_responses(sender, instance, **kwargs):
+    # Course detail payloads embed their university and are tagged with it.
+    response_cache.invalidate('universities', f'university:{instance.pk}')
+
+
+@receiver(pre_save, sender=University)
+def clear_university_image(sender, instance, raw=False, **kwargs):
+    if not raw:
+        clear_stale_key(instance)
+
+
+@receiver(post_save, sender=University)
+def render_university_image(sender, instance, raw=False, **kwargs):
+    if not raw:
+        # Course payloads embed the university's images.
+        image_workers.schedule(instance, ['universities', f'university:{instance.pk}', 'courses'])
+
+
+@receiver(post_init, sender=Course)
+def remember_course_stats(sender, instance, **kwargs):
+    stats.remember_course(instance)
+
+
+@receiver(post_save, sender=Course)
+def update_course_stats(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        stats.course_saved(instance, created, update_fields)
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_stats(sender, instance, **kwargs):
+    stats.course_deleted(instance)
+
+
+@receiver(post_init, sender=University)
+def remember_university_country(sender, instance, **kwargs):
+    instance._stats_country = instance.__dict__.get('country')
+
+
+@receiver(post_save, sender=University)
+def refresh_university_stats(sender, instance, created, raw=False, **kwargs):
+    # Universities are added or moved rarely; their scopes are recomputed.
+    previous, instance._stats_country = instance._stats_country, instance.country
+    if not raw and (created or previous != instance.country):
+        stats.schedule_refresh([instance.pk], [previous])
+
+
+@receiver(post_delete, sender=University)
+def refresh_country_stats(sender, instance, **kwargs):
+    stats.schedule_refresh(countries=[instance.country])
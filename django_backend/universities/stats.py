@@ -0,0 +1,384 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+from config.db_router import use_primary
+from config.response_cache import response_cache
+from courses.models import Course
+from .models import CountryStats, University, UniversityStats
+
+STATS_FIELDS = [
+    'course_count', 'min_annual_fee', 'median_annual_fee', 'max_annual_fee', 'average_rating',
+    'rating_total', 'rated_count', 'level_counts', 'format_counts', 'computed_at', 'updated_at',
+]
+# Updated from course changes. Medians are left to refresh_medians(), so
+# computed_at, which covers them, stays too.
+DELTA_FIELDS = [field for field in STATS_FIELDS if field not in ('median_annual_fee', 'computed_at')]
+# The course fields the stats are computed from.
+COURSE_FIELDS = ('university_id', 'annual_fees', 'rating', 'level', 'format')
+DEFERRED = object()
+CENTS = Decimal('0.01')
+
+
+def _cents(value):
+    return None if value is None else Decimal(value).quantize(CENTS)
+
+
+def _decimal(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _median(middle_fees):
+    return _cents(sum(middle_fees) / len(middle_fees)) if middle_fees else None
+
+
+def _average(total, count):
+    return _cents(total / count) if count else None
+
+
+def empty_stats():
+    return {
+        'course_count': 0, 'min_annual_fee': None, 'median_annual_fee': None, 'max_annual_fee': None,
+        'average_rating': None, 'rating_total': Decimal(0), 'rated_count': 0, 'level_counts': {}, 'format_counts': {},
+    }
+
+
+def _middle_fees(courses, fee_count):
+    # The one or two middle fees, read with an offset instead of loading every fee.
+    start = (fee_count - 1) // 2
+    fees = courses.filter(annual_fees__isnull=False).order_by('annual_fees').values_list('annual_fees', flat=True)
+    return list(fees[start:fee_count // 2 + 1])
+
+
+def _streamed_middle_fees(courses, group, fee_counts):
+    # One pass over every fee sorted within its group; only the middle ones are kept.
+    middles = defaultdict(list)
+    previous, position = object(), 0
+    rows = (
+        courses.filter(annual_fees__isnull=False)
+        .order_by(group, 'annual_fees')
+        .values_list(group, 'annual_fees')
+        .iterator(chunk_size=5000)
+    )
+    for key, fee in rows:
+        if key != previous:
+            previous, position = key, 0
+        count = fee_counts[key]
+        if (count - 1) // 2 <= position <= count // 2:
+            middles[key].append(fee)
+        position += 1
+    return middles
+
+
+def compute_stats(courses, group, stream=False):
+    """Return ``{group value: stats}`` for ``courses`` grouped by the ``group`` lookup.
+
+    Counts, fee extremes and rating totals come from one grouped
+    aggregate and the level/format breakdowns from a second. Medians are
+    read per group with an offset query, or with ``stream`` from a single
+    ordered pass, which is cheaper when every group is computed.
+    """
+    stats = {}
+    rows = (
+        courses.order_by().values(group)
+        .annotate(
+            course_count=Count('id'), fee_count=Count('annual_fees'), min_annual_fee=Min('annual_fees'),
+            max_annual_fee=Max('annual_fees'), rating_total=Sum('rating'), rated_count=Count('rating'),
+        )
+    )
+    for row in rows:
+        key = row.pop(group)
+        stats[key] = dict(row, level_counts={}, format_counts={})
+
+    breakdown = courses.order_by().values(group, 'level', 'format').annotate(count=Count('id'))
+    for row in breakdown:
+        entry = stats[row[group]]
+        for field in ('level', 'format'):
+            counts = entry[f'{field}_counts']
+            counts[row[field]] = counts.get(row[field], 0) + row['count']
+
+    fee_counts = {key: entry.pop('fee_count') for key, entry in stats.items()}
+    if stream:
+        middles = _streamed_middle_fees(courses, group, fee_counts)
+    else:
+        middles = {
+            key: _middle_fees(courses.filter(**{group: key}), count)
+            for key, count in fee_counts.items() if count
+        }
+    for key, entry in stats.items():
+        entry['median_annual_fee'] = _median(middles.get(key))
+        entry['rating_total'] = _decimal(entry['rating_total'] or 0)
+        entry['average_rating'] = _average(entry['rating_total'], entry['rated_count'])
+        for field in ('min_annual_fee', 'max_annual_fee'):
+            entry[field] = _cents(entry[field])
+    return stats
+
+
+def _university_rows(universities, stats, computed_at):
+    return [
+        UniversityStats(university_id=pk, computed_at=computed_at, updated_at=computed_at, **stats.get(pk, empty_stats()))
+        for pk in universities
+    ]
+
+
+def _country_rows(university_counts, stats, computed_at):
+    return [
+        CountryStats(
+            country=country, university_count=count, computed_at=computed_at, updated_at=computed_at,
+            **stats.get(country, empty_stats()),
+        )
+        for country, count in university_counts.items()
+    ]
+
+
+def refresh_stats(university_ids=(), countries=()):
+    """Recompute the stats of these universities, their countries and ``countries``.
+
+    Only the courses of the affected scopes are aggregated.
+    """
+    with use_primary(), transaction.atomic():
+        universities = dict(University.objects.filter(id__in=set(university_ids)).values_list('id', 'country'))
+        countries = set(countries) | set(universities.values())
+        computed_at = timezone.now()
+        if universities:
+            stats = compute_stats(Course.objects.filter(university_id__in=universities), 'university_id')
+            UniversityStats.objects.bulk_create(
+                _university_rows(universities, stats, computed_at),
+                update_conflicts=True, unique_fields=['university'], update_fields=STATS_FIELDS,
+            )
+        if countries:
+            university_counts = dict(
+                University.objects.filter(country__in=countries).order_by()
+                .values_list('country').annotate(count=Count('id'))
+            )
+            stats = compute_stats(Course.objects.filter(university__country__in=university_counts), 'university__country')
+            CountryStats.objects.filter(country__in=countries - set(university_counts)).delete()
+            CountryStats.objects.bulk_create(
+                _country_rows(university_counts, stats, computed_at),
+                update_conflicts=True, unique_fields=['country'],
+                update_fields=STATS_FIELDS + ['university_count'],
+            )
+    response_cache.invalidate('universities', 'country-stats')
+
+
+def rebuild_stats():
+    """Recompute the stats of every university and country from scratch."""
+    with use_primary():
+        universities = dict(University.objects.values_list('id', 'country'))
+        university_stats = compute_stats(Course.objects.all(), 'university_id', stream=True)
+        country_stats = compute_stats(Course.objects.all(), 'university__country', stream=True)
+        university_counts = Counter(universities.values())
+        computed_at = timezone.now()
+        with transaction.atomic():
+            UniversityStats.objects.all().delete()
+            CountryStats.objects.all().delete()
+            UniversityStats.objects.bulk_create(_university_rows(universities, university_stats, computed_at), batch_size=1000)
+            CountryStats.objects.bulk_create(_country_rows(university_counts, country_stats, computed_at))
+    response_cache.invalidate('universities', 'country-stats')
+    return len(universities), len(university_counts)
+
+
+def refresh_medians():
+    """Recompute every fee median in one ordered pass per scope.
+
+    Course changes update the other stats as they happen but leave the
+    medians to this, run by ``rebuild_catalog_stats --medians``.
+    """
+    computed_at = timezone.now()
+    courses = Course.objects.filter(annual_fees__isnull=False).order_by()
+    with use_primary():
+        for model, group, key in ((UniversityStats, 'university_id', 'university_id'), (CountryStats, 'university__country', 'country')):
+            fee_counts = dict(courses.values_list(group).annotate(Count('id')))
+            middles = _streamed_middle_fees(courses, group, fee_counts)
+            rows = list(model.objects.only(key))
+            for row in rows:
+                row.median_annual_fee = _median(middles.get(getattr(row, key)))
+                row.computed_at = row.updated_at = computed_at
+            model.objects.bulk_update(rows, ['median_annual_fee', 'computed_at', 'updated_at'], batch_size=1000)
+    response_cache.invalidate('universities', 'country-stats')
+
+
+class Delta:
+    """Courses added to (or removed from) one scope since its stats were stored."""
+
+    def __init__(self):
+        self.course_count = 0
+        self.rated_count = 0
+        self.rating_total = Decimal(0)
+        self.level_counts = Counter()
+        self.format_counts = Counter()
+        self.added_fees = []
+        self.removed_fees = []
+
+    def add_course(self, state, sign=1):
+        _, fee, rating, level, course_format = state
+        self.course_count += sign
+        self.level_counts[level] += sign
+        self.format_counts[course_format] += sign
+        if rating is not None:
+            self.rated_count += sign
+            self.rating_total += sign * _decimal(rating)
+        if fee is not None:
+            (self.added_fees if sign > 0 else self.removed_fees).append(_decimal(fee))
+
+    def merge(self, other):
+        self.course_count += other.course_count
+        self.rated_count += other.rated_count
+        self.rating_total += other.rating_total
+        self.level_counts.update(other.level_counts)
+        self.format_counts.update(other.format_counts)
+        self.added_fees += other.added_fees
+        self.removed_fees += other.removed_fees
+
+    def apply(self, row):
+        """Update a stats row; returns whether its fee extremes must be re-read."""
+        row.course_count += self.course_count
+        row.rated_count += self.rated_count
+        row.rating_total += self.rating_total
+        row.average_rating = _average(row.rating_total, row.rated_count)
+        for field, delta in (('level_counts', self.level_counts), ('format_counts', self.format_counts)):
+            counts = Counter(getattr(row, field))
+            counts.update(delta)
+            setattr(row, field, {key: count for key, count in counts.items() if count > 0})
+        # A fee removed and added again (an edit of another field) cancels out.
+        added, removed = Counter(self.added_fees), Counter(self.removed_fees)
+        added, removed = list((added - removed).elements()), list((removed - added).elements())
+        if {row.min_annual_fee, row.max_annual_fee} & set(removed):
+            return True
+        if added:
+            present = [fee for fee in (row.min_annual_fee, row.max_annual_fee) if fee is not None]
+            row.min_annual_fee = _cents(min(present + added))
+            row.max_annual_fee = _cents(max(present + added))
+        return False
+
+
+def _fee_extremes(group, keys):
+    rows = (
+        Course.objects.filter(**{f'{group}__in': keys}).order_by().values(group)
+        .annotate(low=Min('annual_fees'), high=Max('annual_fees'))
+    )
+    return {row[group]: (_cents(row['low']), _cents(row['high'])) for row in rows}
+
+
+def _apply_deltas(rows, deltas, group, updated_at):
+    stale = [key for key, row in rows.items() if deltas[key].apply(row)]
+    extremes = _fee_extremes(group, stale) if stale else {}
+    for key in stale:
+        rows[key].min_annual_fee, rows[key].max_annual_fee = extremes.get(key, (None, None))
+    for row in rows.values():
+        row.updated_at = updated_at
+
+
+class Changes:
+    """The stats changes of one write, applied when its transaction commits.
+
+    Each write registers its own ``on_commit`` callback, so changes made
+    in a rolled-back savepoint are dropped with it.
+    """
+
+    def __init__(self):
+        self.deltas = defaultdict(Delta)
+        self.university_ids = set()
+        self.countries = set()
+
+    def course(self, state, sign=1):
+        self.deltas[state[0]].add_course(state, sign)
+        return self
+
+    def refresh(self, university_ids=(), countries=()):
+        self.university_ids.update(pk for pk in university_ids if pk is not None)
+        self.countries.update(country for country in countries if country)
+        return self
+
+    def schedule(self):
+        transaction.on_commit(self)
+
+    def __call__(self):
+        apply_changes([self])
+
+
+def apply_changes(changes):
+    """Apply course deltas to the stored stats and recompute the scopes marked for refresh.
+
+    Rows are locked while they are updated. Scopes without a stored row
+    yet are recomputed instead.
+    """
+    deltas, university_ids, countries = defaultdict(Delta), set(), set()
+    for change in changes:
+        for pk, delta in change.deltas.items():
+            deltas[pk].merge(delta)
+        university_ids |= change.university_ids
+        countries |= change.countries
+    updated_at = timezone.now()
+    with use_primary(), transaction.atomic():
+        if university_ids:
+            countries |= set(University.objects.filter(id__in=university_ids).values_list('country', flat=True))
+        university_rows = {
+            row.university_id: row
+            for row in UniversityStats.objects.select_for_update(of=('self',)).select_related('university')
+            .filter(university_id__in=set(deltas) - university_ids)
+        }
+        # Universities without a stored row are computed from scratch. Deleted
+        # ones are skipped: deleting a university refreshes its country.
+        unstored = set(deltas) - university_ids - set(university_rows)
+        if unstored:
+            university_ids |= set(University.objects.filter(id__in=unstored).values_list('id', flat=True))
+        country_deltas = defaultdict(Delta)
+        for pk, row in university_rows.items():
+            country_deltas[row.university.country].merge(deltas[pk])
+        country_rows = {
+            row.country: row
+            for row in CountryStats.objects.select_for_update().filter(country__in=set(country_deltas) - countries)
+        }
+        countries |= set(country_deltas) - countries - set(country_rows)
+        _apply_deltas(university_rows, deltas, 'university_id', updated_at)
+        _apply_deltas(country_rows, country_deltas, 'university__country', updated_at)
+        UniversityStats.objects.bulk_update(university_rows.values(), DELTA_FIELDS)
+        CountryStats.objects.bulk_update(country_rows.values(), DELTA_FIELDS)
+        if university_ids or countries:
+            refresh_stats(university_ids, countries)
+    response_cache.invalidate('universities', 'country-stats')
+
+
+def course_state(course):
+    # Read from __dict__ so that deferred fields are not loaded.
+    return tuple(course.__dict__.get(name, DEFERRED) for name in COURSE_FIELDS)
+
+
+def remember_course(course):
+    course._stats_state = course_state(course)
+
+
+def course_saved(course, created, update_fields=None):
+    """Schedule the stats change of a saved course: a delta, or a refresh when its old state is unknown."""
+    previous = None if created else getattr(course, '_stats_state', None)
+    state = course_state(course)
+    if previous is not None and update_fields is not None:
+        saved = {'university_id' if name == 'university' else name for name in update_fields}
+        state = tuple(new if name in saved else old for name, old, new in zip(COURSE_FIELDS, previous, state))
+    course._stats_state = state
+    if previous == state:
+        return
+    changes = Changes()
+    if DEFERRED in state or (not created and (previous is None or DEFERRED in previous)):
+        changes.refresh([course.university_id, previous[0] if previous else None])
+    else:
+        if previous is not None:
+            changes.course(previous, -1)
+        changes.course(state)
+    changes.schedule()
+
+
+def course_deleted(course):
+    state = getattr(course, '_stats_state', None)
+    if state is None or DEFERRED in state:
+        Changes().refresh([course.university_id]).schedule()
+    else:
+        Changes().course(state, -1).schedule()
+
+
+def schedule_refresh(university_ids=(), countries=()):
+    """Recompute these scopes once the current transaction commits."""
+    Changes().refresh(university_ids, countries).schedule()
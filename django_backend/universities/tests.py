@@ -0,0 +1,172 @@
+import random
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from config.response_cache import response_cache
+from config.testing import QueryBudgetTestMixin
+from courses.models import Course
+from courses.tests import make_course, make_university
+from .models import CountryStats, University, UniversityStats
+from .stats import compute_stats, empty_stats, refresh_medians
+
+COMPARED_FIELDS = [
+    'course_count', 'min_annual_fee', 'max_annual_fee', 'average_rating', 'rating_total', 'rated_count',
+    'level_counts', 'format_counts',
+]
+
+
+class IncrementalStatsTests(TransactionTestCase):
+    """Course changes keep the stored stats equal to a full recomputation (medians aside)."""
+
+    def stored(self, model, key, extra=()):
+        return {
+            getattr(row, key): {field: getattr(row, field) for field in COMPARED_FIELDS + list(extra)}
+            for row in model.objects.all()
+        }
+
+    def expected(self):
+        universities = dict(University.objects.values_list('id', 'country'))
+        by_university = compute_stats(Course.objects.all(), 'university_id')
+        by_country = compute_stats(Course.objects.all(), 'university__country')
+        pick = lambda stats: {field: stats[field] for field in COMPARED_FIELDS}  # noqa: E731
+        return (
+            {pk: pick(by_university.get(pk, empty_stats())) for pk in universities},
+            {
+                country: dict(pick(by_country.get(country, empty_stats())), university_count=count)
+                for country, count in Counter(universities.values()).items()
+            },
+        )
+
+    def assertStatsCurrent(self):
+        universities, countries = self.expected()
+        self.assertEqual(self.stored(UniversityStats, 'university_id'), universities)
+        self.assertEqual(self.stored(CountryStats, 'country', ['university_count']), countries)
+
+    def test_random_changes(self):
+        rng = random.Random(7)
+        universities = [make_university(name=f'U{index}', country=rng.choice('AB')) for index in range(4)]
+        courses = []
+        for step in range(60):
+            action = rng.random()
+            if action < 0.4 or not courses:
+                courses.append(make_course(
+                    rng.choice(universities), title=f'Course {step}', level=rng.choice(["Bachelor's", "Master's"]),
+                    fees=rng.choice([None, 1000, 5000, 9000]), rating=rng.choice([None, 3, 4.5]),
+                ))
+            elif action < 0.75:
+                course = Course.objects.get(pk=rng.choice(courses).pk)
+                field = rng.choice(['fees', 'rating', 'format', 'university', 'title'])
+                if field == 'fees':
+                    course.fees = rng.choice([None, 1000, 2000, 9000])
+                elif field == 'rating':
+                    course.rating = rng.choice([None, 2, 5])
+                elif field == 'format':
+                    course.format = rng.choice(['Online', 'On-campus'])
+                elif field == 'university':
+                    course.university = rng.choice(universities)
+                else:
+                    course.title += ' II'
+                course.save()
+            elif action < 0.9:
+                course = courses.pop(rng.randrange(len(courses)))
+                Course.objects.get(pk=course.pk).delete()
+            else:
+                university = University.objects.get(pk=rng.choice(universities).pk)
+                university.country = 'B' if university.country == 'A' else 'A'
+                university.save()
+            self.assertStatsCurrent()
+        University.objects.get(pk=universities[0].pk).delete()
+        self.assertStatsCurrent()
+
+    def test_rolled_back_savepoint_is_not_counted(self):
+        university = make_university()
+        with transaction.atomic():
+            make_course(university, title='Kept')
+            try:
+                with transaction.atomic():
+                    make_course(university, title='Dropped')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(UniversityStats.objects.get(pk=university.pk).course_count, 1)
+        self.assertStatsCurrent()
+
+    def test_writes_in_one_transaction_are_all_applied(self):
+        university = make_university()
+        with transaction.atomic():
+            for title in ('One', 'Two', 'Three'):
+                make_course(university, title=title)
+        self.assertEqual(UniversityStats.objects.get(pk=university.pk).course_count, 3)
+        self.assertStatsCurrent()
+
+    def test_deltas_leave_computed_at_to_the_medians(self):
+        university = make_university()
+        make_course(university, title='Cheap', fees=1000)
+        before = UniversityStats.objects.get(pk=university.pk)
+        make_course(university, title='Dear', fees=9000)
+        after = UniversityStats.objects.get(pk=university.pk)
+        self.assertEqual((after.course_count, after.median_annual_fee), (2, before.median_annual_fee))
+        self.assertEqual(after.computed_at, before.computed_at)
+        self.assertGreater(after.updated_at, before.updated_at)
+        refresh_medians()
+        refreshed = UniversityStats.objects.get(pk=university.pk)
+        self.assertEqual(refreshed.median_annual_fee, 5000)
+        self.assertGreater(refreshed.computed_at, before.computed_at)
+        self.assertEqual(refreshed.updated_at, refreshed.computed_at)
+
+    def test_deltas_move_the_university_etag(self):
+        university = make_university()
+        make_course(university, title='First')
+        url = f'/api/universities/{university.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        make_course(university, title='Second')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['course_count'], 2)
+
+    def test_course_edit_does_not_aggregate(self):
+        course = make_course(make_university(), fees=5000)
+        course = Course.objects.get(pk=course.pk)
+        course.rating = 2
+        with CaptureQueriesContext(connection) as queries:
+            course.save()
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'] or 'MIN(' in query['sql']])
+        self.assertStatsCurrent()
+
+
+class UniversityQueryBudgetTests(QueryBudgetTestMixin, TransactionTestCase):
+    """Every university view on a cold cache, as an authenticated user, including the on_commit work of writes."""
+
+    def setUp(self):
+        super().setUp()
+        response_cache.cache.clear()
+        self.university = make_university()
+        make_course(self.university)
+        self.client.force_login(get_user_model().objects.create_user('ada', 'ada@example.com', 'secret'))
+
+    def test_reads(self):
+        for path, params in [
+            ('/api/universities/', {}),
+            ('/api/universities/', {'search': 'harbour', 'country': 'Norway', 'fields': 'id,name'}),
+            (f'/api/universities/{self.university.pk}/', {}),
+            ('/api/universities/countries/', {}),
+            ('/api/universities/countries/Norway/', {}),
+        ]:
+            with self.subTest(path=path, params=params):
+                self.assertRequestWithinQueryBudget('get', path, params)
+
+    def test_writes(self):
+        self.assertRequestWithinQueryBudget('post', '/api/universities/', {
+            'name': 'Fjord Institute', 'country': 'Iceland', 'city': 'Reykjavik',
+        })
+        url = f'/api/universities/{self.university.pk}/'
+        university = self.assertRequestWithinQueryBudget('get', url).json()
+        self.assertRequestWithinQueryBudget('patch', url, {'name': 'Bergen University', 'country': 'Iceland'})
+        university.update(name='Harbour College', country='Norway')
+        university = {name: value for name, value in university.items() if value is not None}
+        self.assertRequestWithinQueryBudget('put', url, university)
+        self.assertRequestWithinQueryBudget('delete', url)
@@ -5,4 +5,6 @@ from . import views
 urlpatterns = [
     path('universities/', views.UniversityListCreateView.as_view(), name='university-list-create'),
     path('universities/<int:pk>/', views.UniversityDetailView.as_view(), name='university-detail'),
+    path('universities/countries/', views.CountryStatsListView.as_view(), name='country-stats-list'),
+    path('universities/countries/<str:country>/', views.CountryStatsDetailView.as_view(), name='country-stats-detail'),
 ]
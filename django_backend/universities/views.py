@@ -3,16 +3,61 @@ from rest_framework import generics, filters
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import University
-from .serializers import UniversitySerializer
+from config.pagination import CatalogPagination
+from config.response_cache import CachedResponseMixin
+from config.conditional import ConditionalGetMixin, row_validators
+from config.sparse_fields import SparseFieldsViewMixin
+from .models import CountryStats, University
+from .serializers import CountryStatsSerializer, UniversityWithStatsSerializer, university_values
 
-class UniversityListCreateView(generics.ListCreateAPIView):
-    queryset = University.objects.all()
-    serializer_class = UniversitySerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+# Stats timestamps move the ETags when a university's courses change.
+UNIVERSITY_TIMESTAMPS = ('updated_at', 'stats__updated_at')
+
+# Budgets include the session and user lookups. Creating, moving or
+# deleting a university recomputes its stats and its countries' on commit.
+
+class UniversityListCreateView(CachedResponseMixin, SparseFieldsViewMixin, generics.ListCreateAPIView):
+    queryset = University.objects.select_related('stats')
+    serializer_class = UniversityWithStatsSerializer
+    values_serializer = university_values
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['country']
     search_fields = ['name', 'city', 'description']
+    ordering_fields = ['ranking', 'created_at']
+    ordering = ['id']
+    pagination_class = CatalogPagination
+    cache_namespace = 'university-list'
+    cache_tags = ['universities']
+    query_budget = {'GET': 4, 'POST': 17}
+
+class UniversityDetailView(ConditionalGetMixin, SparseFieldsViewMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = University.objects.select_related('stats')
+    serializer_class = UniversityWithStatsSerializer
+    values_serializer = university_values
+    query_budget = {'GET': 4, 'PUT': 20, 'PATCH': 20, 'DELETE': 21}
+
+    def get_validators(self, request, *args, **kwargs):
+        pk = kwargs['pk']
+        return row_validators(University.objects.filter(pk=pk), f'university:{pk}', UNIVERSITY_TIMESTAMPS)
+
+class CountryStatsListView(CachedResponseMixin, generics.ListAPIView):
+    queryset = CountryStats.objects.all()
+    serializer_class = CountryStatsSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['country', 'university_count', 'course_count', 'median_annual_fee', 'average_rating']
+    ordering = ['country']
+    # One row per country: small enough to send whole.
+    pagination_class = None
+    cache_namespace = 'country-stats'
+    cache_tags = ['country-stats']
+    query_budget = {'GET': 3}
+
+class CountryStatsDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = CountryStats.objects.all()
+    serializer_class = CountryStatsSerializer
+    lookup_field = 'country'
+    query_budget = {'GET': 4}
 
-class UniversityDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = University.objects.all()
-    serializer_class = UniversitySerializer
+    def get_validators(self, request, *args, **kwargs):
+        country = kwargs['country']
+        return row_validators(CountryStats.objects.filter(country=country), f'country:{country}', ('updated_at',))
@@ -0,0 +1,19 @@
+from rest_framework.exceptions import NotAuthenticated
+from config.async_views import async_api_view, json_response
+from config.instrumentation import query_budget
+from courses.views import parse_course_ids
+from . import views
+from .saved import aget_saved_course_ids
+
+
+@query_budget(3)
+@async_api_view(views.check_saved_courses)
+async def check_saved_courses(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        raise NotAuthenticated()
+    course_ids = parse_course_ids(request.GET.get('ids', ''))
+    if len(course_ids) > views.MAX_CHECK_IDS:
+        return json_response({'error': f'At most {views.MAX_CHECK_IDS} ids can be checked at once'}, status=400)
+    saved_ids = await aget_saved_course_ids(user)
+    return json_response({'is_saved': {str(course_id): course_id in saved_ids for course_id in course_ids}})
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def _cache_key(user_id):
+    return f'users:auth-user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that serves the per-request user lookup from the cache.
+
+    Every session of a user shares one entry, kept for
+    ``AUTH_USER_CACHE_TIMEOUT`` seconds and dropped on logout and
+    whenever the user is saved or deleted (see users.signals). Django
+    still checks the session auth hash against the cached user, so a
+    password change ends other sessions as before.
+    """
+
+    def get_user(self, user_id):
+        key = _cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+        return user
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_cache_key(user_id))
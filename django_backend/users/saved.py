@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache import cache
+from .models import SavedCourse
+
+SAVED_IDS_TIMEOUT = 60 * 60
+
+
+def _cache_key(user_id):
+    return f'users:saved-course-ids:{user_id}'
+
+
+def _saved_ids_queryset(user):
+    return SavedCourse.objects.filter(user=user).values_list('course_id', flat=True)
+
+
+def get_saved_course_ids(user):
+    """Return the set of course ids ``user`` has saved.
+
+    The set is only cached when the cache is shared: the signals that
+    invalidate it run in the process that saved or removed the course.
+    """
+    if not settings.SHARED_CACHE:
+        return set(_saved_ids_queryset(user))
+    key = _cache_key(user.pk)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        course_ids = set(_saved_ids_queryset(user))
+        cache.set(key, course_ids, SAVED_IDS_TIMEOUT)
+    return course_ids
+
+
+def invalidate_saved_course_ids(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+async def aget_saved_course_ids(user):
+    if not settings.SHARED_CACHE:
+        return {course_id async for course_id in _saved_ids_queryset(user)}
+    key = _cache_key(user.pk)
+    course_ids = await cache.aget(key)
+    if course_ids is None:
+        course_ids = {course_id async for course_id in _saved_ids_queryset(user)}
+        await cache.aset(key, course_ids, SAVED_IDS_TIMEOUT)
+    return course_ids
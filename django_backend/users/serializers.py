@@ -1,6 +1,9 @@
 
 from rest_framework import serializers
 from .models import CustomUser, SavedCourse, CourseComparison
+from config.fast_serializers import ValuesSerializer
+from courses.comparison import ComparisonError, normalize_course_ids
+from courses.serializers import CourseSerializer
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,10 +18,20 @@ class SavedCourseSerializer(serializers.ModelSerializer):
         fields = ['id', 'course', 'created_at']
 
     def get_course(self, obj):
-        from courses.serializers import CourseSerializer
         return CourseSerializer(obj.course).data
 
 class CourseComparisonSerializer(serializers.ModelSerializer):
     class Meta:
         model = CourseComparison
         fields = ['id', 'course_ids', 'created_at']
+
+    def validate_course_ids(self, value):
+        # Stored sorted so saved comparisons share the cached matrix of their id set.
+        if not isinstance(value, list):
+            raise serializers.ValidationError('Expected a list of course ids.')
+        try:
+            return normalize_course_ids(value)
+        except ComparisonError as exc:
+            raise serializers.ValidationError(str(exc))
+
+saved_course_values = ValuesSerializer(SavedCourseSerializer, nested={'course': CourseSerializer})
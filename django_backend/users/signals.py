@@ -0,0 +1,33 @@
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .auth import invalidate_cached_user
+from .models import CustomUser, SavedCourse
+from .saved import invalidate_saved_course_ids
+from courses.recommendations import mark_changed
+
+
+@receiver(post_save, sender=SavedCourse)
+@receiver(post_delete, sender=SavedCourse)
+def invalidate_saved_courses(sender, instance, **kwargs):
+    invalidate_saved_course_ids(instance.user_id)
+
+
+@receiver(post_save, sender=SavedCourse)
+@receiver(post_delete, sender=SavedCourse)
+def mark_recommendations_changed(sender, instance, created=True, raw=False, **kwargs):
+    if raw or not created:
+        return
+    mark_changed(instance.user_id, instance.course_id)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_cached_user(user.pk)
@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from config.response_cache import response_cache
+from config.testing import QueryBudgetTestMixin
+from courses.recommendations import rebuild_recommendations
+from courses.tests import make_course, make_university
+from .models import CourseComparison, SavedCourse
+from .saved import get_saved_course_ids
+
+
+class UserQueryBudgetTests(QueryBudgetTestMixin, TransactionTestCase):
+    """Every user view on a cold cache, including the on_commit work of writes."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        response_cache.cache.clear()
+        university = make_university()
+        self.courses = [make_course(university, title=f'Course {number}') for number in range(3)]
+        self.user = get_user_model().objects.create_user(
+            'ada', 'ada@example.com', 'secret', study_interest='Humanities',
+        )
+        other = get_user_model().objects.create_user('grace', 'grace@example.com', 'secret')
+        for user, courses in ((self.user, self.courses[:2]), (other, self.courses)):
+            for course in courses:
+                SavedCourse.objects.create(user=user, course=course)
+        rebuild_recommendations()
+        self.comparison = CourseComparison.objects.create(
+            user=self.user, course_ids=[course.pk for course in self.courses],
+        )
+        self.client.force_login(self.user)
+
+    def test_session(self):
+        self.client.logout()
+        self.assertRequestWithinQueryBudget('post', '/api/auth/login/', {'username': 'ada@example.com', 'password': 'secret'})
+        self.assertRequestWithinQueryBudget('get', '/api/auth/user/')
+        self.assertRequestWithinQueryBudget('post', '/api/auth/logout/')
+
+    def test_saved_courses(self):
+        saved, unsaved = self.courses[0].pk, self.courses[2].pk
+        self.assertRequestWithinQueryBudget('get', '/api/saved-courses/')
+        self.assertRequestWithinQueryBudget('post', '/api/saved-courses/', {'course_id': unsaved})
+        self.assertRequestWithinQueryBudget('get', f'/api/saved-courses/{saved}/check/')
+        self.assertRequestWithinQueryBudget('get', '/api/saved-courses/check/', {'ids': f'{saved},{unsaved}'})
+        self.assertRequestWithinQueryBudget('post', '/api/saved-courses/check/', {'courseIds': [saved, unsaved]})
+        self.assertRequestWithinQueryBudget('delete', f'/api/saved-courses/{saved}/')
+
+    def test_comparisons(self):
+        course_ids = [course.pk for course in self.courses[:2]]
+        self.assertRequestWithinQueryBudget('get', '/api/comparisons/')
+        self.assertRequestWithinQueryBudget('post', '/api/comparisons/', {'course_ids': course_ids})
+        self.assertRequestWithinQueryBudget('get', f'/api/comparisons/{self.comparison.pk}/matrix/')
+        self.assertRequestWithinQueryBudget('delete', f'/api/comparisons/{self.comparison.pk}/')
+
+    def test_recommendations(self):
+        self.assertRequestWithinQueryBudget('get', '/api/recommendations/')
+
+    @override_settings(ROOT_URLCONF='config.asgi_urls')
+    def test_async_saved_check(self):
+        self.assertRequestWithinQueryBudget('get', '/api/saved-courses/check/', {'ids': str(self.courses[0].pk)})
+
+
+class SavedCourseIdsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        university = make_university()
+        self.saved, self.unsaved = make_course(university, title='Saved'), make_course(university, title='Unsaved')
+        self.user = get_user_model().objects.create_user('ada', 'ada@example.com', 'secret')
+        SavedCourse.objects.create(user=self.user, course=self.saved)
+        self.client.force_login(self.user)
+
+    def check(self):
+        response = self.client.get('/api/saved-courses/check/', {'ids': f'{self.saved.pk},{self.unsaved.pk}'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['is_saved']
+
+    def test_read_from_the_database_without_a_shared_cache(self):
+        self.assertEqual(self.check(), {str(self.saved.pk): True, str(self.unsaved.pk): False})
+        # Writes that bypass the signals, as another process's would for its own cache.
+        SavedCourse.objects.bulk_create([SavedCourse(user=self.user, course=self.unsaved)])
+        self.assertEqual(self.check(), {str(self.saved.pk): True, str(self.unsaved.pk): True})
+        self.assertIsNone(cache.get(f'users:saved-course-ids:{self.user.pk}'))
+
+    @override_settings(SHARED_CACHE=True)
+    def test_cached_with_a_shared_cache_until_saved_courses_change(self):
+        get_saved_course_ids(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_saved_course_ids(self.user), {self.saved.pk})
+        SavedCourse.objects.create(user=self.user, course=self.unsaved)
+        self.assertEqual(self.check(), {str(self.saved.pk): True, str(self.unsaved.pk): True})
+        SavedCourse.objects.filter(user=self.user, course=self.saved).delete()
+        self.assertEqual(self.check(), {str(self.saved.pk): False, str(self.unsaved.pk): True})
+
+
+@override_settings(SHARED_CACHE=True, AUTHENTICATION_BACKENDS=['users.auth.CachedModelBackend'])
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('ada', 'ada@example.com', 'secret', first_name='Ada', last_name='Lovelace')
+        self.client.force_login(self.user)
+
+    def profile(self):
+        return self.client.get('/api/auth/user/')
+
+    def user_queries(self):
+        table = get_user_model()._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.profile().status_code, 200)
+        return [query for query in queries if f'FROM "{table}"' in query['sql']]
+
+    def test_user_is_read_from_the_cache(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+        # Writes that skip the signals are not seen until the entry expires.
+        get_user_model().objects.filter(pk=self.user.pk).update(first_name='Augusta')
+        self.assertEqual(self.profile().json()['name'], 'Ada Lovelace')
+
+    def test_saving_the_user_invalidates_it(self):
+        self.profile()
+        self.user.first_name = 'Augusta'
+        self.user.save()
+        self.assertEqual(self.profile().json()['name'], 'Augusta Lovelace')
+
+    def test_deactivated_users_are_logged_out(self):
+        self.profile()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_deleted_users_are_logged_out(self):
+        self.profile()
+        self.user.delete()
+        self.assertEqual(self.profile().status_code, 401)
@@ -6,12 +6,12 @@ urlpatterns = [
     path('auth/user/', views.get_user_profile, name='user-profile'),
     path('auth/login/', views.login_user, name='login'),
     path('auth/logout/', views.logout_user, name='logout'),
-    path('saved-courses/', views.get_saved_courses, name='saved-courses'),
-    path('saved-courses/', views.save_course, name='save-course'),
+    path('saved-courses/', views.saved_courses, name='saved-courses'),
+    path('saved-courses/check/', views.check_saved_courses, name='check-saved-courses'),
     path('saved-courses/<int:course_id>/', views.remove_saved_course, name='remove-saved-course'),
     path('saved-courses/<int:course_id>/check/', views.check_saved_course, name='check-saved-course'),
-    path('comparisons/', views.get_comparisons, name='get-comparisons'),
-    path('comparisons/', views.create_comparison, name='create-comparison'),
+    path('recommendations/', views.get_recommendations, name='recommendations'),
+    path('comparisons/', views.comparisons, name='comparisons'),
     path('comparisons/<int:comparison_id>/', views.delete_comparison, name='delete-comparison'),
+    path('comparisons/<int:comparison_id>/matrix/', views.comparison_matrix, name='comparison-matrix'),
 ]
-</urlpatterns>
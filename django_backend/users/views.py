@@ -8,12 +8,17 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from django.contrib.auth.models import User
-from .models import SavedCourse, Comparison
-from .serializers import SavedCourseSerializer, ComparisonSerializer
+from config.instrumentation import query_budget
+from .models import SavedCourse, CourseComparison
+from .serializers import SavedCourseSerializer, CourseComparisonSerializer, saved_course_values
+from .saved import get_saved_course_ids
 from courses.models import Course
+from courses.comparison import ComparisonError, get_matrix, normalize_course_ids
+from courses.recommendations import get_index
+from courses.views import get_recommendation_limit, parse_course_ids, ranked_courses_payload
 import json
 
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_user_profile(request):
@@ -26,6 +31,7 @@ def get_user_profile(request):
         })
     return Response({'message': 'Unauthorized'}, status=401)
 
+@query_budget(8)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @csrf_exempt
@@ -47,23 +53,27 @@ def login_user(request):
     except Exception as e:
         return Response({'message': str(e)}, status=400)
 
+@query_budget(4)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def logout_user(request):
     logout(request)
     return Response({'message': 'Logged out successfully'})
 
-@api_view(['GET'])
+@query_budget({'GET': 3, 'POST': 8})
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+def saved_courses(request):
+    if request.method == 'POST':
+        return save_course(request)
+    return get_saved_courses(request)
+
 def get_saved_courses(request):
-    saved_courses = SavedCourse.objects.filter(user=request.user).select_related('course', 'course__university')
-    serializer = SavedCourseSerializer(saved_courses, many=True)
-    return Response(serializer.data)
+    saved_courses = saved_course_values.values(SavedCourse.objects.filter(user=request.user))
+    return Response(saved_course_values.serialize(saved_courses))
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
 def save_course(request):
-    course_id = request.data.get('course_id')
+    course_id = request.data.get('course_id', request.data.get('courseId'))
     try:
         course = Course.objects.get(id=course_id)
         saved_course, created = SavedCourse.objects.get_or_create(
@@ -78,6 +88,7 @@ def save_course(request):
     except Course.DoesNotExist:
         return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
 
+@query_budget(6)
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def remove_saved_course(request, course_id):
@@ -88,34 +99,76 @@ def remove_saved_course(request, course_id):
     except SavedCourse.DoesNotExist:
         return Response({'error': 'Saved course not found'}, status=status.HTTP_404_NOT_FOUND)
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def check_saved_course(request, course_id):
-    is_saved = SavedCourse.objects.filter(user=request.user, course_id=course_id).exists()
-    return Response({'is_saved': is_saved})
+    return Response({'is_saved': course_id in get_saved_course_ids(request.user)})
 
-@api_view(['GET'])
+MAX_CHECK_IDS = 200
+
+@query_budget(3)
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+def check_saved_courses(request):
+    if request.method == 'POST':
+        course_ids = parse_course_ids(request.data.get('courseIds', []))
+    else:
+        course_ids = parse_course_ids(request.query_params.get('ids', ''))
+    if len(course_ids) > MAX_CHECK_IDS:
+        return Response({'error': f'At most {MAX_CHECK_IDS} ids can be checked at once'}, status=status.HTTP_400_BAD_REQUEST)
+    saved_ids = get_saved_course_ids(request.user)
+    return Response({'is_saved': {str(course_id): course_id in saved_ids for course_id in course_ids}})
+
+@query_budget({'GET': 3, 'POST': 3})
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def comparisons(request):
+    if request.method == 'POST':
+        return create_comparison(request)
+    return get_comparisons(request)
+
 def get_comparisons(request):
-    comparisons = Comparison.objects.filter(user=request.user)
-    serializer = ComparisonSerializer(comparisons, many=True)
+    comparisons = CourseComparison.objects.filter(user=request.user)
+    serializer = CourseComparisonSerializer(comparisons, many=True)
     return Response(serializer.data)
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
 def create_comparison(request):
-    serializer = ComparisonSerializer(data=request.data)
+    serializer = CourseComparisonSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save(user=request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(4)
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_comparison(request, comparison_id):
     try:
-        comparison = Comparison.objects.get(id=comparison_id, user=request.user)
+        comparison = CourseComparison.objects.get(id=comparison_id, user=request.user)
         comparison.delete()
         return Response({'message': 'Comparison deleted'}, status=status.HTTP_200_OK)
-    except Comparison.DoesNotExist:
+    except CourseComparison.DoesNotExist:
+        return Response({'error': 'Comparison not found'}, status=status.HTTP_404_NOT_FOUND)
+
+@query_budget(4)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def comparison_matrix(request, comparison_id):
+    course_ids = CourseComparison.objects.filter(id=comparison_id, user=request.user).values_list('course_ids', flat=True).first()
+    if course_ids is None:
         return Response({'error': 'Comparison not found'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        course_ids = normalize_course_ids(course_ids)
+    except ComparisonError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(get_matrix(course_ids))
+
+# Up to three check the recommendation index version and reload it (config.process_index).
+@query_budget(7)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_recommendations(request):
+    limit = get_recommendation_limit(request.query_params)
+    ranked = get_index().for_user(get_saved_course_ids(request.user), request.user.study_interest, limit)
+    return Response(ranked_courses_payload(request, ranked))
@@ -1,17 +1,167 @@
-
 #!/usr/bin/env python
+"""Start the Django backend.
+
+    python main.py              # apply pending migrations, warm up, serve with workers
+    python main.py --dev        # runserver with autoreload
+
+Serving uses gunicorn when it is installed (one sync worker per
+``--workers``, or gthread workers with ``--threads``); otherwise Django's
+threaded WSGI server in this process. ``--asgi`` serves config.asgi,
+with its async read views, through uvicorn workers instead.
+"""
+import argparse
 import os
-import subprocess
 import sys
 
-if __name__ == "__main__":
-    # Change to django_backend directory
-    os.chdir('django_backend')
-    
-    # Run migrations first
-    print("Running migrations...")
-    subprocess.run([sys.executable, 'manage.py', 'migrate'], check=True)
-    
-    # Start Django development server
-    print("Starting Django server on port 8000...")
-    subprocess.run([sys.executable, 'manage.py', 'runserver', '0.0.0.0:8000'])
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'django_backend')
+
+
+def default_workers():
+    return int(os.environ.get('WEB_CONCURRENCY', 2 * (os.cpu_count() or 1) + 1))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('DJANGO_PORT', 8000)))
+    parser.add_argument('--workers', type=int, default=default_workers(), help='Worker processes (default: 2 x CPUs + 1)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', 1)), help='Threads per worker')
+    parser.add_argument('--timeout', type=int, default=30, help='Seconds before a silent worker is restarted')
+    parser.add_argument('--asgi', action='store_true', default=os.environ.get('SERVER_INTERFACE') == 'asgi',
+                        help='Serve the ASGI application with uvicorn workers')
+    parser.add_argument('--dev', action='store_true', help='Run the autoreloading development server')
+    parser.add_argument('--skip-migrate', action='store_true', help='Do not check for pending migrations')
+    parser.add_argument('--skip-warmup', action='store_true', help='Do not warm up before serving')
+    return parser.parse_args()
+
+
+def server_processes(args):
+    if args.dev:
+        return 1
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return 1
+    return args.workers
+
+
+def setup_django():
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+def migrate_if_needed():
+    """Apply migrations only when the plan is not empty; loading the plan is cheap."""
+    from django.core.management import call_command
+    from django.db import connection
+    from django.db.migrations.executor import MigrationExecutor
+
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if not plan:
+        print('No pending migrations')
+        return
+    print(f'Applying {len(plan)} migrations...')
+    call_command('migrate', interactive=False, verbosity=1)
+
+
+def warm_up():
+    from config.warmup import warm_up
+
+    for name, (count, seconds) in warm_up().items():
+        print(f'Warmed {name}: {count} in {seconds * 1000:.0f} ms')
+
+
+def serve_gunicorn(application, args):
+    from django.db import connections
+    from gunicorn.app.base import BaseApplication
+
+    def post_fork(server, worker):
+        # Each worker opens its own persistent connections; none are inherited.
+        connections.close_all()
+
+    def post_worker_init(worker):
+        if not args.skip_warmup:
+            for connection in connections.all():
+                connection.ensure_connection()
+
+    class Launcher(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f'{args.host}:{args.port}',
+                'workers': args.workers,
+                'threads': args.threads,
+                'worker_class': worker_class(args),
+                'timeout': args.timeout,
+                'keepalive': 5,
+                # Warmed state (imports, serializer plans, indexes) is shared by the forked workers.
+                'preload_app': True,
+                'post_fork': post_fork,
+                'post_worker_init': post_worker_init,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return application
+
+    connections.close_all()
+    print(f'Serving on {args.host}:{args.port} with {args.workers} workers x {args.threads} threads')
+    Launcher().run()
+
+
+def worker_class(args):
+    if args.asgi:
+        return 'uvicorn.workers.UvicornWorker'
+    return 'gthread' if args.threads > 1 else 'sync'
+
+
+def serve_threaded(application, args):
+    from django.core.servers.basehttp import run
+
+    print(f'gunicorn is not installed; serving on {args.host}:{args.port} with a threaded server')
+    run(args.host, args.port, application, threading=True)
+
+
+def serve_uvicorn(application, args):
+    import uvicorn
+
+    print(f'gunicorn is not installed; serving ASGI on {args.host}:{args.port} with one uvicorn process')
+    uvicorn.run(application, host=args.host, port=args.port, lifespan='off')
+
+
+def main():
+    args = parse_args()
+    # Settings only enable per-process caches for a single process.
+    os.environ['WEB_CONCURRENCY'] = str(server_processes(args))
+    setup_django()
+    if not args.skip_migrate:
+        migrate_if_needed()
+    if args.dev:
+        from django.core.management import call_command
+        call_command('runserver', f'{args.host}:{args.port}')
+        return
+
+    if args.asgi:
+        from config.asgi import application
+    else:
+        from django.core.wsgi import get_wsgi_application
+        application = get_wsgi_application()
+    if not args.skip_warmup:
+        warm_up()
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        if args.asgi:
+            serve_uvicorn(application, args)
+        else:
+            serve_threaded(application, args)
+    else:
+        serve_gunicorn(application, args)
+
+
+if __name__ == '__main__':
+    main()